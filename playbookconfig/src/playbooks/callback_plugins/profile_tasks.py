@@ -11,6 +11,10 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 import collections
+import csv
+import json
+import os
+import tempfile
 import time
 
 from ansible.module_utils.six.moves import reduce
@@ -59,6 +63,29 @@ DOCUMENTATION = '''
           - section: callback_profile_tasks
             key: summary_only
         version_added: 1.5.0
+      output_file:
+        description:
+          - Also write one record per task and host to this file, for runs
+            to be compared or aggregated. Records hold the task name, role,
+            path and host, the start time (epoch seconds), the elapsed time,
+            the number of times the task was run (once per C(serial) batch)
+            and the number of loop items.
+          - The strftime directives in the path are expanded with the start
+            time of the run.
+        env:
+          - name: PROFILE_TASKS_OUTPUT_FILE
+        ini:
+          - section: callback_profile_tasks
+            key: output_file
+      output_format:
+        description: Format of the records written to output_file
+        choices: ['json', 'csv']
+        default: 'json'
+        env:
+          - name: PROFILE_TASKS_OUTPUT_FORMAT
+        ini:
+          - section: callback_profile_tasks
+            key: output_format
 '''
 
 EXAMPLES = '''
@@ -109,6 +136,27 @@ def timestamp(self):
         self.stats[self.current]['elapsed'] += elapsed
 
 
+RECORD_FIELDS = ['name', 'role', 'path', 'host', 'start', 'elapsed',
+                 'iterations', 'items', 'status']
+
+
+def write_records(records, path, output_format):
+    """Write the task records to path as JSON or CSV, atomically"""
+
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, 'w') as f:
+        if output_format == 'csv':
+            writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            json.dump(records, f, indent=2)
+    os.rename(tmp_path, path)
+
+
 def tasktime():
     global tn
     time_current = time.strftime('%A %d %B %Y  %H:%M:%S %z')
@@ -135,6 +183,8 @@ class CallbackModule(CallbackBase):
         self.sort_order = None
         self.summary_only = None
         self.task_output_limit = None
+        self.output_file = None
+        self.output_format = None
 
         super(CallbackModule, self).__init__()
 
@@ -160,6 +210,12 @@ class CallbackModule(CallbackBase):
             else:
                 self.task_output_limit = int(self.task_output_limit)
 
+        self.output_file = self.get_option('output_file')
+        if self.output_file:
+            self.output_file = time.strftime(self.output_file,
+                                             time.localtime(t0))
+        self.output_format = self.get_option('output_format')
+
     def _display_tasktime(self):
         if not self.summary_only:
             self._display.display(tasktime())
@@ -176,14 +232,80 @@ class CallbackModule(CallbackBase):
         #   started: Current task start time. This value will be updated each time a task
         #            with the same UUID is executed when `serial` is specified in a playbook.
         #   elapsed: Elapsed time since the first serialized task was started
+        #   first_started: Start time of the first run of the task
+        #   iterations: Number of runs of the task, one per serialized batch
+        #   hosts: Per host elapsed time, loop items and status, for the
+        #          records written to output_file
         self.current = task._uuid
         if self.current not in self.stats:
-            self.stats[self.current] = {'started': time.time(), 'elapsed': 0.0, 'name': task.get_name()}
+            self.stats[self.current] = {'started': time.time(), 'elapsed': 0.0, 'name': task.get_name(),
+                                        'first_started': time.time(), 'iterations': 0,
+                                        'role': task._role.get_name() if task._role else '',
+                                        'task_path': task.get_path() or '',
+                                        'hosts': collections.OrderedDict()}
         else:
             self.stats[self.current]['started'] = time.time()
+        self.stats[self.current]['iterations'] += 1
         if self._display.verbosity >= 2:
             self.stats[self.current]['path'] = task.get_path()
 
+    def _host_stats(self, result):
+        task_stats = self.stats.get(result._task._uuid)
+        if task_stats is None:
+            return None
+        return task_stats['hosts'].setdefault(
+            result._host.get_name(),
+            {'started': task_stats['started'], 'elapsed': 0.0, 'items': 0, 'status': None})
+
+    def _record_host_result(self, result, status):
+        host_stats = self._host_stats(result)
+        if host_stats is not None:
+            # A host may run the task again in the next serialized batch
+            host_stats['elapsed'] += time.time() - max(host_stats['started'],
+                                                       self.stats[result._task._uuid]['started'])
+            host_stats['started'] = time.time()
+            host_stats['status'] = status
+
+    def _record_host_item(self, result):
+        host_stats = self._host_stats(result)
+        if host_stats is not None:
+            host_stats['items'] += 1
+
+    def v2_runner_on_ok(self, result):
+        self._record_host_result(result, 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record_host_result(result, 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self._record_host_result(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self._record_host_result(result, 'unreachable')
+
+    def v2_runner_item_on_ok(self, result):
+        self._record_host_item(result)
+
+    def v2_runner_item_on_failed(self, result):
+        self._record_host_item(result)
+
+    def v2_runner_item_on_skipped(self, result):
+        self._record_host_item(result)
+
+    def _task_records(self):
+        records = []
+        for result in self.stats.values():
+            task = {'name': result['name'], 'role': result['role'], 'path': result['task_path'],
+                    'start': round(result['first_started'], 3), 'iterations': result['iterations']}
+            # Tasks without host results, such as include_tasks, get one
+            # record with the task elapsed time
+            hosts = result['hosts'] or {'': {'elapsed': result['elapsed'], 'items': 0, 'status': None}}
+            for host, host_stats in hosts.items():
+                record = dict(task, host=host, elapsed=round(host_stats['elapsed'], 3),
+                              items=host_stats['items'], status=host_stats['status'] or '')
+                records.append(record)
+        return records
+
     def v2_playbook_on_task_start(self, task, is_conditional):
         self._record_task(task)
 
@@ -222,3 +344,10 @@ class CallbackModule(CallbackBase):
             if 'path' in result:
                 msg += u"\n{0:-<{1}}".format(result['path'] + u' ', self._display.columns)
             self._display.display(msg)
+
+        if self.output_file:
+            try:
+                write_records(self._task_records(), self.output_file, self.output_format)
+                self._display.display("Task timings written to %s" % self.output_file)
+            except (IOError, OSError) as e:
+                self._display.warning("Could not write task timings to %s: %s" % (self.output_file, e))
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Dump postgres databases concurrently for the platform backup.
+
+Every database is written to <output-dir>/<database>.postgreSql.data as a
+data-only plain SQL dump. Databases are given as NAME or
+NAME:TABLE[,TABLE...] to exclude tables from the dump.
+
+The dump format is one of:
+  inserts - one INSERT statement per row (default)
+  rows    - multi-row INSERT statements, --rows-per-insert rows each
+  copy    - COPY ... FROM stdin blocks, the smallest and fastest to load
+Databases given with --inserts-only always use one INSERT per row.
+
+Prints a JSON report with the elapsed seconds and size of every dump.
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import subprocess
+import sys
+import time
+
+PG_DUMP_CMD = ["sudo", "-u", "postgres", "pg_dump", "--format=plain",
+               "--disable-triggers", "--data-only"]
+
+DUMP_SUFFIX = ".postgreSql.data"
+
+DUMP_FORMAT_INSERTS = "inserts"
+DUMP_FORMAT_ROWS = "rows"
+DUMP_FORMAT_COPY = "copy"
+DUMP_FORMATS = [DUMP_FORMAT_INSERTS, DUMP_FORMAT_ROWS, DUMP_FORMAT_COPY]
+
+DEFAULT_ROWS_PER_INSERT = 1000
+
+
+def parse_database(spec):
+    """Split NAME[:TABLE,...] into the database name and excluded tables"""
+
+    name, _, tables = spec.partition(":")
+    return name, [t for t in tables.split(",") if t]
+
+
+def get_dump_cmd(database, exclude_tables, dump_format=DUMP_FORMAT_INSERTS,
+                 rows_per_insert=DEFAULT_ROWS_PER_INSERT):
+    cmd = list(PG_DUMP_CMD)
+    if dump_format == DUMP_FORMAT_INSERTS:
+        cmd.append("--inserts")
+    elif dump_format == DUMP_FORMAT_ROWS:
+        cmd.append("--rows-per-insert={}".format(rows_per_insert))
+    cmd += ["--exclude-table={}".format(t) for t in exclude_tables]
+    return cmd + [database]
+
+
+def dump_database(database, exclude_tables, output_dir,
+                  dump_format=DUMP_FORMAT_INSERTS,
+                  rows_per_insert=DEFAULT_ROWS_PER_INSERT):
+    """Dump one database to its own file and return its report entry"""
+
+    path = os.path.join(output_dir, database + DUMP_SUFFIX)
+    cmd = get_dump_cmd(database, exclude_tables, dump_format, rows_per_insert)
+    start = time.monotonic()
+    with open(path, "wb") as f:
+        p = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, check=False)
+    return {
+        "database": database,
+        "format": dump_format,
+        "path": path,
+        "rc": p.returncode,
+        "error": p.stderr.decode(errors="replace").strip(),
+        "seconds": round(time.monotonic() - start, 3),
+        "bytes": os.path.getsize(path),
+    }
+
+
+def dump_databases(databases, output_dir, workers,
+                   dump_format=DUMP_FORMAT_INSERTS, inserts_only=(),
+                   rows_per_insert=DEFAULT_ROWS_PER_INSERT):
+    """Dump databases with at most workers pg_dump processes at once"""
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = []
+        for name, tables in databases:
+            fmt = DUMP_FORMAT_INSERTS if name in inserts_only else dump_format
+            futures.append(executor.submit(
+                dump_database, name, tables, output_dir, fmt,
+                rows_per_insert))
+        return [f.result() for f in futures]
+
+
+def main(argv=None):
+    parser = ArgumentParser()
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--format", choices=DUMP_FORMATS,
+                        default=DUMP_FORMAT_INSERTS)
+    parser.add_argument("--rows-per-insert", type=int,
+                        default=DEFAULT_ROWS_PER_INSERT)
+    parser.add_argument("--inserts-only", action="append", default=[],
+                        metavar="DATABASE")
+    parser.add_argument("databases", nargs="+", metavar="DATABASE")
+    args = parser.parse_args(argv)
+
+    databases = [parse_database(d) for d in args.databases]
+    report = dump_databases(databases, args.output_dir, args.workers,
+                            args.format, args.inserts_only,
+                            args.rows_per_insert)
+    print(json.dumps(report, indent=2))
+
+    failed = [r for r in report if r["rc"] != 0]
+    for r in failed:
+        print("Failed to dump {}: {}".format(r["database"], r["error"]),
+              file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,29 @@
 #!/usr/bin/python
 
 #
-# Copyright (c) 2019-2025 Wind River Systems, Inc.
+# Copyright (c) 2019-2026 Wind River Systems, Inc.
 #
 # SPDX-License-Identifier: Apache-2.0
 #
 # OpenStack Keystone and Sysinv interactions
 #
 
+import concurrent.futures
 import glob
 import json
+import openstack_credentials
 import os
 import pyudev
 import re
 import stat
 import subprocess
 import sys
+import threading
 import time
 import six.moves.configparser as configparser
 
 
+from netaddr import IPAddress
 from netaddr import IPNetwork
 from cgtsclient import client as cgts_client
 from sysinv.common import constants as sysinv_constants
@@ -36,6 +40,16 @@ INITIAL_POPULATION = True
 INCOMPLETE_BOOTSTRAP = False
 SYSTEM_CONFIG_TIMEOUT = 420
 
+# Written to by sysinv when the default system is created and when the
+# sysinv-agent reports the inventory
+SYSINV_LOG = '/var/log/sysinv.log'
+
+# First delay between the checks of a wait, doubled after each check
+WAIT_INITIAL_DELAY = 0.5
+
+# Interval of the checks of a watched file
+WATCH_INTERVAL = 0.2
+
 # By default, configparse transforms all loaded parameters to lowercase.
 # This is a problem for Kubernetes kubelet configurations because they are
 # written with Camel Case notation. With the optionxform attribute it is
@@ -44,55 +58,169 @@ CONF = configparser.ConfigParser(interpolation=None)
 CONF.optionxform = str
 
 
+class SnapshotManager(object):
+    """Sysinv resource manager serving list() from a snapshot
+
+    The collection is loaded on the first list() and then kept up to date
+    with the changes made through this manager, instead of being fetched
+    again by each of the network and service parameter steps.
+    The other calls go to the sysinv manager of the cgtsclient of the
+    calling thread. The snapshot is shared by the population phases run at
+    the same time.
+    """
+
+    def __init__(self, snapshot, name):
+        self._snapshot = snapshot
+        self._name = name
+        self._items = None
+        self._lock = threading.Lock()
+
+    @property
+    def _manager(self):
+        return getattr(self._snapshot.api, self._name)
+
+    def __getattr__(self, name):
+        return getattr(self._manager, name)
+
+    def list(self):
+        with self._lock:
+            if self._items is None:
+                self._items = dict((item.uuid, item)
+                                   for item in self._manager.list())
+            return list(self._items.values())
+
+    def get(self, uuid):
+        with self._lock:
+            if self._items is not None and uuid in self._items:
+                return self._items[uuid]
+        return self._manager.get(uuid)
+
+    def add(self, item):
+        with self._lock:
+            if self._items is not None and item is not None:
+                self._items[item.uuid] = item
+        return item
+
+    def discard(self, match):
+        with self._lock:
+            if self._items is not None:
+                for uuid in [uuid for uuid, item in self._items.items()
+                             if match(item)]:
+                    del self._items[uuid]
+
+    def invalidate(self):
+        with self._lock:
+            self._items = None
+
+    def create(self, **kwargs):
+        return self.add(self._manager.create(**kwargs))
+
+    def update(self, uuid, patch):
+        return self.add(self._manager.update(uuid, patch))
+
+    def delete(self, uuid):
+        result = self._manager.delete(uuid)
+        self.discard(lambda item: item.uuid == uuid)
+        return result
+
+
+class NetworkManager(SnapshotManager):
+
+    def create(self, **kwargs):
+        network = super(NetworkManager, self).create(**kwargs)
+        # The pool of the network is assigned to it by sysinv
+        self._snapshot.network_addrpool.invalidate()
+        return network
+
+    def delete(self, uuid):
+        result = super(NetworkManager, self).delete(uuid)
+        self._snapshot.network_addrpool.discard(
+            lambda item: item.network_uuid == uuid)
+        return result
+
+
+class AddressPoolManager(SnapshotManager):
+
+    def delete(self, uuid):
+        result = super(AddressPoolManager, self).delete(uuid)
+        self._snapshot.network_addrpool.discard(
+            lambda item: item.address_pool_uuid == uuid)
+        return result
+
+
+class NetworkAddrpoolManager(SnapshotManager):
+
+    def assign(self, **kwargs):
+        return self.add(self._manager.assign(**kwargs))
+
+
+class ServiceParameterManager(SnapshotManager):
+
+    def create(self, **kwargs):
+        # A single request creates one parameter per name, they are listed
+        # again when needed
+        result = self._manager.create(**kwargs)
+        self.invalidate()
+        return result
+
+
+class SysinvSnapshot(object):
+    """Sysinv client caching the networks, address pools, network address
+    pools and service parameters
+
+    The cgtsclient HTTP client is not thread-safe, each thread gets its own
+    from create_client. The snapshots are shared by all the threads.
+    """
+
+    def __init__(self, create_client):
+        self._create_client = create_client
+        self._local = threading.local()
+        self.network = NetworkManager(self, 'network')
+        self.address_pool = AddressPoolManager(self, 'address_pool')
+        self.network_addrpool = NetworkAddrpoolManager(
+            self, 'network_addrpool')
+        self.service_parameter = ServiceParameterManager(
+            self, 'service_parameter')
+
+    @property
+    def api(self):
+        """cgtsclient of the calling thread"""
+
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            api = self._local.api = self._create_client()
+        return api
+
+    def __getattr__(self, name):
+        return getattr(self.api, name)
+
+
 class CgtsClient(object):
     SYSINV_API_VERSION = 1
 
     def __init__(self):
-        self.conf = {}
+        self.conf = openstack_credentials.load_openrc()
         self._sysinv = None
-
-        source_command = 'source /etc/platform/openrc && env'
-
-        with open(os.devnull, "w") as fnull:
-            proc = subprocess.Popen(
-                ['bash', '-c', source_command],
-                stdout=subprocess.PIPE, stderr=fnull,
-                universal_newlines=True)
-
-        for line in proc.stdout:
-            key, _, value = line.partition("=")
-            if key == 'OS_USERNAME':
-                self.conf['admin_user'] = value.strip()
-            elif key == 'OS_PASSWORD':
-                self.conf['admin_pwd'] = value.strip()
-            elif key == 'OS_PROJECT_NAME':
-                self.conf['admin_tenant'] = value.strip()
-            elif key == 'OS_AUTH_URL':
-                self.conf['auth_url'] = value.strip()
-            elif key == 'OS_REGION_NAME':
-                self.conf['region_name'] = value.strip()
-            elif key == 'OS_USER_DOMAIN_NAME':
-                self.conf['user_domain'] = value.strip()
-            elif key == 'OS_PROJECT_DOMAIN_NAME':
-                self.conf['project_domain'] = value.strip()
-
-        proc.communicate()
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Get a token and create the sysinv client, once"""
+
+        with self._lock:
+            if not self._sysinv:
+                token = openstack_credentials.get_token(self.conf)
+                endpoint = openstack_credentials.sysinv_endpoint(
+                    token, self.conf, interface='admin')
+                # The clients of the threads share the token
+                self._sysinv = SysinvSnapshot(lambda: cgts_client.get_client(
+                    str(self.SYSINV_API_VERSION),
+                    os_auth_token=token.id,
+                    system_url=endpoint))
+        return self._sysinv
 
     @property
     def sysinv(self):
-        if not self._sysinv:
-            self._sysinv = cgts_client.get_client(
-                self.SYSINV_API_VERSION,
-                os_username=self.conf['admin_user'],
-                os_password=self.conf['admin_pwd'],
-                os_auth_url=self.conf['auth_url'],
-                os_project_name=self.conf['admin_tenant'],
-                os_project_domain_name=self.conf['project_domain'],
-                os_user_domain_name=self.conf['user_domain'],
-                os_region_name=self.conf['region_name'],
-                os_service_type='platform',
-                os_endpoint_type='admin')
-        return self._sysinv
+        return self._sysinv or self.connect()
 
 
 class ConfigFail(Exception):
@@ -117,6 +245,77 @@ def dict_to_patch(values, install_action=False):
     return patch
 
 
+def file_state(path):
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return stat_result.st_size, stat_result.st_mtime
+
+
+def sleep_until_changed(path, delay):
+    """Sleep for delay seconds, or less once the file is written to"""
+
+    if not path:
+        time.sleep(delay)
+        return
+    end = time.time() + delay
+    # The writes caused by the last check are ignored
+    time.sleep(min(WAIT_INITIAL_DELAY, delay))
+    state = file_state(path)
+    while time.time() < end and file_state(path) == state:
+        time.sleep(min(WATCH_INTERVAL, end - time.time()))
+
+
+def is_terminal_error(e):
+    # Retrying does not help when the credentials are rejected
+    return (isinstance(e, ConfigFail) or
+            getattr(e, 'code', None) in (401, 403))
+
+
+def wait_for(description, check, timeout, max_delay=10, watch=None):
+    """Wait until check() returns something else than None
+
+    The delay between the checks starts at WAIT_INITIAL_DELAY and doubles
+    up to max_delay. With watch, the next check is made early when the
+    watched file is written to. The errors raised by check() are retried
+    until the timeout, except the terminal ones. The duration of the wait is
+    printed.
+    """
+
+    start = time.time()
+    deadline = start + timeout
+    delay = WAIT_INITIAL_DELAY
+    checks = 0
+    error = None
+    while True:
+        checks += 1
+        try:
+            result = check()
+        except Exception as e:
+            if is_terminal_error(e):
+                print("Failed waiting for %s after %.1f seconds: %s" %
+                      (description, time.time() - start, e))
+                raise
+            error = e
+            result = None
+        if result is not None:
+            print("Waited %.1f seconds for %s (%d checks)." %
+                  (time.time() - start, description, checks))
+            return result
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        sleep_until_changed(watch, min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+    message = 'Timeout waiting for %s' % description
+    if error:
+        message += ': %s' % error
+    raise ConfigFail(message)
+
+
 def touch(fname):
     with open(fname, 'a'):
         os.utime(fname, None)
@@ -176,19 +375,24 @@ def has_cluster_service_network_secondary():
     return cluster_service_subnet_secondary != 'undef'
 
 
+def wait_sysinv_client(client):
+    # Keystone or the catalog may not answer yet, rejected credentials
+    # are terminal
+    return wait_for('sysinv client', client.connect,
+                    SYSTEM_CONFIG_TIMEOUT, max_delay=2)
+
+
 def wait_system_config(client):
-    for _ in range(SYSTEM_CONFIG_TIMEOUT):
-        try:
-            systems = client.sysinv.isystem.list()
-            if systems:
-                # only one system (default)
-                return systems[0]
-        except Exception:
-            pass
-        time.sleep(1)
-    else:
-        raise ConfigFail('Timeout waiting for default system '
-                         'configuration')
+    def default_system():
+        systems = client.sysinv.isystem.list()
+        if systems:
+            # only one system (default)
+            return systems[0]
+        return None
+
+    # The default system is created as sysinv starts, which it logs
+    return wait_for('default system configuration', default_system,
+                    SYSTEM_CONFIG_TIMEOUT, max_delay=2, watch=SYSINV_LOG)
 
 
 def populate_system_config(client):
@@ -333,56 +537,185 @@ def get_addrpools_uuid(client, network_uuid):
     return addrpools_uuid
 
 
+def find_network(client, network_name):
+    try:
+        return get_network(client, network_name)
+    except ValueError:
+        return None
+
+
+def get_network_addrpools(client, network, addrpool_prefix):
+    """Address pools of a network or named after it, by name"""
+
+    # The address pool can either have a suffix with the IP version or not,
+    # e.g. management-ipv4 and pxeboot. In an incomplete bootstrap, it is
+    # possible that the address pool is created without the network.
+    names = [addrpool_prefix,
+             f'{addrpool_prefix}-ipv4',
+             f'{addrpool_prefix}-ipv6']
+    assigned = get_addrpools_uuid(client, network.uuid) if network else []
+    return dict((addrpool.name, addrpool)
+                for addrpool in client.sysinv.address_pool.list()
+                if addrpool.name in names or addrpool.uuid in assigned)
+
+
+def delete_host_addresses(client, addrpools):
+    """Delete the controller-0 routes and addresses in the address pools"""
+
+    subnets = [IPNetwork(f'{addrpool.network}/{addrpool.prefix}')
+               for addrpool in addrpools]
+
+    def in_addrpools(address):
+        return any(IPAddress(address) in subnet for subnet in subnets)
+
+    try:
+        # When the bootstrap is incomplete, the host is not created
+        host = client.sysinv.ihost.get('controller-0')
+    except cgts_client.exc.HTTPNotFound:
+        print("Controller-0 host not found")
+        return
+
+    for route in client.sysinv.route.list_by_host(host.uuid):
+        if in_addrpools(route.gateway):
+            client.sysinv.route.delete(route.uuid)
+
+    for addr in client.sysinv.address.list_by_host(host.uuid):
+        if in_addrpools(addr.address):
+            client.sysinv.address.delete(addr.uuid)
+
+
 def delete_network_and_addrpool(client, network_name, addrpool_name):
-    networks = client.sysinv.network.list()
-    network_uuid = None
-    for network in networks:
-        if network.name == network_name:
-            network_uuid = network.uuid
+    network = find_network(client, network_name)
+    addrpools = get_network_addrpools(client, network, addrpool_name)
+    if not network and not addrpools:
+        return
 
-    if network_uuid:
-        print("Deleting network, routes, addresses, and address pool for network "
-              f"{network_name}...")
+    print("Deleting network, routes, addresses, and address pool for network "
+          f"{network_name}...")
+    delete_host_addresses(client, addrpools.values())
+    if network:
+        client.sysinv.network.delete(network.uuid)
+    for addrpool in addrpools.values():
+        client.sysinv.address_pool.delete(addrpool.uuid)
 
-        try:
-            # When the bootstrap is incomplete, the host is not created
-            host = client.sysinv.ihost.get('controller-0')
 
-            host_routes = client.sysinv.route.list_by_host(host.uuid)
-            for route in host_routes:
-                client.sysinv.route.delete(route.uuid)
+def get_addrpool_changes(addrpool, values):
+    """Values of an address pool that differ from the ones in sysinv"""
+
+    def addresses(value):
+        return [IPAddress(address) for address in value]
+
+    changes = {}
+    for key, value in values.items():
+        current = getattr(addrpool, key, None)
+        if key == 'name':
+            continue
+        elif current is None:
+            changed = value is not None
+        elif key == 'prefix':
+            changed = int(current) != int(value)
+        elif key == 'ranges':
+            changed = ([addresses(r) for r in current] !=
+                       [addresses(r) for r in value])
+        else:
+            changed = IPAddress(current) != IPAddress(value)
+        if changed:
+            changes[key] = value
+
+    # The other addresses are allocated by sysinv when they are not given
+    if 'gateway_address' not in values and addrpool.gateway_address:
+        changes['gateway_address'] = None
+    return changes
 
-            host_addresses = client.sysinv.address.list_by_host(host.uuid)
-            for addr in host_addresses:
-                client.sysinv.address.delete(addr.uuid)
-        except cgts_client.exc.HTTPNotFound:
-            print("Controller-0 host not found")
-        except Exception as e:
-            raise e
 
-        addrpools_uuid = get_addrpools_uuid(client, network_uuid)
-        client.sysinv.network.delete(network_uuid)
-        for addrpool_uuid in addrpools_uuid:
-            client.sysinv.address_pool.delete(addrpool_uuid)
-
-    # In an incomplete bootstrap, it is possible that the address pool is created
-    # without the network, e.g. using a cluster service subnet that overlaps with
-    # the oam ip.
-    # Additionally, in a dual-stack system, if a failure occurs when populating
-    # the secondary address, the network is found, but there will also be an
-    # incorrect address pool set, which needs to be deleted.
-    addrpools = client.sysinv.address_pool.list()
-    for addrpool in addrpools:
-        # The address pool can either have a suffix with the IP version or not,
-        # e.g. management-ipv4 and pxeboot
-        if (
-            addrpool.name == f"{addrpool_name}-ipv4" or
-            addrpool.name == f"{addrpool_name}-ipv6" or
-            addrpool.name == addrpool_name
-        ):
-            print("Network not found for %s, attempting to delete address pool..." %
-                  addrpool.name)
-            client.sysinv.address_pool.delete(addrpool.uuid)
+def addrpool_subnet_changed(addrpool, values):
+    """Whether an address pool in sysinv is moved to another subnet"""
+
+    return (IPNetwork(f'{addrpool.network}/{addrpool.prefix}') !=
+            IPNetwork(f"{values['network']}/{values['prefix']}"))
+
+
+def reconcile_network(client, network_values, addrpools, addrpool_prefix):
+    """Create a network and its address pools, or bring them up to date
+
+    network_values are the values of the network, without its pool, and
+    addrpools the values of its address pools, the primary one first.
+
+    When the network config is reconfigured or an incomplete bootstrap is
+    replayed, they are compared with the network and the address pools
+    found in sysinv and only the differences are applied. The address pools
+    are updated in place, unless they move to another subnet: they are then
+    created again, with the addresses allocated by sysinv. The network is
+    created again only when its type, its address allocation or its primary
+    address pool changes. Only the host routes and addresses in the deleted
+    address pools are deleted.
+    """
+
+    network_name = network_values['name']
+    network = None
+    existing = {}
+    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
+        network = find_network(client, network_name)
+        existing = get_network_addrpools(client, network, addrpool_prefix)
+
+    requested = dict((values['name'], values) for values in addrpools)
+    stale = [addrpool for name, addrpool in existing.items()
+             if name not in requested or
+             addrpool_subnet_changed(addrpool, requested[name])]
+    current = dict((name, addrpool) for name, addrpool in existing.items()
+                   if addrpool not in stale)
+    primary = current.get(addrpools[0]['name'])
+    if network and (network.type != network_values['type'] or
+                    network.dynamic != network_values['dynamic'] or
+                    not primary or network.pool_uuid != primary.uuid):
+        print(f"Deleting network {network_name}...")
+        delete_host_addresses(client, existing.values())
+        client.sysinv.network.delete(network.uuid)
+        network = None
+    elif stale:
+        delete_host_addresses(client, stale)
+    for addrpool in stale:
+        print(f"Deleting address pool {addrpool.name}...")
+        client.sysinv.address_pool.delete(addrpool.uuid)
+
+    pools_uuid = []
+    for values in addrpools:
+        pool = current.get(values['name'])
+        if pool is None:
+            pool = create_addrpool(client, values)
+        else:
+            changes = get_addrpool_changes(pool, values)
+            if changes:
+                print(f"Updating address pool {pool.name}...")
+                client.sysinv.address_pool.update(pool.uuid,
+                                                  dict_to_patch(changes))
+        pools_uuid.append(pool.uuid)
+
+    if network is None:
+        values = dict(network_values, pool_uuid=pools_uuid[0])
+        create_network(client, values, network_name)
+        # The primary address pool is assigned to the network by sysinv
+        assigned = pools_uuid[:1]
+        if len(pools_uuid) > 1:
+            network = get_network(client, network_name)
+    else:
+        assigned = get_addrpools_uuid(client, network.uuid)
+
+    # add the other pools to the network
+    for pool_uuid in pools_uuid[1:]:
+        if pool_uuid not in assigned:
+            values = {
+                'network_uuid': network.uuid,
+                'address_pool_uuid': pool_uuid,
+            }
+            create_network_addrpool(client, values)
+
+
+def print_network_action(description):
+    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
+        print(f"Updating {description}...")
+    else:
+        print(f"Populating {description}...")
 
 
 def populate_mgmt_network(client):
@@ -398,16 +731,11 @@ def populate_mgmt_network(client):
 
     dynamic_allocation = CONF.getboolean(
         'BOOTSTRAP_CONFIG', 'MANAGEMENT_DYNAMIC_ADDRESS_ALLOCATION')
-    network_name = 'mgmt'
     addrpool_prefix = 'management'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name, addrpool_prefix)
-        print("Updating management network...")
-    else:
-        print("Populating management network...")
+    print_network_action("management network")
 
-    # create the address pool
+    # the address pool
     values = {
         'name': f'{addrpool_prefix}-{get_version_text(management_subnet)}',
         'network': str(management_subnet.network),
@@ -422,20 +750,21 @@ def populate_mgmt_network(client):
         values.update({
             'floating_address': floating_address,
         })
+    addrpools = [values]
+    if has_mgmt_network_secondary():
+        print("Populating secondary management network...")
+        addrpools.append(get_mgmt_addrpool_secondary())
 
-    pool = create_addrpool(client, values)
-
-    # create the network for the pool
+    # the network for the pools
     values = {
         'type': sysinv_constants.NETWORK_TYPE_MGMT,
         'name': sysinv_constants.NETWORK_TYPE_MGMT,
         'dynamic': dynamic_allocation,
-        'pool_uuid': pool.uuid,
     }
-    create_network(client, values, network_name)
+    reconcile_network(client, values, addrpools, addrpool_prefix)
 
 
-def populate_mgmt_network_secondary(client):
+def get_mgmt_addrpool_secondary():
     management_subnet = IPNetwork(
         CONF.get('BOOTSTRAP_CONFIG', 'MANAGEMENT_SUBNET_SECONDARY'))
     start_address = CONF.get('BOOTSTRAP_CONFIG',
@@ -446,11 +775,6 @@ def populate_mgmt_network_secondary(client):
                                 'MANAGEMENT_FLOATING_ADDRESS_SECONDARY')
     mgmt_gateway_address = CONF.get('BOOTSTRAP_CONFIG', 'MANAGEMENT_GATEWAY_ADDRESS_SECONDARY')
 
-    network_name = sysinv_constants.NETWORK_TYPE_MGMT
-
-    print("Populating secondary management network...")
-
-    # create the address pool
     values = {
         'name': f'management-{get_version_text(management_subnet)}',
         'network': str(management_subnet.network),
@@ -465,30 +789,20 @@ def populate_mgmt_network_secondary(client):
         values.update({
             'floating_address': floating_address,
         })
-
-    pool = create_addrpool(client, values)
-
-    # add the pool to the network
-    values = {
-        'network_uuid': get_network(client, network_name).uuid,
-        'address_pool_uuid': pool.uuid,
-    }
-    create_network_addrpool(client, values)
+    return values
 
 
 def populate_admin_network(client):
     network_name = 'admin'
     addrpool_prefix = 'admin'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name, addrpool_prefix)
-        print("Updating admin network...")
-    else:
-        print("Populating admin network...")
-
     if not has_admin_network():
+        if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
+            delete_network_and_addrpool(client, network_name, addrpool_prefix)
         return
 
+    print_network_action("admin network")
+
     admin_subnet = IPNetwork(
         CONF.get('BOOTSTRAP_CONFIG', 'ADMIN_SUBNET'))
     start_address = CONF.get('BOOTSTRAP_CONFIG', 'ADMIN_START_ADDRESS')
@@ -496,7 +810,7 @@ def populate_admin_network(client):
     floating_address = CONF.get('BOOTSTRAP_CONFIG', 'ADMIN_FLOATING_ADDRESS')
     admin_gateway_address = CONF.get('BOOTSTRAP_CONFIG', 'ADMIN_GATEWAY_ADDRESS')
 
-    # create the address pool
+    # the address pool
     values = {
         'name': f'{addrpool_prefix}-{get_version_text(admin_subnet)}',
         'network': str(admin_subnet.network),
@@ -511,20 +825,21 @@ def populate_admin_network(client):
         values.update({
             'floating_address': floating_address,
         })
+    addrpools = [values]
+    if has_admin_network_secondary():
+        print("Populating secondary admin network...")
+        addrpools.append(get_admin_addrpool_secondary())
 
-    pool = create_addrpool(client, values)
-
-    # create the network for the pool
+    # the network for the pools
     values = {
         'type': sysinv_constants.NETWORK_TYPE_ADMIN,
         'name': sysinv_constants.NETWORK_TYPE_ADMIN,
         'dynamic': False,
-        'pool_uuid': pool.uuid,
     }
-    create_network(client, values, network_name)
+    reconcile_network(client, values, addrpools, addrpool_prefix)
 
 
-def populate_admin_network_secondary(client):
+def get_admin_addrpool_secondary():
     admin_subnet = IPNetwork(CONF.get(
         'BOOTSTRAP_CONFIG', 'ADMIN_SUBNET_SECONDARY'))
     start_address = CONF.get(
@@ -534,11 +849,7 @@ def populate_admin_network_secondary(client):
     floating_address = CONF.get(
         'BOOTSTRAP_CONFIG', 'ADMIN_FLOATING_ADDRESS_SECONDARY')
     admin_gateway_address = CONF.get('BOOTSTRAP_CONFIG', 'ADMIN_GATEWAY_ADDRESS_SECONDARY')
-    network_name = sysinv_constants.NETWORK_TYPE_ADMIN
 
-    print("Populating secondary admin network...")
-
-    # create the address pool
     values = {
         'name': f'admin-{get_version_text(admin_subnet)}',
         'network': str(admin_subnet.network),
@@ -553,14 +864,7 @@ def populate_admin_network_secondary(client):
         values.update({
             'floating_address': floating_address,
         })
-    pool = create_addrpool(client, values)
-
-    # add the pool to the network
-    values = {
-        'network_uuid': get_network(client, network_name).uuid,
-        'address_pool_uuid': pool.uuid,
-    }
-    create_network_addrpool(client, values)
+    return values
 
 
 def populate_pxeboot_network(client):
@@ -571,16 +875,11 @@ def populate_pxeboot_network(client):
                            'PXEBOOT_END_ADDRESS')
     floating_address = CONF.get('BOOTSTRAP_CONFIG',
                                 'PXEBOOT_FLOATING_ADDRESS')
-    network_name = 'pxeboot'
     addrpool_name = 'pxeboot'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name, addrpool_name)
-        print("Updating pxeboot network...")
-    else:
-        print("Populating pxeboot network...")
+    print_network_action("pxeboot network")
 
-    # create the address pool
+    # the address pool
     values = {
         'name': addrpool_name,
         'network': str(pxeboot_subnet.network),
@@ -591,16 +890,15 @@ def populate_pxeboot_network(client):
         values.update({
             'floating_address': floating_address,
         })
-    pool = create_addrpool(client, values)
+    addrpools = [values]
 
-    # create the network for the pool
+    # the network for the pool
     values = {
         'type': sysinv_constants.NETWORK_TYPE_PXEBOOT,
         'name': sysinv_constants.NETWORK_TYPE_PXEBOOT,
         'dynamic': True,
-        'pool_uuid': pool.uuid,
     }
-    create_network(client, values, network_name)
+    reconcile_network(client, values, addrpools, addrpool_name)
 
 
 def populate_oam_network(client):
@@ -610,16 +908,11 @@ def populate_oam_network(client):
                              'EXTERNAL_OAM_START_ADDRESS')
     end_address = CONF.get('BOOTSTRAP_CONFIG',
                            'EXTERNAL_OAM_END_ADDRESS')
-    network_name = 'oam'
     addrpool_prefix = 'oam'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name, addrpool_prefix)
-        print("Updating oam network...")
-    else:
-        print("Populating oam network...")
+    print_network_action("oam network")
 
-    # create the address pool
+    # the address pool
     values = {
         'name': f'{addrpool_prefix}-{get_version_text(external_oam_subnet)}',
         'network': str(external_oam_subnet.network),
@@ -641,30 +934,28 @@ def populate_oam_network(client):
         'gateway_address': CONF.get(
             'BOOTSTRAP_CONFIG', 'EXTERNAL_OAM_GATEWAY_ADDRESS'),
     })
-    pool = create_addrpool(client, values)
+    addrpools = [values]
+    if has_oam_network_secondary():
+        print("Populating secondary oam network...")
+        addrpools.append(get_oam_addrpool_secondary())
 
-    # create the network for the pool
+    # the network for the pools
     values = {
         'type': sysinv_constants.NETWORK_TYPE_OAM,
         'name': sysinv_constants.NETWORK_TYPE_OAM,
         'dynamic': False,
-        'pool_uuid': pool.uuid,
     }
-    create_network(client, values, network_name)
+    reconcile_network(client, values, addrpools, addrpool_prefix)
 
 
-def populate_oam_network_secondary(client):
+def get_oam_addrpool_secondary():
     external_oam_subnet = IPNetwork(CONF.get(
         'BOOTSTRAP_CONFIG', 'EXTERNAL_OAM_SUBNET_SECONDARY'))
     start_address = CONF.get('BOOTSTRAP_CONFIG',
                              'EXTERNAL_OAM_START_ADDRESS_SECONDARY')
     end_address = CONF.get('BOOTSTRAP_CONFIG',
                            'EXTERNAL_OAM_END_ADDRESS_SECONDARY')
-    network_name = sysinv_constants.NETWORK_TYPE_OAM
-
-    print("Populating secondary oam network...")
 
-    # create the address pool
     values = {
         'name': f'oam-{get_version_text(external_oam_subnet)}',
         'network': str(external_oam_subnet.network),
@@ -686,14 +977,7 @@ def populate_oam_network_secondary(client):
         'gateway_address': CONF.get(
             'BOOTSTRAP_CONFIG', 'EXTERNAL_OAM_GATEWAY_ADDRESS_SECONDARY'),
     })
-    pool = create_addrpool(client, values)
-
-    # add the pool to the network
-    values = {
-        'network_uuid': get_network(client, network_name).uuid,
-        'address_pool_uuid': pool.uuid,
-    }
-    create_network_addrpool(client, values)
+    return values
 
 
 def populate_multicast_network(client):
@@ -706,57 +990,43 @@ def populate_multicast_network(client):
     network_name = 'multicast'
     addrpool_prefix = f'{network_name}-subnet'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name, addrpool_prefix)
-        print("Updating multicast network...")
-    else:
-        print("Populating multicast network...")
+    print_network_action("multicast network")
 
-    # create the address pool
+    # the address pool
     values = {
         'name': f'{addrpool_prefix}-{get_version_text(management_multicast_subnet)}',
         'network': str(management_multicast_subnet.network),
         'prefix': management_multicast_subnet.prefixlen,
         'ranges': [(start_address, end_address)],
     }
-    pool = create_addrpool(client, values)
+    addrpools = [values]
+    if has_multicast_network_secondary():
+        print("Populating secondary multicast network...")
+        addrpools.append(get_multicast_addrpool_secondary())
 
-    # create the network for the pool
+    # the network for the pools
     values = {
         'type': sysinv_constants.NETWORK_TYPE_MULTICAST,
         'name': sysinv_constants.NETWORK_TYPE_MULTICAST,
         'dynamic': False,
-        'pool_uuid': pool.uuid,
     }
-    create_network(client, values, network_name)
+    reconcile_network(client, values, addrpools, addrpool_prefix)
 
 
-def populate_multicast_network_secondary(client):
+def get_multicast_addrpool_secondary():
     management_multicast_subnet = IPNetwork(CONF.get(
         'BOOTSTRAP_CONFIG', 'MANAGEMENT_MULTICAST_SUBNET_SECONDARY'))
     start_address = CONF.get('BOOTSTRAP_CONFIG',
                              'MANAGEMENT_MULTICAST_START_ADDRESS_SECONDARY')
     end_address = CONF.get('BOOTSTRAP_CONFIG',
                            'MANAGEMENT_MULTICAST_END_ADDRESS_SECONDARY')
-    network_name = sysinv_constants.NETWORK_TYPE_MULTICAST
-
-    print("Populating secondary multicast network...")
 
-    # create the address pool
-    values = {
+    return {
         'name': f'multicast-subnet-{get_version_text(management_multicast_subnet)}',
         'network': str(management_multicast_subnet.network),
         'prefix': management_multicast_subnet.prefixlen,
         'ranges': [(start_address, end_address)],
     }
-    pool = create_addrpool(client, values)
-
-    # add the pool to the network
-    values = {
-        'network_uuid': get_network(client, network_name).uuid,
-        'address_pool_uuid': pool.uuid,
-    }
-    create_network_addrpool(client, values)
 
 
 def populate_cluster_host_network(client):
@@ -773,13 +1043,9 @@ def populate_cluster_host_network(client):
     network_name = 'cluster-host'
     addrpool_prefix = f'{network_name}-subnet'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name, addrpool_prefix)
-        print("Updating cluster host network...")
-    else:
-        print("Populating cluster host network...")
+    print_network_action("cluster host network")
 
-    # create the address pool
+    # the address pool
     values = {
         'name': f'{addrpool_prefix}-{get_version_text(cluster_host_subnet)}',
         'network': str(cluster_host_subnet.network),
@@ -790,20 +1056,21 @@ def populate_cluster_host_network(client):
         values.update({
             'floating_address': floating_address,
         })
+    addrpools = [values]
+    if has_cluster_host_network_secondary():
+        print("Populating secondary cluster host network...")
+        addrpools.append(get_cluster_host_addrpool_secondary())
 
-    pool = create_addrpool(client, values)
-
-    # create the network for the pool
+    # the network for the pools
     values = {
         'type': sysinv_constants.NETWORK_TYPE_CLUSTER_HOST,
         'name': sysinv_constants.NETWORK_TYPE_CLUSTER_HOST,
         'dynamic': dynamic_allocation,
-        'pool_uuid': pool.uuid,
     }
-    create_network(client, values, network_name)
+    reconcile_network(client, values, addrpools, addrpool_prefix)
 
 
-def populate_cluster_host_network_secondary(client):
+def get_cluster_host_addrpool_secondary():
     cluster_host_subnet = IPNetwork(CONF.get(
         'BOOTSTRAP_CONFIG', 'CLUSTER_HOST_SUBNET_SECONDARY'))
     start_address = CONF.get('BOOTSTRAP_CONFIG',
@@ -812,11 +1079,7 @@ def populate_cluster_host_network_secondary(client):
                            'CLUSTER_HOST_END_ADDRESS_SECONDARY')
     floating_address = CONF.get('BOOTSTRAP_CONFIG',
                                 'CLUSTER_HOST_FLOATING_ADDRESS_SECONDARY')
-    network_name = sysinv_constants.NETWORK_TYPE_CLUSTER_HOST
-
-    print("Populating secondary cluster host network...")
 
-    # create the address pool
     values = {
         'name': f'cluster-host-subnet-{get_version_text(cluster_host_subnet)}',
         'network': str(cluster_host_subnet.network),
@@ -827,15 +1090,7 @@ def populate_cluster_host_network_secondary(client):
         values.update({
             'floating_address': floating_address,
         })
-
-    pool = create_addrpool(client, values)
-
-    # add the pool to the network
-    values = {
-        'network_uuid': get_network(client, network_name).uuid,
-        'address_pool_uuid': pool.uuid,
-    }
-    create_network_addrpool(client, values)
+    return values
 
 
 def populate_system_controller_network(client):
@@ -869,21 +1124,16 @@ def populate_system_controller_network(client):
     network_name_oam = 'system-controller-oam'
     addrpool_oam_prefix = f'{network_name_oam}-subnet'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name_mgmt, addrpool_prefix)
-        delete_network_and_addrpool(client, network_name_oam, addrpool_oam_prefix)
-        print("Updating system controller network...")
-    else:
-        print("Populating system controller network...")
+    print_network_action("system controller network")
 
-    # create the address pool
+    # the address pools
     values = {
         'name': addrpool_prefix,
         'network': str(system_controller_subnet.network),
         'prefix': system_controller_subnet.prefixlen,
         'floating_address': str(system_controller_floating_ip),
     }
-    mgmt_pool = create_addrpool(client, values)
+    mgmt_addrpools = [values]
 
     values = {
         'name': addrpool_oam_prefix,
@@ -891,24 +1141,22 @@ def populate_system_controller_network(client):
         'prefix': system_controller_oam_subnet.prefixlen,
         'floating_address': str(system_controller_oam_floating_ip),
     }
-    oam_pool = create_addrpool(client, values)
+    oam_addrpools = [values]
 
-    # create the network for the pool
+    # the networks for the pools
     values = {
         'type': sysinv_constants.NETWORK_TYPE_SYSTEM_CONTROLLER,
         'name': sysinv_constants.NETWORK_TYPE_SYSTEM_CONTROLLER,
         'dynamic': False,
-        'pool_uuid': mgmt_pool.uuid,
     }
-    create_network(client, values, network_name_mgmt)
+    reconcile_network(client, values, mgmt_addrpools, addrpool_prefix)
 
     values = {
         'type': sysinv_constants.NETWORK_TYPE_SYSTEM_CONTROLLER_OAM,
         'name': sysinv_constants.NETWORK_TYPE_SYSTEM_CONTROLLER_OAM,
         'dynamic': False,
-        'pool_uuid': oam_pool.uuid,
     }
-    create_network(client, values, network_name_oam)
+    reconcile_network(client, values, oam_addrpools, addrpool_oam_prefix)
 
 
 def populate_cluster_pod_network(client):
@@ -921,57 +1169,43 @@ def populate_cluster_pod_network(client):
     network_name = 'cluster-pod'
     addrpool_prefix = f'{network_name}-subnet'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name, addrpool_prefix)
-        print("Updating cluster pod network...")
-    else:
-        print("Populating cluster pod network...")
+    print_network_action("cluster pod network")
 
-    # create the address pool
+    # the address pool
     values = {
         'name': f'{addrpool_prefix}-{get_version_text(cluster_pod_subnet)}',
         'network': str(cluster_pod_subnet.network),
         'prefix': cluster_pod_subnet.prefixlen,
         'ranges': [(start_address, end_address)],
     }
-    pool = create_addrpool(client, values)
+    addrpools = [values]
+    if has_cluster_pod_network_secondary():
+        print("Populating secondary cluster pod network...")
+        addrpools.append(get_cluster_pod_addrpool_secondary())
 
-    # create the network for the pool
+    # the network for the pools
     values = {
         'type': sysinv_constants.NETWORK_TYPE_CLUSTER_POD,
         'name': sysinv_constants.NETWORK_TYPE_CLUSTER_POD,
         'dynamic': False,
-        'pool_uuid': pool.uuid,
     }
-    create_network(client, values, network_name)
+    reconcile_network(client, values, addrpools, addrpool_prefix)
 
 
-def populate_cluster_pod_network_secondary(client):
+def get_cluster_pod_addrpool_secondary():
     cluster_pod_subnet = IPNetwork(CONF.get(
         'BOOTSTRAP_CONFIG', 'CLUSTER_POD_SUBNET_SECONDARY'))
     start_address = CONF.get('BOOTSTRAP_CONFIG',
                              'CLUSTER_POD_START_ADDRESS_SECONDARY')
     end_address = CONF.get('BOOTSTRAP_CONFIG',
                            'CLUSTER_POD_END_ADDRESS_SECONDARY')
-    network_name = sysinv_constants.NETWORK_TYPE_CLUSTER_POD
 
-    print("Populating secondary cluster pod network...")
-
-    # create the address pool
-    values = {
+    return {
         'name': f'cluster-pod-subnet-{get_version_text(cluster_pod_subnet)}',
         'network': str(cluster_pod_subnet.network),
         'prefix': cluster_pod_subnet.prefixlen,
         'ranges': [(start_address, end_address)],
     }
-    pool = create_addrpool(client, values)
-
-    # add the pool to the network
-    values = {
-        'network_uuid': get_network(client, network_name).uuid,
-        'address_pool_uuid': pool.uuid,
-    }
-    create_network_addrpool(client, values)
 
 
 def populate_cluster_service_network(client):
@@ -984,93 +1218,58 @@ def populate_cluster_service_network(client):
     network_name = 'cluster-service'
     addrpool_prefix = f'{network_name}-subnet'
 
-    if RECONFIGURE_NETWORK or INCOMPLETE_BOOTSTRAP:
-        delete_network_and_addrpool(client, network_name, addrpool_prefix)
-        print("Updating cluster service network...")
-    else:
-        print("Populating cluster service network...")
+    print_network_action("cluster service network")
 
-    # create the address pool
+    # the address pool
     values = {
         'name': f'{addrpool_prefix}-{get_version_text(cluster_service_subnet)}',
         'network': str(cluster_service_subnet.network),
         'prefix': cluster_service_subnet.prefixlen,
         'ranges': [(start_address, end_address)],
     }
-    pool = create_addrpool(client, values)
+    addrpools = [values]
+    if has_cluster_service_network_secondary():
+        print("Populating secondary cluster service network...")
+        addrpools.append(get_cluster_service_addrpool_secondary())
 
-    # create the network for the pool
+    # the network for the pools
     values = {
         'type': sysinv_constants.NETWORK_TYPE_CLUSTER_SERVICE,
         'name': sysinv_constants.NETWORK_TYPE_CLUSTER_SERVICE,
         'dynamic': False,
-        'pool_uuid': pool.uuid,
     }
-    create_network(client, values, network_name)
+    reconcile_network(client, values, addrpools, addrpool_prefix)
 
 
-def populate_cluster_service_network_secondary(client):
+def get_cluster_service_addrpool_secondary():
     cluster_service_subnet = IPNetwork(CONF.get(
         'BOOTSTRAP_CONFIG', 'CLUSTER_SERVICE_SUBNET_SECONDARY'))
     start_address = CONF.get('BOOTSTRAP_CONFIG',
                              'CLUSTER_SERVICE_START_ADDRESS_SECONDARY')
     end_address = CONF.get('BOOTSTRAP_CONFIG',
                            'CLUSTER_SERVICE_END_ADDRESS_SECONDARY')
-    network_name = sysinv_constants.NETWORK_TYPE_CLUSTER_SERVICE
-
-    print("Populating secondary cluster service network...")
 
-    # create the address pool
-    values = {
+    return {
         'name': f'cluster-service-subnet-{get_version_text(cluster_service_subnet)}',
         'network': str(cluster_service_subnet.network),
         'prefix': cluster_service_subnet.prefixlen,
         'ranges': [(start_address, end_address)],
     }
-    pool = create_addrpool(client, values)
-
-    # add the pool to the network
-    values = {
-        'network_uuid': get_network(client, network_name).uuid,
-        'address_pool_uuid': pool.uuid,
-    }
-    create_network_addrpool(client, values)
 
 
 def populate_network_config(client):
     if not INITIAL_POPULATION and not RECONFIGURE_NETWORK:
         return
     populate_mgmt_network(client)
-    if has_mgmt_network_secondary():
-        populate_mgmt_network_secondary(client)
-
     populate_pxeboot_network(client)
-
     populate_oam_network(client)
-    if has_oam_network_secondary():
-        populate_oam_network_secondary(client)
-
     populate_multicast_network(client)
-    if has_multicast_network_secondary():
-        populate_multicast_network_secondary(client)
-
     populate_cluster_host_network(client)
-    if has_cluster_host_network_secondary():
-        populate_cluster_host_network_secondary(client)
-
     populate_cluster_pod_network(client)
-    if has_cluster_pod_network_secondary():
-        populate_cluster_pod_network_secondary(client)
-
     populate_cluster_service_network(client)
-    if has_cluster_service_network_secondary():
-        populate_cluster_service_network_secondary(client)
-
     populate_system_controller_network(client)
     if not is_system_controller():
         populate_admin_network(client)
-    if has_admin_network_secondary() and not is_system_controller():
-        populate_admin_network_secondary(client)
 
     print("Network config completed.")
 
@@ -1094,6 +1293,9 @@ def populate_dns_config(client):
 
 
 def populate_docker_kube_config(client):
+    if not INITIAL_POPULATION and not RECONFIGURE_SERVICE:
+        return
+
     http_proxy = CONF.get('BOOTSTRAP_CONFIG', 'DOCKER_HTTP_PROXY')
     https_proxy = CONF.get('BOOTSTRAP_CONFIG', 'DOCKER_HTTPS_PROXY')
     no_proxy = CONF.get('BOOTSTRAP_CONFIG', 'DOCKER_NO_PROXY')
@@ -1382,6 +1584,9 @@ def populate_docker_kube_config(client):
 
 
 def populate_platform_config(client):
+    if not INITIAL_POPULATION and not RECONFIGURE_SERVICE:
+        return
+
     # Remove old platform config entries that might have
     # been created in the previous failed run.
     parameters = client.sysinv.service_parameter.list()
@@ -1411,6 +1616,13 @@ def populate_platform_config(client):
 
 
 def populate_user_dns_host_records(client):
+    if not INITIAL_POPULATION and not RECONFIGURE_SERVICE:
+        return
+
+    if not CONF.has_section("USER_DNS_HOST_RECORDS"):
+        print("Skipping Populating/Updating user dns host-records...")
+        return
+
     # Remove any previous user DNS entry that have been created in the
     # previous run.
     parameters = client.sysinv.service_parameter.list()
@@ -1438,6 +1650,9 @@ def populate_user_dns_host_records(client):
 
 
 def populate_platform_drbd(client):
+    if not INITIAL_POPULATION and not RECONFIGURE_SERVICE:
+        return
+
     # Get rid of the drbdconfig entries that might have
     # been created in the previous failed run.
     parameters = client.sysinv.service_parameter.list()
@@ -1471,6 +1686,9 @@ def populate_platform_drbd(client):
 def populate_platform_tls_config(client):
     """Populate platform TLS configuration with defaults on fresh install."""
 
+    if not INITIAL_POPULATION and not RECONFIGURE_SERVICE:
+        return
+
     # Clean up any TLS parameters from a previous failed run
     parameters = client.sysinv.service_parameter.list()
     for parameter in parameters:
@@ -1503,19 +1721,6 @@ def populate_platform_tls_config(client):
     print("Platform TLS config completed.")
 
 
-def populate_service_parameter_config(client):
-    if not INITIAL_POPULATION and not RECONFIGURE_SERVICE:
-        return
-    populate_platform_config(client)
-    populate_platform_drbd(client)
-    populate_platform_tls_config(client)
-    populate_docker_kube_config(client)
-    if CONF.has_section("USER_DNS_HOST_RECORDS"):
-        populate_user_dns_host_records(client)
-    else:
-        print("Skipping Populating/Updating user dns host-records...")
-
-
 def get_management_mac_address():
     ifname = CONF.get('BOOTSTRAP_CONFIG', 'MANAGEMENT_INTERFACE')
 
@@ -1729,18 +1934,28 @@ def populate_controller_config(client):
 
 
 def wait_initial_inventory_complete(client, host):
-    for _ in range(SYSTEM_CONFIG_TIMEOUT // 10):
+    def inventoried_host():
         try:
-            host = client.sysinv.ihost.get('controller-0')
-            if host and (host.inv_state ==
-                         sysinv_constants.INV_STATE_INITIAL_INVENTORIED):
-                return host
-        except Exception:
-            pass
-        time.sleep(10)
-    else:
-        raise ConfigFail('Timeout waiting for controller inventory '
-                         'completion')
+            current = client.sysinv.ihost.get('controller-0')
+        except cgts_client.exc.HTTPNotFound:
+            current = None
+        if not current:
+            if host:
+                # It will not come back once deleted
+                raise ConfigFail('Host controller-0 was deleted before '
+                                 'its inventory completed')
+            return None
+        if current.availability == sysinv_constants.AVAILABILITY_FAILED:
+            raise ConfigFail('Host controller-0 failed before its '
+                             'inventory completed')
+        if current.inv_state == sysinv_constants.INV_STATE_INITIAL_INVENTORIED:
+            return current
+        return None
+
+    # sysinv logs all the time while the inventory is collected, so waking
+    # up on its log would defeat the backoff
+    return wait_for('controller inventory completion', inventoried_host,
+                    SYSTEM_CONFIG_TIMEOUT, max_delay=10)
 
 
 def inventory_config_complete_wait(client, controller):
@@ -1751,6 +1966,76 @@ def inventory_config_complete_wait(client, controller):
     wait_initial_inventory_complete(client, controller)
 
 
+# Population phases with the phases they depend on. The phases that do not
+# depend on each other are run at the same time.
+POPULATE_PHASES = [
+    ('system', populate_system_config, []),
+    ('network', populate_network_config, ['system']),
+    ('dns', populate_dns_config, ['system']),
+    ('platform', populate_platform_config, ['system']),
+    ('drbd', populate_platform_drbd, ['system']),
+    ('tls', populate_platform_tls_config, ['system']),
+    ('docker-kube', populate_docker_kube_config, ['system']),
+    ('dns-host-records', populate_user_dns_host_records, ['system']),
+]
+
+# Phases run at the same time, to limit the concurrent requests to sysinv
+MAX_CONCURRENT_PHASES = 4
+
+
+def run_phase(function, client):
+    start = time.time()
+    function(client)
+    return time.time() - start
+
+
+def run_phases(client, phases, max_workers=MAX_CONCURRENT_PHASES):
+    """Run each phase once the phases it depends on are completed
+
+    Returns the duration of each phase. After a failure, the phases not
+    started yet are skipped and the error is raised once the running ones
+    have ended.
+    """
+
+    functions = dict((name, function) for name, function, _ in phases)
+    pending = dict((name, set(requires)) for name, _, requires in phases)
+    running = {}
+    durations = {}
+    error = None
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        while pending or running:
+            if error is None:
+                for name in [name for name, requires in pending.items()
+                             if not requires]:
+                    del pending[name]
+                    future = executor.submit(run_phase, functions[name],
+                                             client)
+                    running[future] = name
+            if not running:
+                if error is None:
+                    error = ConfigFail('Unknown or circular dependencies '
+                                       'of phases %s' % ', '.join(pending))
+                break
+
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    durations[name] = future.result()
+                except Exception as e:
+                    print("Phase %s failed: %s" % (name, e))
+                    error = error or e
+                    continue
+                print("Phase %s completed in %.1f seconds." %
+                      (name, durations[name]))
+                for requires in pending.values():
+                    requires.discard(name)
+    if error:
+        raise error
+    return durations
+
+
 def handle_invalid_input():
     raise Exception("Invalid input!\nUsage: <bootstrap-config-file> "
                     "[--system] [--network] [--service]")
@@ -1788,10 +2073,9 @@ if __name__ == '__main__':
 
     try:
         client = CgtsClient()
-        populate_system_config(client)
-        populate_network_config(client)
-        populate_dns_config(client)
-        populate_service_parameter_config(client)
+        # Before the phases share it
+        wait_sysinv_client(client)
+        run_phases(client, POPULATE_PHASES)
         controller = populate_controller_config(client)
         inventory_config_complete_wait(client, controller)
         os.remove(config_file)
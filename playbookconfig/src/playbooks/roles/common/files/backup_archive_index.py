@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Create and read platform backup archives with a member offset index.
+
+The archive is a regular tar stream compressed as a sequence of independent
+gzip members, one per block, so plain tar/gzip/pigz can still read it. The
+sidecar index (<archive>.idx) records where every block starts in both the
+compressed and the uncompressed stream, plus the path, size, mtime and header
+offset of every tar member. With it, a single member can be extracted by
+seeking to the enclosing block instead of decompressing the whole archive.
+
+Usage:
+  backup_archive_index.py create -f ARCHIVE [--exclude PATTERN]... TARGET...
+  backup_archive_index.py extract -f ARCHIVE -C DIR [--flatten] PATTERN...
+"""
+
+from argparse import ArgumentParser
+import bisect
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+import glob
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import zlib
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_COMPRESS_LEVEL = 6
+READ_SIZE = 1024 * 1024
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+TAR_EXTRACT_CMD = ["tar", "--use-compress-program=pigz"]
+
+
+def index_path_for(archive):
+    """Return the default sidecar index path of an archive"""
+
+    return archive + INDEX_SUFFIX
+
+
+class BlockCompressor(object):
+    """Compress a byte stream as independent gzip members, one per block.
+
+    Blocks are compressed concurrently and written in order. The offsets of
+    every block are kept in self.blocks as [uncompressed, compressed] pairs.
+    """
+
+    def __init__(self, fileobj, block_size=DEFAULT_BLOCK_SIZE, workers=1,
+                 level=DEFAULT_COMPRESS_LEVEL):
+        self.fileobj = fileobj
+        self.block_size = block_size
+        self.level = level
+        self.blocks = []
+        self.uncompressed_size = 0
+        self.compressed_size = 0
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._max_pending = max(1, workers) * 2
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._submit(block)
+
+    def _submit(self, block):
+        self.blocks.append([self.uncompressed_size, None])
+        self.uncompressed_size += len(block)
+        self._pending.append(
+            self._executor.submit(gzip.compress, block, self.level))
+        while len(self._pending) > self._max_pending:
+            self._write_next()
+
+    def _write_next(self):
+        compressed = self._pending.popleft().result()
+        done = len(self.blocks) - len(self._pending) - 1
+        self.blocks[done][1] = self.compressed_size
+        self.fileobj.write(compressed)
+        self.compressed_size += len(compressed)
+
+    def close(self):
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+        while self._pending:
+            self._write_next()
+        self._executor.shutdown()
+
+
+class _TeeReader(object):
+    """File-like reader that copies everything it reads into a sink"""
+
+    def __init__(self, fileobj, sink):
+        self.fileobj = fileobj
+        self.sink = sink
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        if data:
+            self.sink.write(data)
+        return data
+
+
+class _BlockReader(object):
+    """File-like reader over a multi-member gzip stream.
+
+    The underlying file must be positioned at the start of a gzip member;
+    the first skip bytes of decompressed data are discarded.
+    """
+
+    def __init__(self, fileobj, skip=0):
+        self.fileobj = fileobj
+        self._skip = skip
+        self._buffer = bytearray()
+        self._decompressor = zlib.decompressobj(GZIP_WBITS)
+
+    def _fill(self):
+        data = self.fileobj.read(READ_SIZE)
+        if not data:
+            return False
+        while data:
+            self._buffer += self._decompressor.decompress(data)
+            if not self._decompressor.eof:
+                break
+            data = self._decompressor.unused_data
+            self._decompressor = zlib.decompressobj(GZIP_WBITS)
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < self._skip + size:
+            if not self._fill():
+                break
+        if self._skip:
+            skipped = min(self._skip, len(self._buffer))
+            del self._buffer[:skipped]
+            self._skip -= skipped
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def build_index(tar_stream, compressor):
+    """Compress a tar stream while recording the offset of every member"""
+
+    members = []
+    reader = _TeeReader(tar_stream, compressor)
+    with tarfile.open(fileobj=reader, mode="r|", bufsize=READ_SIZE) as tar:
+        for member in tar:
+            members.append({
+                "name": member.name,
+                "size": member.size,
+                "mtime": member.mtime,
+                "offset": member.offset,
+            })
+            # Streaming mode keeps every member otherwise
+            tar.members = []
+    # Copy the end-of-archive padding tarfile does not need to read
+    while reader.read(READ_SIZE):
+        pass
+    compressor.close()
+    return {
+        "version": INDEX_VERSION,
+        "archive_size": compressor.compressed_size,
+        "blocks": compressor.blocks,
+        "members": members,
+    }
+
+
+def write_index(index, index_path):
+    """Atomically write the sidecar index"""
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.rename(tmp_path, index_path)
+
+
+def load_index(archive, index_path=None):
+    """Load the sidecar index of an archive.
+
+    Returns None if there is no index or it does not describe this archive.
+    """
+
+    if index_path is None:
+        # The staged archive may be a link to the original backup file
+        index_path = index_path_for(archive)
+        if not os.path.exists(index_path):
+            index_path = index_path_for(os.path.realpath(archive))
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    if index.get("archive_size") != os.path.getsize(archive):
+        return None
+    return index
+
+
+def expand_targets(targets):
+    """Expand plain paths or globs, dropping the ones that do not exist"""
+
+    expanded = []
+    for target in targets:
+        expanded.extend(sorted(glob.glob(target)))
+    return expanded
+
+
+def create_archive(archive, targets, excludes=None, index_path=None,
+                   workers=1, block_size=DEFAULT_BLOCK_SIZE):
+    """Create an indexed archive of targets and return the tar exit code"""
+
+    cmd = ["tar"]
+    for exclude in excludes or []:
+        cmd += ["--exclude", exclude]
+    cmd += ["-cf", "-"] + expand_targets(targets)
+
+    with open(archive, "wb") as f, \
+            subprocess.Popen(cmd, stdout=subprocess.PIPE) as p:
+        compressor = BlockCompressor(f, block_size=block_size,
+                                     workers=workers)
+        index = build_index(p.stdout, compressor)
+    if p.returncode < 2:
+        write_index(index, index_path or index_path_for(archive))
+    return p.returncode
+
+
+def find_members(index, patterns):
+    """Return the index entries matching any of the patterns"""
+
+    return [m for m in index["members"]
+            if any(fnmatch(m["name"], p) for p in patterns)]
+
+
+def extract_member(archive, index, member, dest_dir, flatten=False):
+    """Extract one member by seeking to the block that contains it"""
+
+    starts = [b[0] for b in index["blocks"]]
+    block = index["blocks"][bisect.bisect_right(starts, member["offset"]) - 1]
+    with open(archive, "rb") as f:
+        f.seek(block[1])
+        reader = _BlockReader(f, skip=member["offset"] - block[0])
+        with tarfile.open(fileobj=reader, mode="r|") as tar:
+            tarinfo = tar.next()
+            if flatten:
+                tarinfo.name = os.path.basename(tarinfo.name)
+            kwargs = {}
+            if hasattr(tarfile, "fully_trusted_filter"):
+                kwargs["filter"] = "fully_trusted"
+            tar.extract(tarinfo, path=dest_dir, **kwargs)
+    return tarinfo.name
+
+
+def extract(archive, dest_dir, patterns, flatten=False, index_path=None):
+    """Extract the members matching patterns and return an exit code.
+
+    Without a usable index this falls back to a full tar extraction.
+    """
+
+    index = load_index(archive, index_path)
+    if index is None:
+        cmd = TAR_EXTRACT_CMD + ["-C", dest_dir, "-xpf", archive, "--wildcards"]
+        if flatten:
+            cmd.append("--transform=s,.*/,,")
+        return subprocess.call(cmd + patterns)
+
+    members = find_members(index, patterns)
+    if not members:
+        print("No member of {} matches {}".format(archive, patterns),
+              file=sys.stderr)
+        return 2
+    for member in members:
+        print(extract_member(archive, index, member, dest_dir, flatten))
+    return 0
+
+
+def main(argv=None):
+    parser = ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    create_parser = subparsers.add_parser("create")
+    create_parser.add_argument("-f", "--file", required=True)
+    create_parser.add_argument("--index")
+    create_parser.add_argument("--exclude", action="append", default=[])
+    create_parser.add_argument("--workers", type=int, default=1)
+    create_parser.add_argument("--block-size", type=int,
+                               default=DEFAULT_BLOCK_SIZE)
+    create_parser.add_argument("targets", nargs="+")
+
+    extract_parser = subparsers.add_parser("extract")
+    extract_parser.add_argument("-f", "--file", required=True)
+    extract_parser.add_argument("-C", "--directory", default=".")
+    extract_parser.add_argument("--index")
+    extract_parser.add_argument("--flatten", action="store_true")
+    extract_parser.add_argument("patterns", nargs="+")
+
+    args = parser.parse_args(argv)
+    # Exit codes follow tar: 1 means some files changed while being read
+    try:
+        if args.command == "create":
+            return create_archive(args.file, args.targets, args.exclude,
+                                  args.index, args.workers, args.block_size)
+        return extract(args.file, args.directory, args.patterns,
+                       args.flatten, args.index)
+    except Exception as e:
+        print("Error: {}".format(e), file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
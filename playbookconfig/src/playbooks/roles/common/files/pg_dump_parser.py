@@ -0,0 +1,353 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Streaming parser for plain SQL postgres dumps.
+
+Shared by the restore helpers that read the sysinv dump of a backup. The
+dump is read line by line and only the statements of the requested tables
+are buffered, so every table a caller needs is extracted in a single pass
+with memory bounded by the largest statement of those tables.
+
+Understands the data formats written by pg_dump (one INSERT per row,
+multi-row INSERT statements and COPY ... FROM stdin blocks) as well as
+standard ('...') and escape (E'...') string constants.
+
+Values are returned decoded: NULL becomes None and everything else a str
+holding the value as postgres would store it.
+"""
+
+import re
+
+# Quote state while scanning a statement
+_STANDARD = "'"
+_ESCAPE = "E"
+
+_TOP_LEVEL_RE = re.compile(r"[';]|--")
+_ESCAPE_STRING_RE = re.compile(r"\\.|'", re.S)
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | [Ee]'(?P<estring>(?:[^'\\]|''|\\.)*)'
+  | '(?P<string>(?:[^']|'')*)'
+  | (?P<cast>::\s*[A-Za-z_][\w.]*(?:\[\])?)
+  | (?P<word>[A-Za-z_][\w$.]*)
+  | (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<op>.)
+""", re.S | re.X)
+
+_STATEMENT_TABLE_RE = re.compile(
+    r'(?:INSERT\s+INTO|COPY)\s+(?:"?public"?\.)?"?(\w+)"?', re.I)
+
+_BACKSLASH_ESCAPES = {'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r',
+                      't': '\t', 'v': '\v'}
+_STRING_ESCAPE_RE = re.compile(
+    r"''|\\(x[0-9a-fA-F]{1,2}|[0-7]{1,3}|u[0-9a-fA-F]{4}"
+    r"|U[0-9a-fA-F]{8}|.)", re.S)
+_COPY_ESCAPE_RE = re.compile(r"\\(x[0-9a-fA-F]{1,2}|[0-7]{1,3}|.)", re.S)
+
+COPY_NULL = '\\N'
+COPY_END = '\\.'
+
+
+def _unescape(match):
+    code = match.group(1)
+    if code is None:
+        return "'"
+    if code[0] in 'xuU' and len(code) > 1:
+        return chr(int(code[1:], 16))
+    if code[0] in '01234567':
+        return chr(int(code, 8))
+    return _BACKSLASH_ESCAPES.get(code, code)
+
+
+def decode_copy_field(field):
+    """Decode one field of a COPY data line"""
+
+    if field == COPY_NULL:
+        return None
+    return _COPY_ESCAPE_RE.sub(_unescape, field)
+
+
+def tokenize(text):
+    """Yield (kind, value) tokens of an SQL fragment.
+
+    Kinds are 'string', 'word', 'number' and 'op'. String constants are
+    decoded, casts and whitespace are dropped.
+    """
+
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind in ('space', 'cast'):
+            continue
+        value = match.group(kind)
+        if kind == 'estring':
+            yield 'string', _STRING_ESCAPE_RE.sub(_unescape, value)
+        elif kind == 'string':
+            yield kind, value.replace("''", "'")
+        else:
+            yield kind, value
+
+
+def _token_value(kind, value):
+    if kind == 'word' and value.upper() == 'NULL':
+        return None
+    return value
+
+
+def parse_value(text):
+    """Decode a single SQL value such as 'a''b', E'a\\nb', 42 or NULL"""
+
+    tokens = list(tokenize(text))
+    if len(tokens) == 1:
+        return _token_value(*tokens[0])
+    return text.strip()
+
+
+def parse_rows(text):
+    """Parse the VALUES list of an INSERT into rows of decoded values.
+
+    Accepts single and multi-row INSERT statements; text before the first
+    opening parenthesis is ignored.
+    """
+
+    rows = []
+    row = None
+    parts = []
+    depth = 0
+    for kind, value in tokenize(text):
+        if kind == 'op' and value == '(':
+            depth += 1
+            if depth == 1:
+                row = []
+                continue
+        elif kind == 'op' and value == ')':
+            depth -= 1
+            if depth == 0:
+                row.append(_join_parts(parts))
+                rows.append(row)
+                parts = []
+                continue
+        elif kind == 'op' and value == ',' and depth == 1:
+            row.append(_join_parts(parts))
+            parts = []
+            continue
+        if depth > 0:
+            parts.append((kind, value))
+    return rows
+
+
+def _join_parts(parts):
+    if len(parts) == 1:
+        return _token_value(*parts[0])
+    return ''.join(value for _, value in parts)
+
+
+def iter_updates(statement):
+    """Yield (table, assignments, conditions) for UPDATE commands.
+
+    Handles "update TABLE set COL=VALUE, ... where COL=VALUE and ..."; a
+    new command starts at every "update" keyword so that commands missing
+    their terminating semicolon are still split.
+    """
+
+    command = None
+    section = None
+    column = None
+    for kind, value in tokenize(statement):
+        keyword = value.lower() if kind == 'word' else None
+        if keyword == 'update':
+            if command and command[0]:
+                yield command
+            command = [None, {}, {}]
+            section = None
+        elif command is None:
+            continue
+        elif command[0] is None and kind == 'word':
+            command[0] = value.split('.')[-1]
+        elif keyword == 'set':
+            section = command[1]
+        elif keyword == 'where':
+            section = command[2]
+        elif keyword == 'and' or (kind == 'op' and value in ',;'):
+            column = None
+        elif kind == 'op' and value == '=':
+            continue
+        elif section is not None:
+            if column is None:
+                column = value
+            else:
+                section[column] = _token_value(kind, value)
+                column = None
+    if command and command[0]:
+        yield command
+
+
+def _scan(line, pos, quote):
+    """Scan line from pos, tracking the quote state.
+
+    Returns the position after the first top-level semicolon (or -1 when
+    the statement goes on) together with the quote state at that point.
+    """
+
+    end = len(line)
+    while pos < end:
+        if quote == _STANDARD:
+            i = line.find("'", pos)
+            if i < 0:
+                return -1, quote
+            if line.startswith("'", i + 1):
+                pos = i + 2
+                continue
+            quote = None
+            pos = i + 1
+        elif quote == _ESCAPE:
+            match = _ESCAPE_STRING_RE.search(line, pos)
+            if not match:
+                return -1, quote
+            pos = match.end()
+            if match.group() == "'":
+                if line.startswith("'", pos):
+                    pos += 1
+                else:
+                    quote = None
+        else:
+            match = _TOP_LEVEL_RE.search(line, pos)
+            if not match:
+                return -1, None
+            if match.group() == ';':
+                return match.end(), None
+            if match.group() == '--':
+                return -1, None
+            i = match.start()
+            if i > 0 and line[i - 1] in 'Ee' and \
+                    (i == 1 or not (line[i - 2].isalnum() or
+                                    line[i - 2] == '_')):
+                quote = _ESCAPE
+            else:
+                quote = _STANDARD
+            pos = i + 1
+    return -1, quote
+
+
+def _iter_chunks(lines, keep=None):
+    """Split dump lines into statements and COPY data.
+
+    Yields ('sql', statement) for every statement keep() accepts (all of
+    them when keep is None) and ('copy', table, line) for every data line
+    of an accepted COPY block. Statements that are not kept are scanned
+    but never buffered.
+    """
+
+    buffer = None
+    wanted = kept = False
+    quote = None
+    copy_table = None
+    copy_kept = False
+    for line in lines:
+        if copy_table is not None:
+            if line.startswith(COPY_END):
+                copy_table = None
+            elif copy_kept:
+                yield 'copy', copy_table, line.rstrip('\n')
+            continue
+
+        pos = 0
+        while pos < len(line):
+            if buffer is None:
+                rest = line[pos:].lstrip()
+                if not rest or rest.startswith('--'):
+                    break
+                pos = len(line) - len(rest)
+                buffer = []
+                wanted = keep is None or keep(rest)
+                # COPY headers are always read to know where data ends
+                kept = wanted or rest[:5].upper() == 'COPY '
+
+            end, quote = _scan(line, pos, quote)
+            if end < 0:
+                if kept:
+                    buffer.append(line[pos:])
+                break
+
+            statement = None
+            if kept:
+                buffer.append(line[pos:end])
+                statement = ''.join(buffer)
+            buffer = None
+            pos = end
+            if statement is None:
+                continue
+            if statement[:5].upper() == 'COPY ' and \
+                    statement.rstrip(' ;').lower().endswith('from stdin'):
+                copy_table = _statement_table(statement)
+                copy_kept = wanted
+                break
+            if wanted:
+                yield 'sql', statement
+
+    if buffer and wanted:
+        statement = ''.join(buffer)
+        if statement.strip():
+            yield 'sql', statement
+
+
+def _statement_table(statement):
+    match = _STATEMENT_TABLE_RE.match(statement)
+    return match.group(1) if match else None
+
+
+def iter_statements(lines):
+    """Yield the SQL statements of a dump, skipping comments and COPY data.
+
+    The final statement is returned even without its semicolon.
+    """
+
+    for chunk in _iter_chunks(lines):
+        if chunk[0] == 'sql':
+            yield chunk[1]
+
+
+def iter_rows(lines, tables):
+    """Yield (table, values) for every row of the given tables.
+
+    A single pass over the dump handles INSERT statements and COPY blocks;
+    statements of other tables are skipped without being buffered.
+
+    :param lines: iterable of dump lines, usually an open file
+    :param tables: names of the tables to read, without schema
+    """
+
+    tables = set(tables)
+
+    def keep(statement):
+        return _statement_table(statement) in tables
+
+    for chunk in _iter_chunks(lines, keep):
+        if chunk[0] == 'copy':
+            yield chunk[1], [decode_copy_field(f)
+                             for f in chunk[2].split('\t')]
+            continue
+        statement = chunk[1]
+        table = _statement_table(statement)
+        if statement[:6].upper() != 'INSERT' or table not in tables:
+            continue
+        values = re.search(r'\bVALUES\b', statement, re.I)
+        if not values:
+            continue
+        for row in parse_rows(statement[values.end():]):
+            yield table, row
+
+
+def read_tables(path, tables):
+    """Read the rows of several tables of a dump file in one pass.
+
+    Returns a dict mapping every requested table to its list of rows.
+    """
+
+    result = dict((t, []) for t in tables)
+    with open(path) as f:
+        for table, row in iter_rows(f, tables):
+            result[table].append(row)
+    return result
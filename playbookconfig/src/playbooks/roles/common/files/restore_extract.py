@@ -0,0 +1,218 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Extract a restore plan from a backup archive in a single pass.
+
+The plan is a JSON list of entries:
+
+  name      key of the entry in the report
+  patterns  member names or shell wildcards, matched like tar --wildcards
+            does: '*' also matches '/' and a pattern matching a directory
+            matches everything under it
+  regex     optional regular expression searched in the member names,
+            like "tar -tf | grep"
+  dest      directory to extract the matching members into; entries
+            without dest only report whether the archive has them
+  flatten   extract without the leading directories, like
+            --transform='s,.*/,,'
+  required  fail if one of the patterns matches nothing, like tar does
+  enabled   entries set to false are ignored
+
+The archive is read once, as a stream, and every member is extracted to
+the destination of each entry it matches, overwriting existing files.
+A JSON report with the number of members and bytes matched by each entry
+is printed on stdout.
+
+Usage:
+  restore_extract.py -f ARCHIVE --plan PLAN
+"""
+
+from argparse import ArgumentParser
+import copy
+from fnmatch import fnmatchcase
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import time
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+DECOMPRESS_CMDS = [['pigz', '-dc'], ['gzip', '-dc']]
+
+
+class PlanEntry(object):
+
+    def __init__(self, entry):
+        self.name = entry['name']
+        self.patterns = entry.get('patterns') or []
+        self.regex = re.compile(entry['regex']) if entry.get('regex') else None
+        self.dest = entry.get('dest')
+        self.flatten = bool(entry.get('flatten'))
+        self.required = bool(entry.get('required'))
+        self.matched = 0
+        self.bytes = 0
+        self.unmatched = set(self.patterns)
+
+    def match(self, name):
+        found = False
+        for pattern in self.patterns:
+            if fnmatchcase(name, pattern) or \
+                    fnmatchcase(name, pattern.rstrip('/') + '/*'):
+                self.unmatched.discard(pattern)
+                found = True
+        if self.regex is not None and self.regex.search(name):
+            found = True
+        return found
+
+    def target_name(self, name):
+        return os.path.basename(name) if self.flatten else name
+
+    def report(self):
+        result = {'matched': self.matched, 'bytes': self.bytes}
+        if self.dest:
+            result['dest'] = self.dest
+        return result
+
+
+def load_plan(path):
+    with open(path) as f:
+        plan = json.load(f)
+    return [PlanEntry(entry) for entry in plan
+            if entry.get('enabled', True) not in (False, 'False', 'false')]
+
+
+def open_archive(archive):
+    """Return (tarfile, process) reading the archive as a stream.
+
+    gzip archives are decompressed by pigz (or gzip) in a separate
+    process, anything else is left to tarfile.
+    """
+
+    with open(archive, 'rb') as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        for cmd in DECOMPRESS_CMDS:
+            if shutil.which(cmd[0]):
+                proc = subprocess.Popen(cmd + [archive],
+                                        stdout=subprocess.PIPE)
+                return tarfile.open(fileobj=proc.stdout, mode='r|'), proc
+    return tarfile.open(archive, mode='r|*'), None
+
+
+def _remove_existing(target, member):
+    # Like tar --overwrite: replace files, keep existing directories
+    if os.path.islink(target) or \
+            (os.path.lexists(target) and not os.path.isdir(target)):
+        os.unlink(target)
+    elif os.path.isdir(target) and not member.isdir():
+        shutil.rmtree(target)
+
+
+class Extractor(object):
+
+    def __init__(self, tar):
+        self.tar = tar
+        self.directories = []
+        self.kwargs = {}
+        if hasattr(tarfile, 'fully_trusted_filter'):
+            self.kwargs['filter'] = 'fully_trusted'
+
+    def extract(self, member, dest, name, source=None):
+        """Extract member as dest/name, or copy it from an earlier target"""
+
+        target = os.path.join(dest, name)
+        directory = os.path.dirname(target)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        _remove_existing(target, member)
+        if source is not None and member.isfile():
+            # The member data was already read from the stream
+            shutil.copy2(source, target)
+            self.tar.chown(member, target, False)
+            return target
+        if name != member.name:
+            member = copy.copy(member)
+            member.name = name
+        if member.isdir():
+            # Attributes of directories are set at the end, as tar does
+            self.tar.extract(member, dest, set_attrs=False, **self.kwargs)
+            self.directories.append((member, target))
+        else:
+            self.tar.extract(member, dest, **self.kwargs)
+        return target
+
+    def finish(self):
+        for member, target in reversed(self.directories):
+            self.tar.chown(member, target, False)
+            self.tar.chmod(member, target)
+            self.tar.utime(member, target)
+
+
+def run_plan(archive, entries):
+    """Apply the plan in one pass over the archive and return the report"""
+
+    start = time.time()
+    members = 0
+    tar, proc = open_archive(archive)
+    extractor = Extractor(tar)
+    with tar:
+        for member in tar:
+            members += 1
+            first_target = None
+            for entry in entries:
+                if not entry.match(member.name):
+                    continue
+                entry.matched += 1
+                entry.bytes += member.size
+                if not entry.dest:
+                    continue
+                target = extractor.extract(member, entry.dest,
+                                           entry.target_name(member.name),
+                                           first_target)
+                if first_target is None and member.isfile():
+                    first_target = target
+        extractor.finish()
+    if proc is not None:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise Exception('Could not decompress %s' % archive)
+
+    missing = ['%s: %s' % (entry.name, pattern)
+               for entry in entries if entry.required
+               for pattern in sorted(entry.unmatched)]
+    return {
+        'archive': archive,
+        'members': members,
+        'elapsed': round(time.time() - start, 3),
+        'entries': dict((entry.name, entry.report()) for entry in entries),
+        'missing': missing,
+    }
+
+
+def main(argv=None):
+    parser = ArgumentParser()
+    parser.add_argument('-f', '--file', required=True)
+    parser.add_argument('--plan', required=True)
+    args = parser.parse_args(argv)
+
+    # Exit codes follow tar: 2 for missing members and other errors
+    try:
+        report = run_plan(args.file, load_plan(args.plan))
+    except Exception as e:
+        print('Error: {}'.format(e), file=sys.stderr)
+        return 2
+    print(json.dumps(report, indent=2))
+    for missing in report['missing']:
+        print('Not found in archive: {}'.format(missing), file=sys.stderr)
+    return 2 if report['missing'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
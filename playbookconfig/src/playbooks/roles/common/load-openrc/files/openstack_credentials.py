@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Platform credentials shared by the helper scripts.
+#
+# /etc/platform/openrc is parsed in-process instead of being sourced by a
+# bash child, the admin password being read from the keyring like openrc
+# does. A project scoped Keystone token is issued with these credentials
+# and saved, with its service catalog, in a cache directory only readable
+# by root, so that the scripts run later in the same playbook reuse it
+# until it is about to expire instead of authenticating again.
+#
+# The cache is used when OS_TOKEN_CACHE names its directory. Entries are
+# keyed by the credentials, so a changed password or auth URL gets a new
+# token. Scripts that change the service catalog must invalidate it.
+#
+# The scripts using it are run with its directory in PYTHONPATH, see
+# install_credentials_helper.yml.
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import ssl
+import subprocess
+import sys
+import tempfile
+import urllib.request
+
+OPENRC = '/etc/platform/openrc'
+
+TOKEN_CACHE_ENV = 'OS_TOKEN_CACHE'
+
+# A cached token is reused only if it stays valid for this long, as the
+# scripts keep using it while they run
+EXPIRY_MARGIN = 1800
+
+KEYRING_SERVICE = 'CGCS'
+
+REQUIRED = ['OS_AUTH_URL', 'OS_USERNAME', 'OS_PASSWORD', 'OS_PROJECT_NAME']
+
+_ASSIGNMENT = re.compile(r'^(?:export\s+)?(OS_\w+)=(.*)$')
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+def _is_command(value):
+    return '`' in value or '$(' in value
+
+
+def parse_openrc(text, keyring_get=None):
+    """OS_* variables assigned by an openrc file, without running it
+
+    Values computed by a command are skipped, except OS_PASSWORD which
+    openrc reads from the keyring and which is read from it here too.
+    """
+
+    env = {}
+    password_command = False
+    for line in text.splitlines():
+        match = _ASSIGNMENT.match(line.strip())
+        if not match:
+            continue
+        key, value = match.group(1), _unquote(match.group(2))
+        if _is_command(value):
+            password_command = password_command or key == 'OS_PASSWORD'
+            continue
+        env[key] = value
+
+    if password_command and 'OS_USERNAME' in env:
+        if keyring_get is None:
+            import keyring
+            keyring_get = keyring.get_password
+        password = keyring_get(KEYRING_SERVICE, env['OS_USERNAME'])
+        if password:
+            env['OS_PASSWORD'] = str(password)
+    return env
+
+
+def source_openrc(path=OPENRC):
+    # Fallback for an openrc the parser does not understand
+    env = {}
+    with open(os.devnull, "w") as fnull:
+        proc = subprocess.Popen(
+            ['bash', '-c', 'source %s && env' % path],
+            stdout=subprocess.PIPE, stderr=fnull,
+            universal_newlines=True)
+    for line in proc.stdout:
+        key, _, value = line.partition("=")
+        if key.startswith('OS_'):
+            env[key] = value.strip()
+    proc.communicate()
+    return env
+
+
+def load_openrc(path=OPENRC):
+    """OS_* variables of openrc"""
+
+    try:
+        with open(path) as f:
+            env = parse_openrc(f.read())
+    except (IOError, OSError):
+        env = {}
+    if not all(env.get(key) for key in REQUIRED):
+        env = source_openrc(path)
+    return env
+
+
+def conf_from_openrc(env):
+    """openrc variables as the "conf" dict of the helper clients"""
+
+    return dict((key[3:].lower(), value) for key, value in env.items())
+
+
+class Token(object):
+    """A Keystone token and the body it was issued with"""
+
+    def __init__(self, token_id, body):
+        self.id = token_id
+        self.body = body
+
+    @property
+    def expires_at(self):
+        expires = self.body['token']['expires_at']
+        return datetime.datetime.strptime(
+            re.sub(r'\.\d+', '', expires).replace('Z', '+0000'),
+            '%Y-%m-%dT%H:%M:%S%z')
+
+    def valid(self, margin=EXPIRY_MARGIN, now=None):
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        return (self.expires_at - now).total_seconds() > margin
+
+    def endpoint(self, service_type, interface='internal', region=None):
+        """URL of a service in the catalog of the token"""
+
+        for service in self.body['token'].get('catalog') or []:
+            if service.get('type') != service_type:
+                continue
+            for endpoint in service.get('endpoints') or []:
+                if endpoint.get('interface') != interface:
+                    continue
+                if region and region not in (endpoint.get('region'),
+                                             endpoint.get('region_id')):
+                    continue
+                return endpoint['url']
+        raise LookupError("No %s endpoint of service %s in region %s"
+                          % (interface, service_type, region))
+
+    def to_dict(self):
+        return {'id': self.id, 'body': self.body}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['id'], data['body'])
+
+
+class TokenCache(object):
+    """Tokens saved in a directory only readable by root"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def key(env):
+        fields = [env.get(k, '') for k in (
+            'OS_AUTH_URL', 'OS_USERNAME', 'OS_PASSWORD', 'OS_PROJECT_NAME',
+            'OS_USER_DOMAIN_NAME', 'OS_PROJECT_DOMAIN_NAME',
+            'OS_REGION_NAME')]
+        return hashlib.sha256('\0'.join(fields).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, 'token-%s.json' % key)
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                token = Token.from_dict(json.load(f))
+            if token.valid():
+                return token
+        except (IOError, OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def put(self, key, token):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        os.chmod(self.directory, 0o700)
+        # mkstemp creates the file with mode 0600
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.token-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(token.to_dict(), f)
+            os.rename(tmp, self._path(key))
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+    def clear(self):
+        try:
+            names = os.listdir(self.directory)
+        except (IOError, OSError):
+            return
+        for name in names:
+            if name.startswith('token-'):
+                os.unlink(os.path.join(self.directory, name))
+
+
+def issue_token(env, timeout=60):
+    """Authenticate with the openrc credentials"""
+
+    auth_url = env['OS_AUTH_URL'].rstrip('/')
+    if not auth_url.endswith('/v3'):
+        auth_url += '/v3'
+    request = {'auth': {
+        'identity': {
+            'methods': ['password'],
+            'password': {'user': {
+                'name': env['OS_USERNAME'],
+                'password': env['OS_PASSWORD'],
+                'domain': {'name': env.get('OS_USER_DOMAIN_NAME',
+                                           'Default')}}}},
+        'scope': {'project': {
+            'name': env['OS_PROJECT_NAME'],
+            'domain': {'name': env.get('OS_PROJECT_DOMAIN_NAME',
+                                       'Default')}}}}}
+    context = None
+    if auth_url.startswith('https'):
+        context = ssl.create_default_context(cafile=env.get('OS_CACERT'))
+    req = urllib.request.Request(
+        auth_url + '/auth/tokens', data=json.dumps(request).encode(),
+        headers={'Content-Type': 'application/json',
+                 'Accept': 'application/json'})
+    with urllib.request.urlopen(req, timeout=timeout,
+                                context=context) as resp:
+        return Token(resp.headers['X-Subject-Token'],
+                     json.loads(resp.read().decode()))
+
+
+def _cache(cache_dir=None):
+    cache_dir = cache_dir or os.environ.get(TOKEN_CACHE_ENV)
+    return TokenCache(cache_dir) if cache_dir else None
+
+
+def get_token(env=None, cache_dir=None):
+    """A valid token for the openrc credentials, from the cache if any"""
+
+    env = env or load_openrc()
+    cache = _cache(cache_dir)
+    key = TokenCache.key(env)
+    token = cache.get(key) if cache else None
+    if token is None:
+        token = issue_token(env)
+        if cache:
+            try:
+                cache.put(key, token)
+            except (IOError, OSError) as e:
+                # Not run as root, the next script authenticates again
+                print("Keystone token not cached: %s" % e, file=sys.stderr)
+    return token
+
+
+def invalidate(cache_dir=None):
+    """Drop the cached tokens, e.g. after the catalog was changed"""
+
+    cache = _cache(cache_dir)
+    if cache:
+        cache.clear()
+
+
+def sysinv_endpoint(token, env=None, interface='internal'):
+    env = env or load_openrc()
+    return token.endpoint('platform', interface, env.get('OS_REGION_NAME'))
+
+
+def keystone_session(token=None):
+    """keystoneauth1 session authenticated with the token"""
+
+    from keystoneauth1 import access
+    from keystoneauth1 import session
+    from keystoneauth1.identity import access as access_plugin
+
+    token = token or get_token()
+    auth_ref = access.create(body=token.body, auth_token=token.id)
+    return session.Session(auth=access_plugin.AccessInfoPlugin(auth_ref))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load the platform credentials")
+    parser.add_argument('--openrc', default=OPENRC)
+    subparsers = parser.add_subparsers(dest='action')
+    subparsers.required = True
+    env_parser = subparsers.add_parser(
+        'env', help="Print the openrc variables as JSON")
+    env_parser.add_argument(
+        '--token', action='store_true',
+        help="Add a token to the variables")
+    subparsers.add_parser('invalidate', help="Drop the cached tokens")
+    args = parser.parse_args()
+
+    if args.action == 'invalidate':
+        invalidate()
+        return
+
+    env = load_openrc(args.openrc)
+    if args.token:
+        token = get_token(env)
+        env['OS_AUTH_TOKEN'] = token.id
+    print(json.dumps(env))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,18 +7,28 @@
 
 import contextlib
 import docker
+import image_inventory
 import sys
 import time
 import os
 import json
 import keyring
+import registry_client
 import subprocess
 import multiprocessing
+import threading
 from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 
 from random import SystemRandom
 
 MAX_DOWNLOAD_THREAD = int(os.environ.get("MAX_DOWNLOAD_THREAD", 5))
+# Concurrency of the pipeline stages that only talk to the local registry
+MAX_PUSH_THREAD = int(os.environ.get("MAX_PUSH_THREAD", 5))
+MAX_CRICTL_THREAD = int(os.environ.get("MAX_CRICTL_THREAD", 5))
+
+# CA used by the docker daemon to verify the local registry
+LOCAL_REGISTRY_CA = '/etc/docker/certs.d/registry.local:9001/registry-cert.crt'
 
 LOCAL_REGISTRY_URL = 'registry.local:9001/'
 HARD_FAIL_ERRORS = [
@@ -159,90 +169,207 @@ def get_image_list_with_auth_info(images):
     return images_with_auth
 
 
-def get_crictl_image_list():
-    cmd = ['crictl', 'images', '--output=json']
+def get_source_registry_auth(registry):
+    # Credentials for a source registry: the ones given in REGISTRIES
+    # (prestage), otherwise those of the docker login done by the playbook
+    for registry_info in registries.values():
+        if isinstance(registry_info, dict) and \
+                registry_info.get('url', '').split('/')[0] == registry and \
+                'username' in registry_info:
+            return dict(username=registry_info['username'],
+                        password=str(registry_info['password']))
+    auth = docker.auth.resolve_authconfig(docker.auth.load_config(), registry)
+    if auth and auth.get('username'):
+        return dict(username=auth['username'], password=auth['password'])
+    return None
+
+
+def create_layer_deduplicator(local_auth):
+    ca_file = LOCAL_REGISTRY_CA if os.path.exists(LOCAL_REGISTRY_CA) else None
+    local = registry_client.RegistryClient(
+        LOCAL_REGISTRY_URL.rstrip('/'), auth=local_auth, ca_file=ca_file)
+    dedup = registry_client.LayerDeduplicator(local, get_source_registry_auth)
     try:
-        output = subprocess.check_output(cmd, stderr=subprocess.STDOUT)
-        crictl_output = json.loads(output)
-    except json.JSONDecodeError as e:
-        print('Could not parse json output=%s', e)
-        return []
-    except subprocess.CalledProcessError as e:
-        print('Could not list images, error=%s', e)
-        return []
+        dedup.seed()
+    except Exception as e:
+        print("WARNING: could not index the local registry: %s" % e)
+    print("Layer deduplication enabled, %d blobs indexed" % len(dedup.index))
+    return dedup
+
+
+def get_crictl_image_list():
+    crictl_images = image_inventory.query_crictl_images() or []
     crictl_image_list = []
-    for img in crictl_output['images']:
+    for img in crictl_images:
         crictl_image_list.extend(img['repoTags'])
     return crictl_image_list
 
 
-def download_and_push_an_image(img):
+class ImagePipeline(object):
+    """Shared state for downloading many images concurrently.
+
+    Every image goes through up to three stages: pull from the source
+    registry, tag and push to the local registry, and pull into the
+    containerd cache with crictl. Each stage has its own concurrency
+    limit, so while some images are being pulled others are being pushed
+    or cached. Docker clients and the local registry credentials are
+    created once and shared by all the images.
+
+    With layer_dedup, blobs already in the local registry are reused
+    instead of being pushed again. direct_copy goes further and streams
+    the missing blobs from the source registry into the local registry,
+    skipping the docker pull and push entirely.
+    """
+
+    def __init__(self, pull_threads=MAX_DOWNLOAD_THREAD,
+                 push_threads=MAX_PUSH_THREAD,
+                 crictl_threads=MAX_CRICTL_THREAD, layer_dedup=False,
+                 direct_copy=False, inventory=None):
+        self.clients = registry_client.DockerClientPool(docker.APIClient)
+        self.inventory = inventory
+        self.local_auth = get_local_registry_auth()
+        self.local_creds = '{0}:{1}'.format(self.local_auth['username'],
+                                            self.local_auth['password'])
+        self.dedup = None
+        self.direct_copy = direct_copy
+        self._dedup_blobs = {}
+        if layer_dedup or direct_copy:
+            self.dedup = create_layer_deduplicator(self.local_auth)
+        self._stages = {
+            'pull': threading.BoundedSemaphore(max(1, pull_threads)),
+            'push': threading.BoundedSemaphore(max(1, push_threads)),
+            'crictl': threading.BoundedSemaphore(max(1, crictl_threads)),
+        }
+        self.threads = max(1, pull_threads) + max(1, push_threads) + \
+            max(1, crictl_threads)
+
+    def stage(self, name):
+        return self._stages[name]
+
+    def populate_local_registry(self, source_img, local_img):
+        # Link the blobs of source_img the local registry already has into
+        # the repository of local_img, and copy the others from the source
+        # registry in direct copy mode. Returns True if the image is then
+        # complete, otherwise docker push only uploads the missing blobs.
+        if self.dedup is None:
+            return False
+        local_path = local_img[len(LOCAL_REGISTRY_URL):]
+        repo, _, reference = local_path.rpartition(':')
+        try:
+            with self.stage('pull') if self.direct_copy else \
+                    contextlib.nullcontext():
+                done, stats = self.dedup.populate(
+                    source_img, repo, reference,
+                    copy_missing=self.direct_copy)
+        except Exception as e:
+            print("Registry copy skipped for %s, using docker: %s"
+                  % (source_img, e))
+            return False
+        print("Image %s blobs: %d present, %d mounted, %d copied (%d bytes),"
+              " %d to upload"
+              % (source_img, stats['present'], stats['mounted'],
+                 stats.get('copied', 0), stats.get('copied_bytes', 0),
+                 stats['missing'] - stats.get('copied', 0)))
+        if not done:
+            self._dedup_blobs[local_img] = (repo, stats['blobs'])
+        return done
+
+    def pushed(self, local_img):
+        # Blobs uploaded by docker push can be mounted by later images
+        if local_img in self._dedup_blobs:
+            self.dedup.index.add(*self._dedup_blobs.pop(local_img))
+
+    def crictl_pull(self, local_img):
+        with self.stage('crictl'):
+            subprocess.check_call(["crictl", "pull", "--creds",
+                                   self.local_creds, local_img])
+        if self.inventory is not None:
+            self.inventory.add(local_img)
+
+    def map(self, function, images):
+        workers = min(self.threads, len(images)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(
+                    lambda img: function(img, pipeline=self), images):
+                yield result
+
+
+def remove_docker_images(client, images):
+    # Clean up images from the local docker filesystem
+    delete_warn = "WARNING: Image %s was not deleted because" \
+                  " it was not present into the local docker" \
+                  " filesystem"
+    for image in images:
+        if client.images(image):
+            client.remove_image(image)
+        else:
+            print(delete_warn % image)
+
+
+def download_and_push_an_image(img, pipeline=None):
     # This function is used to pull an image from public/private
     # registry and push it to the local registry.
     local_img = convert_img_for_local_lookup(img)
     target_img = get_img_tag_with_registry(img)
     err_msg = " Image download failed: %s " % target_img
 
-    client = docker.APIClient()
-    auth = get_local_registry_auth()
-    try:
-        if local_img not in crictl_image_list:
-            print("Image %s does not exist in the containerd cache."
-                  % target_img)
-            client.inspect_distribution(local_img, auth_config=auth)
-            print("Image %s found on local registry" % target_img)
-            try:
-                if backed_up_crictl_cache_images:
-                    # This excludes the images to download during restore operation
-                    # that are not present in list of cached images pulled
-                    # during backup operation.
-                    if img not in backed_up_crictl_cache_images:
-                        print("Image %s not found on backed_up_crictl_cache_images."
-                              % target_img)
-                        return target_img, True
-                auth_str = '{0}:{1}'.format(auth['username'], auth['password'])
-                subprocess.check_call(["crictl", "pull", "--creds", auth_str,
-                                       local_img])
-            except Exception as e:
-                print(err_msg + str(e))
-                return target_img, False
-            print("Image %s download succeeded by containerd." % target_img)
-        else:
-            print("Image %s already exists in the containerd cache."
-                  % target_img)
-        return target_img, True
-    except docker.errors.APIError as e:
-        print(str(e))
-        print("Image %s not found on local registry, attempt to download..."
-              % target_img)
+    if pipeline is None:
+        pipeline = ImagePipeline()
+    with pipeline.clients.client() as client:
         try:
-            response = client.pull(target_img)
-            check_response(response)
-            print("Image download succeeded: %s" % target_img)
-            client.tag(target_img, local_img)
-            client.push(local_img, auth_config=auth)
-            print("Image push succeeded: %s" % local_img)
-
-            auth_str = '{0}:{1}'.format(auth['username'], auth['password'])
-            subprocess.check_call(["crictl", "pull", "--creds", auth_str,
-                                   local_img])
-            print("Image %s download succeeded by containerd" % target_img)
-            # Clean up docker images
-            delete_warn = "WARNING: Image %s was not deleted because" \
-                          " it was not present into the local docker" \
-                          " filesystem"
-            if client.images(target_img):
-                client.remove_image(target_img)
-            else:
-                print(delete_warn % target_img)
-            if client.images(local_img):
-                client.remove_image(local_img)
+            if local_img not in crictl_image_list:
+                print("Image %s does not exist in the containerd cache."
+                      % target_img)
+                client.inspect_distribution(local_img,
+                                            auth_config=pipeline.local_auth)
+                print("Image %s found on local registry" % target_img)
+                try:
+                    if backed_up_crictl_cache_images:
+                        # This excludes the images to download during restore operation
+                        # that are not present in list of cached images pulled
+                        # during backup operation.
+                        if img not in backed_up_crictl_cache_images:
+                            print("Image %s not found on backed_up_crictl_cache_images."
+                                  % target_img)
+                            return target_img, True
+                    pipeline.crictl_pull(local_img)
+                except Exception as e:
+                    print(err_msg + str(e))
+                    return target_img, False
+                print("Image %s download succeeded by containerd." % target_img)
             else:
-                print(delete_warn % local_img)
-
+                print("Image %s already exists in the containerd cache."
+                      % target_img)
             return target_img, True
-        except Exception as e:
-            return handle_docker_exception(e, err_msg, target_img)
+        except docker.errors.APIError as e:
+            print(str(e))
+            print("Image %s not found on local registry, attempt to download..."
+                  % target_img)
+            try:
+                if pipeline.populate_local_registry(target_img, local_img):
+                    print("Image push succeeded without docker: %s"
+                          % local_img)
+                    pipeline.crictl_pull(local_img)
+                    print("Image %s download succeeded by containerd" % target_img)
+                    return target_img, True
+
+                with pipeline.stage('pull'):
+                    response = client.pull(target_img)
+                check_response(response)
+                print("Image download succeeded: %s" % target_img)
+                with pipeline.stage('push'):
+                    client.tag(target_img, local_img)
+                    client.push(local_img, auth_config=pipeline.local_auth)
+                print("Image push succeeded: %s" % local_img)
+                pipeline.pushed(local_img)
+
+                pipeline.crictl_pull(local_img)
+                print("Image %s download succeeded by containerd" % target_img)
+                remove_docker_images(client, [target_img, local_img])
+
+                return target_img, True
+            except Exception as e:
+                return handle_docker_exception(e, err_msg, target_img)
 
 
 # TODO(tngo): Remove this function post StarlingX 9.0
@@ -306,7 +433,7 @@ def download_an_image(img_tuple):
             return handle_docker_exception(e, err_msg, target_img)
 
 
-def download_and_push_an_image_for_prestage(img_tuple):
+def download_and_push_an_image_for_prestage(img_tuple, pipeline=None):
     # This function is used to download an image from the public/private
     # registry and push it to the local registry for image prestage on
     # Debian. It first checks if the image already exists in the local
@@ -315,39 +442,50 @@ def download_and_push_an_image_for_prestage(img_tuple):
     prestage_img, target_img, registry_auth = img_tuple
     local_img = convert_img_for_local_lookup(prestage_img)
 
-    client = docker.APIClient()
-    local_auth = get_local_registry_auth()
-    try:
-        err_msg = " Image download failed: %s " % target_img
-
-        client.inspect_distribution(local_img, auth_config=local_auth)
-        print("Image %s found on local registry" % target_img)
-        return None, True
-    except docker.errors.APIError as e:
-        print(str(e))
-        print("Image %s not found on local registry, attempt to download..."
-              % target_img)
+    if pipeline is None:
+        pipeline = ImagePipeline()
+    with pipeline.clients.client() as client:
         try:
-            response = client.pull(target_img, auth_config=registry_auth)
-            check_response(response)
-            print("Image download succeeded: %s" % target_img)
-            client.tag(target_img, local_img)
-            client.push(local_img, auth_config=local_auth)
-            print("Image push succeeded: %s" % local_img)
-
-            if os.environ.get('PRESTAGE_REASON', None) == "for_sw_deploy":
-                auth_str = '{0}:{1}'.format(local_auth['username'], local_auth['password'])
-                subprocess.check_call(["crictl", "pull", "--creds", auth_str, local_img])
-                print("Image %s download succeeded by containerd." % target_img)
+            err_msg = " Image download failed: %s " % target_img
 
-            # Clean up docker cache
-            if client.images(target_img):
-                client.remove_image(target_img)
-            if client.images(local_img):
-                client.remove_image(local_img)
-            return prestage_img, True
-        except Exception as e:
-            return handle_docker_exception(e, err_msg, target_img)
+            client.inspect_distribution(local_img,
+                                        auth_config=pipeline.local_auth)
+            print("Image %s found on local registry" % target_img)
+            return None, True
+        except docker.errors.APIError as e:
+            print(str(e))
+            print("Image %s not found on local registry, attempt to download..."
+                  % target_img)
+            try:
+                if pipeline.populate_local_registry(target_img, local_img):
+                    print("Image push succeeded without docker: %s"
+                          % local_img)
+                    if os.environ.get('PRESTAGE_REASON', None) == "for_sw_deploy":
+                        pipeline.crictl_pull(local_img)
+                    return prestage_img, True
+
+                with pipeline.stage('pull'):
+                    response = client.pull(target_img,
+                                           auth_config=registry_auth)
+                check_response(response)
+                print("Image download succeeded: %s" % target_img)
+                with pipeline.stage('push'):
+                    client.tag(target_img, local_img)
+                    client.push(local_img, auth_config=pipeline.local_auth)
+                print("Image push succeeded: %s" % local_img)
+                pipeline.pushed(local_img)
+
+                if os.environ.get('PRESTAGE_REASON', None) == "for_sw_deploy":
+                    pipeline.crictl_pull(local_img)
+                    print("Image %s download succeeded by containerd." % target_img)
+
+                # Clean up docker cache
+                for image in (target_img, local_img):
+                    if client.images(image):
+                        client.remove_image(image)
+                return prestage_img, True
+            except Exception as e:
+                return handle_docker_exception(e, err_msg, target_img)
 
 
 # TODO(tngo): Remove this function post StarlingX 9.0
@@ -387,10 +525,21 @@ def _create_mapper(images, local_download, use_multiprocessing):
         yield pool.imap
 
 
-def map_function(images, function, local_download=False, use_multiprocessing=False):
+@contextlib.contextmanager
+def _pipeline_mapper(pipeline):
+    yield pipeline.map
+
+
+def map_function(images, function, local_download=False, use_multiprocessing=False,
+                 pipeline=None):
     failed_images = []
 
-    with _create_mapper(images, local_download, use_multiprocessing) as mapper:
+    if pipeline is not None:
+        mapper_context = _pipeline_mapper(pipeline)
+    else:
+        mapper_context = _create_mapper(images, local_download, use_multiprocessing)
+
+    with mapper_context as mapper:
         for image, success in mapper(function, images):
             if not success:
                 failed_images.append(image)
@@ -413,7 +562,8 @@ if __name__ == '__main__':
         raise Exception("Invalid Input!")
 
     image_list = sys.argv[1].split(',')
-    crictl_image_list = get_crictl_image_list()
+    # Indexed and saved across runs, Ansible retries reuse it
+    crictl_image_list = image_inventory.load()
     success_msg = ""
     image_outfile = None
     local_download = False
@@ -436,11 +586,28 @@ if __name__ == '__main__':
             prestage_download = (os.environ['PRESTAGE_DOWNLOAD']
                                  in ('True', 'true', 'yes', '1'))
 
+        # Each worker process has its own clients in multiprocessing mode.
+        # Direct registry copies do not go through the docker daemon, so
+        # they always use the threaded pipeline.
+        direct_copy = (os.environ.get('DIRECT_REGISTRY_COPY')
+                       in ('True', 'true', 'yes', '1'))
+        if direct_copy and use_multiprocessing:
+            print("Direct registry copy enabled, multiprocessing disabled")
+            use_multiprocessing = False
+        pipeline = None
+        if not use_multiprocessing:
+            pipeline = ImagePipeline(
+                layer_dedup=os.environ.get('LAYER_DEDUP') in ('True', 'true', 'yes', '1'),
+                direct_copy=direct_copy, inventory=crictl_image_list)
+            print("Image pipeline threads: pull=%d push=%d crictl=%d"
+                  % (MAX_DOWNLOAD_THREAD, MAX_PUSH_THREAD, MAX_CRICTL_THREAD))
+
         if not prestage_download:
             failed_downloads = map_function(
                 image_list,
                 download_and_push_an_image,
-                use_multiprocessing=use_multiprocessing)
+                use_multiprocessing=use_multiprocessing,
+                pipeline=pipeline)
         else:
             if os.getenv('PURGE_IMAGES_LIST_FILE') is not None:
                 purge_images_list_file = os.environ['PURGE_IMAGES_LIST_FILE']
@@ -452,7 +619,8 @@ if __name__ == '__main__':
             failed_downloads = map_function(
                 images_with_auth,
                 download_and_push_an_image_for_prestage,
-                use_multiprocessing=use_multiprocessing)
+                use_multiprocessing=use_multiprocessing,
+                pipeline=pipeline)
     else:
         # TODO(tngo): Remove the following logic and related functions post StarlingX 9.0
 
@@ -485,6 +653,10 @@ if __name__ == '__main__':
 
         print("Local download flag: %s" % local_download)
 
+    if use_multiprocessing:
+        # Worker processes cannot record the images they pulled
+        crictl_image_list.invalidate()
+
     elapsed_time = time.time() - start
     if len(failed_downloads) > 0:
         raise Exception("Failed to download images %s" % failed_downloads)
@@ -0,0 +1,211 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Cached inventory of the images in the containerd cache.
+
+Shared by the image helpers of push-docker-images. The output of
+"crictl images" is indexed by repo tag and digest so that lookups are
+constant time, and is saved to a file so that the next run of a helper,
+such as an Ansible retry, reuses it instead of querying crictl again.
+
+The saved inventory expires after IMAGE_INVENTORY_TTL seconds. Helpers
+add the images they pull with crictl so that it stays accurate, and
+invalidate it when they cannot tell what changed. It can still be stale,
+e.g. after containerd garbage-collected an image, so a helper skipping a
+pull on its account confirms the image with crictl inspecti first.
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+CACHE_FILE = os.environ.get('IMAGE_INVENTORY_CACHE',
+                            '/var/run/crictl_image_inventory.json')
+CACHE_TTL = int(os.environ.get('IMAGE_INVENTORY_TTL', 600))
+
+CRICTL_IMAGES_CMD = ['crictl', 'images', '--output=json']
+CRICTL_INSPECTI_CMD = ['crictl', 'inspecti', '--output=json']
+
+
+def query_crictl_images():
+    """Return the images listed by crictl, or None if it failed"""
+
+    try:
+        output = subprocess.check_output(CRICTL_IMAGES_CMD,
+                                         stderr=subprocess.STDOUT)
+        return json.loads(output)['images']
+    except (ValueError, KeyError) as e:
+        print('Could not parse json output=%s' % e)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print('Could not list images, error=%s' % e)
+    return None
+
+
+def query_crictl_digests(ref):
+    """Return the repo digests of an image in containerd, or None"""
+
+    try:
+        output = subprocess.check_output(CRICTL_INSPECTI_CMD + [ref],
+                                         stderr=subprocess.DEVNULL)
+        return json.loads(output)['status'].get('repoDigests') or []
+    except (OSError, subprocess.CalledProcessError, ValueError,
+            KeyError, AttributeError):
+        return None
+
+
+def repo_digest(ref, digest):
+    """Digest reference of the repository of ref, e.g. a/b@sha256:..."""
+
+    name = ref.split('@', 1)[0]
+    if ':' in name.rsplit('/', 1)[-1]:
+        name = name.rsplit(':', 1)[0]
+    return '%s@%s' % (name, digest)
+
+
+def push_digest(output):
+    """Return the manifest digest reported by a docker push, or None"""
+
+    if not isinstance(output, str):
+        return None
+    for line in output.splitlines():
+        try:
+            aux = json.loads(line).get('aux') or {}
+        except (ValueError, AttributeError):
+            continue
+        if aux.get('Digest'):
+            return aux['Digest']
+    return None
+
+
+class ImageInventory(object):
+    """Repo tags and digests of the images in the containerd cache.
+
+    "ref in inventory" accepts repo tags (registry.local:9001/a/b:v1) and
+    digest references (registry.local:9001/a/b@sha256:...). Both map to
+    the id of their image.
+    """
+
+    def __init__(self, cache_file=CACHE_FILE, ttl=CACHE_TTL):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.tags = {}
+        self.digests = {}
+        self._lock = threading.Lock()
+
+    def _index(self, images):
+        self.tags = {}
+        self.digests = {}
+        for image in images:
+            for tag in image.get('repoTags') or []:
+                self.tags[tag] = image.get('id')
+            for digest in image.get('repoDigests') or []:
+                self.digests[digest] = image.get('id')
+
+    def _read_cache(self):
+        if not self.cache_file:
+            return False
+        try:
+            if time.time() - os.path.getmtime(self.cache_file) > self.ttl:
+                return False
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+            self.tags = cache['tags']
+            self.digests = dict(cache['digests'])
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def _save(self):
+        # Called with the lock held. The file is replaced atomically so a
+        # concurrent reader never sees a partial inventory.
+        if not self.cache_file:
+            return
+        try:
+            fd, path = tempfile.mkstemp(
+                dir=os.path.dirname(self.cache_file) or '.')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'tags': self.tags,
+                           'digests': self.digests}, f)
+            os.rename(path, self.cache_file)
+        except OSError as e:
+            print('Could not save the image inventory: %s' % e)
+
+    def load(self):
+        """Use the saved inventory if it has not expired, else query crictl"""
+
+        with self._lock:
+            if self._read_cache():
+                print('Using the image inventory saved in %s (%d tags)'
+                      % (self.cache_file, len(self.tags)))
+                return self
+        return self.refresh()
+
+    def refresh(self):
+        images = query_crictl_images()
+        with self._lock:
+            if images is None:
+                # Not saved, the next run queries crictl again
+                self._index([])
+                return self
+            self._index(images)
+            self._save()
+        return self
+
+    def add(self, ref, digest=None):
+        """Record an image pulled into the containerd cache
+
+        The digest, when known, is the manifest digest of the pulled tag.
+        """
+
+        with self._lock:
+            self.tags[ref] = digest
+            if digest:
+                self.digests[repo_digest(ref, digest)] = digest
+            self._save()
+
+    def has_digest(self, ref, digest):
+        """Whether containerd has the tag ref with the given manifest digest
+
+        The inventory must list the tag as the image of the digest, which
+        is then confirmed with crictl in case the inventory is stale.
+        """
+
+        if not digest:
+            return False
+        digest_ref = repo_digest(ref, digest)
+        with self._lock:
+            image_id = self.tags.get(ref)
+            if image_id is None or self.digests.get(digest_ref) != image_id:
+                return False
+        digests = query_crictl_digests(ref)
+        return digests is not None and digest_ref in digests
+
+    def invalidate(self):
+        """Drop the saved inventory, the next load queries crictl"""
+
+        with self._lock:
+            if not self.cache_file:
+                return
+            try:
+                os.remove(self.cache_file)
+            except FileNotFoundError:
+                pass
+
+    def __contains__(self, ref):
+        if '@' in ref:
+            return ref in self.digests
+        return ref in self.tags
+
+    def __len__(self):
+        return len(self.tags)
+
+
+def load():
+    """Return the image inventory, loaded from the cache when possible"""
+
+    return ImageInventory().load()
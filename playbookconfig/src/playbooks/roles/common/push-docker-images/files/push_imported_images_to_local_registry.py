@@ -9,6 +9,7 @@
 
 import docker
 import eventlet
+import image_inventory
 import keyring
 import os
 import subprocess
@@ -23,6 +24,9 @@ MAX_PUSH_THREAD = 5
 REGISTRY_PATTERNS = ['.io', 'docker.elastic.co']
 add_docker_prefix = False
 
+# Images in the containerd cache, loaded by main
+crictl_images = None
+
 
 def get_local_registry_auth():
     password = keyring.get_password("sysinv", "services")
@@ -95,12 +99,24 @@ def push_an_image(img):
         print("Imported image {} not found in local registry, attempting to push...".format(target_img))
         try:
             client.tag(target_img, local_img)
-            client.push(local_img, auth_config=auth)
+            output = client.push(local_img, auth_config=auth)
             print("Image push succeeded: %s" % local_img)
-            auth_str = '{0}:{1}'.format(auth['username'], auth['password'])
-            subprocess.check_call(["crictl", "pull", "--creds", auth_str,
-                                   local_img])
-            print("Image %s download succeeded by containerd" % target_img)
+            # The tag may have been pushed with new content, the pull is
+            # only skipped if containerd has the content just pushed
+            digest = image_inventory.push_digest(output)
+            if crictl_images is not None and \
+                    crictl_images.has_digest(local_img, digest):
+                print("Image %s already exists in the containerd cache"
+                      % target_img)
+            else:
+                auth_str = '{0}:{1}'.format(auth['username'],
+                                            auth['password'])
+                subprocess.check_call(["crictl", "pull", "--creds",
+                                       auth_str, local_img])
+                print("Image %s download succeeded by containerd"
+                      % target_img)
+                if crictl_images is not None:
+                    crictl_images.add(local_img, digest)
             # Clean up docker images
             delete_warn = "WARNING: Image %s was not deleted because" \
                           " it was not present into the local docker" \
@@ -140,6 +156,7 @@ if __name__ == '__main__':
         add_docker_prefix = (os.environ['ADD_DOCKER_PREFIX']
                              in ('True', 'true', 'yes', '1'))
 
+    crictl_images = image_inventory.load()
     image_list = get_list_of_imported_images()
     if not image_list:
         raise Exception("No images have been imported. Docker cache is empty.")
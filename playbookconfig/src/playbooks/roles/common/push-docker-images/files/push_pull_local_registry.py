@@ -1,20 +1,46 @@
 #!/usr/bin/python
 #
-# Copyright (c) 2020-2023 Wind River Systems, Inc.
+# Copyright (c) 2020-2023, 2026 Wind River Systems, Inc.
 #
 # SPDX-License-Identifier: Apache-2.0
 #
 
-from eventlet import greenpool
+import contextlib
 import docker
+import image_inventory
 import json
+import os
+import registry_client
 import sys
+import threading
 import time
 import keyring
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from random import SystemRandom
 
 MAX_DOWNLOAD_ATTEMPTS = 3
+# Initial number of images processed concurrently
 MAX_DOWNLOAD_THREAD = 5
+# Bounds of the concurrency, adapted to the registry latency and errors
+MIN_ADAPTIVE_THREAD = 1
+MAX_ADAPTIVE_THREAD = int(os.environ.get("MAX_ADAPTIVE_THREAD", 10))
+# An image slower than this factor times the average latency is taken
+# as a sign that the registry is saturated
+LATENCY_TOLERANCE = 2.0
+
+# Exponential backoff between attempts, in seconds, with full jitter
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+AUTH_ERRORS = [
+    "no basic auth credentials",
+    "unauthorized",
+    "authentication required",
+]
+
+# Images in the containerd cache, loaded when pushing
+crictl_images = None
 
 
 def get_local_registry_auth():
@@ -24,7 +50,193 @@ def get_local_registry_auth():
     return dict(username="sysinv", password=str(password))
 
 
-def push_from_filesystem(image):
+class RegistryAuthError(Exception):
+    """The local registry rejected the credentials"""
+
+
+def is_auth_message(msg):
+    msg = str(msg).lower()
+    return any(err in msg for err in AUTH_ERRORS)
+
+
+def is_auth_error(ex):
+    if isinstance(ex, RegistryAuthError):
+        return True
+    response = getattr(ex, 'response', None)
+    if getattr(response, 'status_code', None) == 401:
+        return True
+    return is_auth_message(ex)
+
+
+def check_stream_error(line):
+    # dockerd reports the registry errors of a push or pull, including
+    # the rejected credentials, as an errorDetail line of its output
+    # instead of an HTTP error
+    try:
+        j = json.loads(line)
+    except ValueError:
+        return
+    if not isinstance(j, dict) or not j.get('errorDetail'):
+        return
+    detail = j['errorDetail']
+    message = detail.get('message') if isinstance(detail, dict) else None
+    error = "Error: " + str(detail)
+    if is_auth_message(message or detail):
+        raise RegistryAuthError(error)
+    raise Exception(error)
+
+
+def crictl_pull(image, auth):
+    cmd = ["crictl", "pull", "--creds", RegistryAuth.creds(auth), image]
+    try:
+        subprocess.check_output(cmd, stderr=subprocess.STDOUT,
+                                universal_newlines=True)
+    except subprocess.CalledProcessError as e:
+        # The command line holds the credentials, only report the output
+        error = "crictl pull failed: %s" % (e.output or '').strip()
+        if is_auth_message(e.output or ''):
+            raise RegistryAuthError(error)
+        raise Exception(error)
+
+
+def backoff_delay(attempt):
+    # Full jitter: spread the retries of concurrent images over the
+    # whole backoff window instead of retrying them all at once
+    cap = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+    return round(SystemRandom().uniform(0, cap), 3)
+
+
+class RegistryAuth(object):
+    """Local registry credentials shared by all the images.
+
+    The keyring is read once and read again only when the registry
+    rejects the credentials, e.g. because the admin password was changed
+    by the openstack client in parallel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._auth = None
+
+    def get(self):
+        with self._lock:
+            if self._auth is None:
+                self._auth = get_local_registry_auth()
+            return self._auth
+
+    def refresh(self, stale):
+        # Only the first image seeing stale credentials reads the keyring
+        with self._lock:
+            if self._auth is None or self._auth is stale:
+                self._auth = get_local_registry_auth()
+            return self._auth
+
+    @staticmethod
+    def creds(auth):
+        return '{0}:{1}'.format(auth['username'], auth['password'])
+
+
+class AdaptiveLimit(object):
+    """Concurrency limit adapted to how the registry keeps up.
+
+    The limit grows by one after each image completed within
+    LATENCY_TOLERANCE times the average latency, shrinks by one after a
+    slower image, and is halved when an attempt fails.
+    """
+
+    def __init__(self, initial=MAX_DOWNLOAD_THREAD,
+                 minimum=MIN_ADAPTIVE_THREAD, maximum=MAX_ADAPTIVE_THREAD):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.latency = None
+        self._active = 0
+        self._cond = threading.Condition()
+
+    @contextlib.contextmanager
+    def slot(self):
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def _set(self, limit):
+        self.limit = min(max(limit, self.minimum), self.maximum)
+        self._cond.notify_all()
+
+    def completed(self, latency):
+        with self._cond:
+            if self.latency is None or \
+                    latency <= LATENCY_TOLERANCE * self.latency:
+                self._set(self.limit + 1)
+            else:
+                self._set(self.limit - 1)
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency = 0.8 * self.latency + 0.2 * latency
+
+    def failed(self):
+        with self._cond:
+            self._set(self.limit // 2)
+
+
+class RegistryEngine(object):
+    """Shared state for pushing or pulling many images concurrently.
+
+    Docker clients are created once per worker and reused, the
+    credentials are shared through RegistryAuth, and the number of
+    images in flight follows AdaptiveLimit. The time taken by each image
+    is recorded and reported.
+    """
+
+    def __init__(self, limit=None):
+        self.auth = RegistryAuth()
+        self.limit = limit or AdaptiveLimit()
+        self.timings = {}
+        self.clients = registry_client.DockerClientPool(docker.APIClient)
+
+    def retry(self, image, attempt):
+        # Called after a failed attempt, before the next one
+        self.limit.failed()
+        delay = backoff_delay(attempt)
+        print("Sleep %ss before retry processing image %s ..."
+              % (delay, image))
+        time.sleep(delay)
+
+    def run(self, function, image):
+        with self.limit.slot():
+            start = time.time()
+            image, success = function(image, engine=self)
+            elapsed = time.time() - start
+        if success:
+            self.limit.completed(elapsed)
+        self.timings[image] = (elapsed, success)
+        print("Image %s %s in %.1f seconds"
+              % (image, "done" if success else "failed", elapsed))
+        return image, success
+
+    def map(self, function, images):
+        workers = min(self.limit.maximum, len(images)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(
+                    lambda img: self.run(function, img), images):
+                yield result
+
+    def report(self):
+        for image, (elapsed, success) in sorted(
+                self.timings.items(), key=lambda t: -t[1][0]):
+            print("  %8.1fs %s %s" % (elapsed, "ok  " if success else "FAIL",
+                                      image))
+
+
+def push_from_filesystem(image, engine=None):
     # The main purpose of the function is to push the image references
     # starting with 'registry.local:9001' to the local registry as the
     # name suggests.
@@ -37,90 +249,109 @@ def push_from_filesystem(image):
     #   registry.local:9001/privateregistry.io:5000/kube-proxy:v1.16.0
 
     err_msg = " Processing failed: %s " % image
+    engine = engine or RegistryEngine()
+    refreshed = False
 
     for i in range(MAX_DOWNLOAD_ATTEMPTS):
+        auth = engine.auth.get()
         try:
-            client = docker.APIClient()
-            auth = get_local_registry_auth()
-            client.push(image, auth_config=auth)
-            print("Image push succeeded: %s" % image)
-            # due to crictl doesn't support push function, docker client is
-            # used to pull and push image to local registry, then crictl
-            # download image from local registry.
-            # admin password may be changed by openstack client in parallel.
-            # So we cannot cache auth info, need refresh it each time.
-            auth = get_local_registry_auth()
-            auth_str = '{0}:{1}'.format(auth['username'], auth['password'])
-            subprocess.check_call(["crictl", "pull", "--creds",
-                                   auth_str, image])
-            print("Image %s download succeeded by containerd" % image)
-            # Clean up docker images
-            try:
-                if client.images(image):
-                    client.remove_image(image)
+            with engine.clients.client() as client:
+                output = client.push(image, auth_config=auth)
+                if isinstance(output, str):
+                    for line in output.splitlines():
+                        check_stream_error(line)
+                print("Image push succeeded: %s" % image)
+                # due to crictl doesn't support push function, docker client
+                # is used to pull and push image to local registry, then
+                # crictl download image from local registry. The pull is
+                # only skipped if containerd has the content just pushed.
+                digest = image_inventory.push_digest(output)
+                if crictl_images is not None and \
+                        crictl_images.has_digest(image, digest):
+                    print("Image %s already exists in the containerd cache"
+                          % image)
                 else:
-                    print("WARNING: Image %s was not deleted because it "
-                          "was not present in the local docker filesystem" % image)
-            except Exception as e:
-                print("WARNING: Image %s was not deleted, due to %s" % (image, str(e)))
+                    crictl_pull(image, auth)
+                    print("Image %s download succeeded by containerd"
+                          % image)
+                    if crictl_images is not None:
+                        crictl_images.add(image, digest)
+                # Clean up docker images
+                try:
+                    if client.images(image):
+                        client.remove_image(image)
+                    else:
+                        print("WARNING: Image %s was not deleted because it "
+                              "was not present in the local docker filesystem" % image)
+                except Exception as e:
+                    print("WARNING: Image %s was not deleted, due to %s" % (image, str(e)))
             return image, True
-        except docker.errors.APIError as e:
+        except (RegistryAuthError, docker.errors.APIError) as e:
             print(err_msg + str(e))
-            if "no basic auth credentials" in str(e):
-                return image, False
+            if is_auth_error(e):
+                if refreshed:
+                    return image, False
+                # Retry right away with the current credentials
+                engine.auth.refresh(auth)
+                refreshed = True
+                continue
         except Exception as e:
             print(err_msg + str(e))
 
-        print("Sleep 10s before retry uploading image %s ..." % image)
-        time.sleep(10)
+        if i + 1 < MAX_DOWNLOAD_ATTEMPTS:
+            engine.retry(image, i)
 
     return image, False
 
 
-def pull_image_from_local_registry(image):
+def pull_image_from_local_registry(image, engine=None):
     # This function pulls an image from local registry to local filesystem.
     # Example of passed img reference:
     #  - registry.local:9001:k8s.gcr.io/pause:3.2
 
     err_msg = " Image download failed: %s " % image
+    engine = engine or RegistryEngine()
+    refreshed = False
 
     for i in range(MAX_DOWNLOAD_ATTEMPTS):
+        auth = engine.auth.get()
         try:
-            client = docker.APIClient()
-            auth = get_local_registry_auth()
-            for line in client.pull(image, auth_config=auth, stream=True):
-                j = json.loads(line)
-                if 'errorDetail' in j:
-                    raise Exception("Error: " + str(j['errorDetail']))
+            with engine.clients.client() as client:
+                for line in client.pull(image, auth_config=auth, stream=True):
+                    check_stream_error(line)
 
             print("Image download succeeded: %s" % image)
             return image, True
         except docker.errors.NotFound as e:
             print(err_msg + str(e))
             return image, False
-        except docker.errors.APIError as e:
+        except (RegistryAuthError, docker.errors.APIError) as e:
             print(err_msg + str(e))
-            if "no basic auth credentials" in str(e):
-                return image, False
+            if is_auth_error(e):
+                if refreshed:
+                    return image, False
+                engine.auth.refresh(auth)
+                refreshed = True
+                continue
         except Exception as e:
             print(err_msg + str(e))
             if "no space left on device" in str(e):
                 return image, False
 
-        print("Sleep 10s before retry downloading image %s ..." % image)
-        time.sleep(10)
+        if i + 1 < MAX_DOWNLOAD_ATTEMPTS:
+            engine.retry(image, i)
 
     return image, False
 
 
-def map_function(images, function):
+def map_function(images, function, engine=None):
     failed_images = []
-    threads = min(MAX_DOWNLOAD_THREAD, len(images))
-
-    pool = greenpool.GreenPool(size=threads)
-    for image, success in pool.imap(function, images):
+    engine = engine or RegistryEngine()
+    for image, success in engine.map(function, images):
         if not success:
             failed_images.append(image)
+    print("Time per image, slowest first:")
+    engine.report()
     return failed_images
 
 
@@ -132,6 +363,7 @@ if __name__ == '__main__':
 
     if sys.argv[1] == "push":
         start = time.time()
+        crictl_images = image_inventory.load()
         failed_uploads = map_function(image_list,
                                       push_from_filesystem)
         elapsed_time = time.time() - start
@@ -0,0 +1,410 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Minimal docker registry v2 API client.
+
+Used by the image download helpers to look at image manifests and blobs
+without going through the docker daemon, so that layers already stored in
+the local registry are not transferred again and missing ones can be
+streamed from the source registry straight into the local registry.
+
+Also holds the pool of docker API clients shared by the threads of the
+helpers that still go through the docker daemon.
+"""
+
+import base64
+import contextlib
+import json
+import platform
+import queue
+import re
+import ssl
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+MANIFEST_V2 = 'application/vnd.docker.distribution.manifest.v2+json'
+MANIFEST_LIST_V2 = \
+    'application/vnd.docker.distribution.manifest.list.v2+json'
+OCI_MANIFEST = 'application/vnd.oci.image.manifest.v1+json'
+OCI_INDEX = 'application/vnd.oci.image.index.v1+json'
+
+MANIFEST_TYPES = [MANIFEST_V2, OCI_MANIFEST]
+INDEX_TYPES = [MANIFEST_LIST_V2, OCI_INDEX]
+
+DOCKER_HUB = 'docker.io'
+DOCKER_HUB_API = 'registry-1.docker.io'
+
+DEFAULT_TIMEOUT = 60
+
+ARCHITECTURES = {'x86_64': 'amd64', 'aarch64': 'arm64'}
+
+_CHALLENGE_PARAM_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+class RegistryError(Exception):
+    """Unexpected response from a registry"""
+
+    def __init__(self, message, status=None):
+        super(RegistryError, self).__init__(message)
+        self.status = status
+
+
+def split_image_reference(img):
+    """Split an image reference into (registry, repository, reference).
+
+    References without a registry host are docker hub images, and docker
+    hub images without a namespace live under library/.
+    """
+
+    name, registry = img, DOCKER_HUB
+    first = img.split('/', 1)[0]
+    if '/' in img and ('.' in first or ':' in first or first == 'localhost'):
+        registry, name = img.split('/', 1)
+    if '@' in name:
+        name, reference = name.split('@', 1)
+    elif ':' in name.rsplit('/', 1)[-1]:
+        name, reference = name.rsplit(':', 1)
+    else:
+        reference = 'latest'
+    if registry == DOCKER_HUB and '/' not in name:
+        name = 'library/' + name
+    return registry, name, reference
+
+
+def local_architecture():
+    machine = platform.machine()
+    return ARCHITECTURES.get(machine, machine)
+
+
+def manifest_blobs(manifest):
+    """Return the digests of the config and layers of an image manifest"""
+
+    blobs = [manifest['config']['digest']]
+    blobs.extend(layer['digest'] for layer in manifest.get('layers', []))
+    return blobs
+
+
+class RegistryClient(object):
+    """Talk to one registry, handling basic and bearer token auth.
+
+    Tokens are cached per scope and shared by all the threads using the
+    client.
+    """
+
+    def __init__(self, registry, auth=None, ca_file=None,
+                 timeout=DEFAULT_TIMEOUT):
+        host = DOCKER_HUB_API if registry == DOCKER_HUB else registry
+        self.registry = registry
+        self.base_url = 'https://%s' % host
+        self.auth = auth
+        self.timeout = timeout
+        self._context = ssl.create_default_context(cafile=ca_file)
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._last = threading.local()
+
+    def _basic_auth(self):
+        if not self.auth:
+            return None
+        creds = '%s:%s' % (self.auth['username'], self.auth['password'])
+        return 'Basic ' + base64.b64encode(creds.encode()).decode()
+
+    def _open(self, request):
+        return urllib.request.urlopen(request, timeout=self.timeout,
+                                      context=self._context)
+
+    def _get_token(self, challenge, refresh=False):
+        params = dict(_CHALLENGE_PARAM_RE.findall(challenge))
+        realm = params.pop('realm', None)
+        if not realm:
+            raise RegistryError('Invalid auth challenge: %s' % challenge)
+        key = (realm, params.get('scope'))
+        with self._lock:
+            if key in self._tokens and not refresh:
+                return self._tokens[key]
+        query = urllib.parse.urlencode(
+            [(k, v) for k, v in params.items() if k in ('service', 'scope')])
+        request = urllib.request.Request(realm + '?' + query)
+        basic = self._basic_auth()
+        if basic:
+            request.add_header('Authorization', basic)
+        with self._open(request) as response:
+            body = json.loads(response.read().decode())
+        token = body.get('token') or body.get('access_token')
+        with self._lock:
+            self._tokens[key] = token
+        return token
+
+    def request(self, method, path, data=None, headers=None,
+                expected=(200,), stream=False, authorization=None):
+        """Send a request, authenticating when challenged.
+
+        Returns (status, headers, body). 404 is returned rather than
+        raised so callers can check for existence. With stream the body
+        is the open response, to be read and closed by the caller.
+
+        authorization is sent with the first attempt, it is needed when
+        data is a file object that cannot be sent twice.
+        """
+
+        url = path if path.startswith('http') else self.base_url + path
+        # Unauthenticated, then with a cached token, then a fresh one
+        for attempt in range(3):
+            request = urllib.request.Request(url, data=data, method=method,
+                                             headers=dict(headers or {}))
+            if authorization:
+                # Not forwarded on redirects, blob storage backends such as
+                # S3 reject requests carrying the registry credentials
+                request.add_unredirected_header('Authorization',
+                                                authorization)
+            try:
+                response = self._open(request)
+                self._last.authorization = authorization
+                if stream:
+                    return response.status, response.headers, response
+                with response:
+                    return (response.status, response.headers,
+                            response.read())
+            except urllib.error.HTTPError as e:
+                if e.code == 401 and attempt < 2:
+                    challenge = e.headers.get('WWW-Authenticate', '')
+                    if challenge.lower().startswith('bearer'):
+                        authorization = 'Bearer ' + self._get_token(
+                            challenge, refresh=attempt > 0)
+                    elif attempt == 0:
+                        authorization = self._basic_auth()
+                    else:
+                        authorization = None
+                    if authorization:
+                        continue
+                if e.code in expected or e.code == 404:
+                    return e.code, e.headers, e.read()
+                raise RegistryError('%s %s failed: HTTP %d'
+                                    % (method, url, e.code), e.code)
+        raise RegistryError('%s %s failed: unauthorized' % (method, url),
+                            401)
+
+    def get_manifest(self, repo, reference, resolve_index=True):
+        """Return (media_type, raw_bytes) of an image manifest.
+
+        Manifest lists are resolved to the manifest of the local
+        platform, the same image docker would pull.
+        """
+
+        accept = ', '.join(MANIFEST_TYPES + INDEX_TYPES)
+        status, headers, body = self.request(
+            'GET', '/v2/%s/manifests/%s' % (repo, reference),
+            headers={'Accept': accept})
+        if status == 404:
+            raise RegistryError('Manifest %s:%s not found on %s'
+                                % (repo, reference, self.registry), 404)
+        media_type = headers.get('Content-Type', '').split(';')[0]
+        if not media_type:
+            media_type = json.loads(body.decode()).get('mediaType', '')
+        if resolve_index and media_type in INDEX_TYPES:
+            index = json.loads(body.decode())
+            arch = local_architecture()
+            for entry in index.get('manifests', []):
+                plat = entry.get('platform', {})
+                if plat.get('os') == 'linux' and \
+                        plat.get('architecture') == arch:
+                    return self.get_manifest(repo, entry['digest'], False)
+            raise RegistryError('No linux/%s manifest for %s:%s'
+                                % (arch, repo, reference))
+        return media_type, body
+
+    def put_manifest(self, repo, reference, media_type, body):
+        self.request('PUT', '/v2/%s/manifests/%s' % (repo, reference),
+                     data=body, headers={'Content-Type': media_type},
+                     expected=(201,))
+
+    def blob_exists(self, repo, digest):
+        status, _, _ = self.request(
+            'HEAD', '/v2/%s/blobs/%s' % (repo, digest))
+        return status == 200
+
+    def open_blob(self, repo, digest):
+        """Return (size, response) to stream a blob from the registry"""
+
+        status, headers, response = self.request(
+            'GET', '/v2/%s/blobs/%s' % (repo, digest), stream=True)
+        if status == 404:
+            raise RegistryError('Blob %s not found in %s on %s'
+                                % (digest, repo, self.registry), 404)
+        return int(headers.get('Content-Length')), response
+
+    def upload_blob(self, repo, digest, data, size):
+        """Upload a blob in one request; data is a bytes or file object.
+
+        The registry verifies the content against digest.
+        """
+
+        _, headers, _ = self.request(
+            'POST', '/v2/%s/blobs/uploads/' % repo, data=b'',
+            expected=(202,))
+        location = urllib.parse.urljoin(self.base_url, headers['Location'])
+        separator = '&' if '?' in location else '?'
+        # Reuse the credentials of the POST, they have the same scope
+        self.request('PUT', location + separator + urllib.parse.urlencode(
+                     {'digest': digest}), data=data,
+                     headers={'Content-Type': 'application/octet-stream',
+                              'Content-Length': str(size)},
+                     expected=(201,),
+                     authorization=self._last.authorization)
+
+    def mount_blob(self, repo, digest, from_repo):
+        """Cross-repository mount a blob; returns True if it was mounted"""
+
+        query = urllib.parse.urlencode({'mount': digest, 'from': from_repo})
+        status, headers, _ = self.request(
+            'POST', '/v2/%s/blobs/uploads/?%s' % (repo, query), data=b'',
+            expected=(201, 202))
+        if status == 201:
+            return True
+        # The registry opened a regular upload session instead
+        location = headers.get('Location')
+        if status == 202 and location:
+            self.request('DELETE', urllib.parse.urljoin(
+                self.base_url, location), expected=(204,))
+        return False
+
+
+class DockerClientPool(object):
+    """Hand out docker API clients, reusing the ones already created
+
+    create_client is called for a new client, e.g. docker.APIClient.
+    """
+
+    def __init__(self, create_client):
+        self.create_client = create_client
+        self._idle = queue.LifoQueue()
+
+    @contextlib.contextmanager
+    def client(self):
+        try:
+            client = self._idle.get_nowait()
+        except queue.Empty:
+            client = self.create_client()
+        try:
+            yield client
+        finally:
+            self._idle.put(client)
+
+
+class BlobIndex(object):
+    """Remember which local registry repository holds each blob"""
+
+    def __init__(self):
+        self._repos = {}
+        self._lock = threading.Lock()
+
+    def add(self, repo, digests):
+        with self._lock:
+            for digest in digests:
+                self._repos.setdefault(digest, repo)
+
+    def find(self, digest):
+        with self._lock:
+            return self._repos.get(digest)
+
+    def __len__(self):
+        return len(self._repos)
+
+
+class LayerDeduplicator(object):
+    """Populate the local registry with the blobs it can share.
+
+    For an image about to be copied into the local registry, every blob
+    of its manifest is either already in the target repository, mounted
+    from another local repository that has it, or reported missing. When
+    nothing is missing only the manifest is pushed; otherwise the caller
+    uploads the image, and the blobs already present are skipped.
+
+    With copy_missing, the missing blobs are instead streamed from the
+    source registry into the local registry, so the image never goes
+    through the docker daemon.
+    """
+
+    def __init__(self, local_client, source_auth=None):
+        self.local = local_client
+        self.source_auth = source_auth or (lambda registry: None)
+        self.index = BlobIndex()
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def source(self, registry):
+        with self._lock:
+            if registry not in self._sources:
+                self._sources[registry] = RegistryClient(
+                    registry, auth=self.source_auth(registry))
+            return self._sources[registry]
+
+    def seed(self):
+        """Index the blobs of the images already in the local registry"""
+
+        _, _, body = self.local.request('GET', '/v2/_catalog?n=10000')
+        for repo in json.loads(body.decode()).get('repositories', []):
+            _, _, body = self.local.request('GET', '/v2/%s/tags/list' % repo)
+            for tag in (json.loads(body.decode()).get('tags') or [])[:1]:
+                _, manifest = self.local.get_manifest(repo, tag)
+                self.index.add(repo, manifest_blobs(
+                    json.loads(manifest.decode())))
+
+    def link_blobs(self, repo, blobs):
+        """Make blobs available in repo; returns (present, mounted, missing)"""
+
+        present, mounted, missing = [], [], []
+        for digest in blobs:
+            if self.local.blob_exists(repo, digest):
+                present.append(digest)
+                continue
+            from_repo = self.index.find(digest)
+            if from_repo and from_repo != repo and \
+                    self.local.mount_blob(repo, digest, from_repo):
+                mounted.append(digest)
+            else:
+                missing.append(digest)
+        return present, mounted, missing
+
+    def copy_blob(self, source, repo, local_repo, digest):
+        """Stream a blob from a source registry into the local registry"""
+
+        size, response = source.open_blob(repo, digest)
+        with response:
+            self.local.upload_blob(local_repo, digest, response, size)
+        return size
+
+    def populate(self, source_img, local_repo, local_reference,
+                 copy_missing=False):
+        """Try to complete an image in the local registry.
+
+        Returns (done, stats) where done tells whether the image manifest
+        was pushed because no blob was missing. stats counts the present,
+        mounted and missing blobs and lists all of them under 'blobs';
+        with copy_missing it also counts the 'copied' blobs and their
+        'copied_bytes'.
+        """
+
+        registry, repo, reference = split_image_reference(source_img)
+        source = self.source(registry)
+        media_type, body = source.get_manifest(repo, reference)
+        blobs = manifest_blobs(json.loads(body.decode()))
+        present, mounted, missing = self.link_blobs(local_repo, blobs)
+        stats = {'present': len(present), 'mounted': len(mounted),
+                 'missing': len(missing), 'blobs': blobs}
+        if missing and copy_missing:
+            stats['copied'] = stats['copied_bytes'] = 0
+            for digest in missing:
+                stats['copied_bytes'] += self.copy_blob(
+                    source, repo, local_repo, digest)
+                stats['copied'] += 1
+            missing = []
+        if missing:
+            return False, stats
+        self.local.put_manifest(local_repo, local_reference, media_type, body)
+        self.index.add(local_repo, blobs)
+        return True, stats
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 #
-# Copyright (c) 2025 Wind River Systems, Inc.
+# Copyright (c) 2025-2026 Wind River Systems, Inc.
 #
 # SPDX-License-Identifier: Apache-2.0
 #
@@ -12,8 +12,8 @@
 import argparse
 import ipaddress
 import logging
+import openstack_credentials
 import os
-import subprocess
 import sys
 
 from keystoneauth1.identity import v3
@@ -31,8 +31,8 @@ logging.basicConfig(
 def load_credentials_and_create_session() -> session.Session:
     """
     Creates a Keystone session by first checking for token-based auth environment
-    variables. If they are not present, it falls back to sourcing an openrc
-    file for password-based authentication.
+    variables. If they are not present, it falls back to the token of the
+    openrc credentials, cached for the other scripts of the playbook.
     """
     auth_url = os.getenv("OS_AUTH_URL")
     auth_token = os.getenv("OS_TOKEN")
@@ -49,53 +49,16 @@ def load_credentials_and_create_session() -> session.Session:
 
     logging.info(
         "Token not found in environment. "
-        f"Falling back to sourcing '{OPENRC_PATH}' for password credentials"
+        f"Using the platform credentials of '{OPENRC_PATH}'"
     )
-    source_command = f"source {OPENRC_PATH} && env"
     try:
-        with open(os.devnull, "w") as fnull:
-            proc = subprocess.Popen(
-                ["bash", "-c", source_command],
-                stdout=subprocess.PIPE,
-                stderr=fnull,
-                universal_newlines=True,
-            )
-
-        creds = {}
-        for line in proc.stdout:
-            if "=" in line:
-                key, _, value = line.partition("=")
-                value = value.strip()
-                if key == "OS_USERNAME":
-                    creds["username"] = value
-                elif key == "OS_PASSWORD":
-                    creds["password"] = value
-                elif key == "OS_PROJECT_NAME":
-                    creds["project_name"] = value
-                elif key == "OS_AUTH_URL":
-                    creds["auth_url"] = value
-                elif key == "OS_REGION_NAME":
-                    creds["region_name"] = value
-                elif key == "OS_USER_DOMAIN_NAME":
-                    creds["user_domain_name"] = value
-                elif key == "OS_PROJECT_DOMAIN_NAME":
-                    creds["project_domain_name"] = value
-        proc.communicate()
-
-    except subprocess.SubprocessError as e:
-        logging.critical(f"Failed to execute source command: {e}")
+        return openstack_credentials.keystone_session(
+            openstack_credentials.get_token(
+                openstack_credentials.load_openrc(OPENRC_PATH)))
+    except (LookupError, OSError) as e:
+        logging.critical(f"Failed to authenticate with the platform credentials: {e}")
         sys.exit(1)
 
-    auth = v3.Password(
-        auth_url=creds.get("auth_url"),
-        username=creds.get("username"),
-        password=creds.get("password"),
-        project_name=creds.get("project_name"),
-        user_domain_name=creds.get("user_domain_name", "Default"),
-        project_domain_name=creds.get("project_domain_name", "Default"),
-    )
-    return session.Session(auth=auth)
-
 
 def main():
     parser = argparse.ArgumentParser(
@@ -162,6 +125,7 @@ def main():
     logging.info(f"Found {len(all_endpoints)} admin endpoints.")
 
     services_dict = {service.name: service.id for service in existing_services}
+    updated = False
 
     for item in service_list:
         service_name = item["service"]
@@ -199,9 +163,14 @@ def main():
                 enabled=True,
             )
             logging.info(f"Successfully updated endpoint for '{service_name}'")
+            updated = True
         except ks_exceptions.ClientException as e:
             logging.error(f"Failed to update endpoint for '{service_name}'. Error: {e}")
 
+    if updated:
+        # The catalog of the cached token is no longer current
+        openstack_credentials.invalidate()
+
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,6 @@
 #!/usr/bin/python3
 #
-# Copyright (c) 2025 Wind River Systems, Inc.
+# Copyright (c) 2025-2026 Wind River Systems, Inc.
 #
 # SPDX-License-Identifier: Apache-2.0
 #
@@ -10,7 +10,6 @@
 import os
 import sys
 import json
-import subprocess
 import argparse
 import time
 import secrets
@@ -24,22 +23,9 @@ from software_client import auth as sclient  # pylint: disable=import-error
 
 def get_os_env() -> Dict[str, str]:
     """Get OpenStack environment variables."""
-    source_command = "source /etc/platform/openrc && env"
-    with subprocess.Popen(
-        ["bash", "-c", source_command],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        universal_newlines=True,
-    ) as proc:
-        conf = {}
-        for line in proc.stdout:
-            line = line.strip()
-            if "=" in line and line.startswith("OS_"):
-                key, _, value = line.partition("=")
-                conf[key[3:].lower()] = value.strip()
-
-        proc.communicate()
-    return conf
+    import openstack_credentials
+    return openstack_credentials.conf_from_openrc(
+        openstack_credentials.load_openrc())
 
 
 def get_releases(software_version: str) -> List[Dict[str, Any]]:
@@ -8,12 +8,11 @@
 # in database if a reboot required operation during enrollment.
 #
 
-import os
-import subprocess
 import sys
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from cgtsclient import client as cgts_client
+import openstack_credentials
 from sysinv.common import constants as sysinv_constants
 
 
@@ -27,53 +26,18 @@ class CgtsClient(object):
     SYSINV_API_VERSION = 1
 
     def __init__(self):
-        self.conf = {}
+        self.conf = openstack_credentials.load_openrc()
         self._sysinv = None
 
-        source_command = "source /etc/platform/openrc && env"
-
-        with open(os.devnull, "w") as fnull:
-            proc = subprocess.Popen(
-                ["bash", "-c", source_command],
-                stdout=subprocess.PIPE,
-                stderr=fnull,
-                universal_newlines=True,
-            )
-
-        for line in proc.stdout:
-            key, _, value = line.partition("=")
-            if key == "OS_USERNAME":
-                self.conf["admin_user"] = value.strip()
-            elif key == "OS_PASSWORD":
-                self.conf["admin_pwd"] = value.strip()
-            elif key == "OS_PROJECT_NAME":
-                self.conf["admin_tenant"] = value.strip()
-            elif key == "OS_AUTH_URL":
-                self.conf["auth_url"] = value.strip()
-            elif key == "OS_REGION_NAME":
-                self.conf["region_name"] = value.strip()
-            elif key == "OS_USER_DOMAIN_NAME":
-                self.conf["user_domain"] = value.strip()
-            elif key == "OS_PROJECT_DOMAIN_NAME":
-                self.conf["project_domain"] = value.strip()
-
-        proc.communicate()
-
     @property
     def sysinv(self):
         if not self._sysinv:
+            token = openstack_credentials.get_token(self.conf)
             self._sysinv = cgts_client.get_client(
-                self.SYSINV_API_VERSION,
-                os_username=self.conf["admin_user"],
-                os_password=self.conf["admin_pwd"],
-                os_auth_url=self.conf["auth_url"],
-                os_project_name=self.conf["admin_tenant"],
-                os_project_domain_name=self.conf["project_domain"],
-                os_user_domain_name=self.conf["user_domain"],
-                os_region_name=self.conf["region_name"],
-                os_service_type="platform",
-                os_endpoint_type="admin",
-            )
+                str(self.SYSINV_API_VERSION),
+                os_auth_token=token.id,
+                system_url=openstack_credentials.sysinv_endpoint(
+                    token, self.conf, interface="admin"))
         return self._sysinv
 
 
@@ -16,10 +16,11 @@
 
 import json
 import os
-import subprocess
 import sys
 
 from cgtsclient import client as cgts_client
+import openstack_credentials
+import pg_dump_parser
 
 
 def log_info(msg):
@@ -37,52 +38,19 @@ def log_warn(msg):
 class CgtsClient(object):
     SYSINV_API_VERSION = 1
 
-    OPENRC_KEY_MAP = {
-        'OS_USERNAME': 'admin_user',
-        'OS_PASSWORD': 'admin_pwd',
-        'OS_PROJECT_NAME': 'admin_tenant',
-        'OS_AUTH_URL': 'auth_url',
-        'OS_REGION_NAME': 'region_name',
-        'OS_USER_DOMAIN_NAME': 'user_domain',
-        'OS_PROJECT_DOMAIN_NAME': 'project_domain',
-    }
-
     def __init__(self):
-        self.conf = {}
+        self.conf = openstack_credentials.load_openrc()
         self._sysinv = None
 
-        result = subprocess.run(
-            ['bash', '-c',
-             'source /etc/platform/openrc && env'],
-            capture_output=True, text=True)
-
-        if result.returncode != 0:
-            log_error("Failed to source openrc: %s"
-                      % result.stderr.strip())
-            sys.exit(1)
-
-        for line in result.stdout.splitlines():
-            key, _, value = line.partition("=")
-            if key in self.OPENRC_KEY_MAP:
-                self.conf[self.OPENRC_KEY_MAP[key]] = \
-                    value.strip()
-
     @property
     def sysinv(self):
         if not self._sysinv:
+            token = openstack_credentials.get_token(self.conf)
             self._sysinv = cgts_client.get_client(
-                self.SYSINV_API_VERSION,
-                os_username=self.conf['admin_user'],
-                os_password=self.conf['admin_pwd'],
-                os_auth_url=self.conf['auth_url'],
-                os_project_name=self.conf['admin_tenant'],
-                os_project_domain_name=self.conf[
-                    'project_domain'],
-                os_user_domain_name=self.conf[
-                    'user_domain'],
-                os_region_name=self.conf['region_name'],
-                os_service_type='platform',
-                os_endpoint_type='internal')
+                str(self.SYSINV_API_VERSION),
+                os_auth_token=token.id,
+                system_url=openstack_credentials.sysinv_endpoint(
+                    token, self.conf))
         return self._sysinv
 
 
@@ -93,32 +61,22 @@ def get_backup_fs_sizes(postgres_dump_file):
     :param postgres_dump_file: path to sysinv.postgreSql.data
     :returns: (ctrl_fs, host_fs) dicts of {name: size}
     """
-    backup_ctrl_fs = {}
-    backup_host_fs = {}
-    with open(postgres_dump_file) as f:
-        for line in f:
-            if 'INSERT INTO public.controller_fs VALUES' \
-                    in line:
-                # controller_fs columns:
-                # 0=created_at, 1=updated_at, 2=deleted_at,
-                # 3=id, 4=uuid, 5=forisystemid, 6=state,
-                # 7=name, 8=size, 9=logical_volume,
-                # 10=replicated, 11=supported_functions
-                cols = line.split('(', 1)[1] \
-                    .rstrip(');\n').split(', ')
-                backup_ctrl_fs[cols[7].strip("'")] = \
-                    int(cols[8])
-            elif 'INSERT INTO public.host_fs VALUES' \
-                    in line:
-                # host_fs columns:
-                # 0=created_at, 1=updated_at, 2=deleted_at,
-                # 3=id, 4=uuid, 5=name, 6=size,
-                # 7=logical_volume, 8=forihostid, 9=state,
-                # 10=supported_functions
-                cols = line.split('(', 1)[1] \
-                    .rstrip(');\n').split(', ')
-                backup_host_fs[cols[5].strip("'")] = \
-                    int(cols[6])
+    tables = pg_dump_parser.read_tables(postgres_dump_file,
+                                        ['controller_fs', 'host_fs'])
+    # controller_fs columns:
+    # 0=created_at, 1=updated_at, 2=deleted_at,
+    # 3=id, 4=uuid, 5=forisystemid, 6=state,
+    # 7=name, 8=size, 9=logical_volume,
+    # 10=replicated, 11=supported_functions
+    backup_ctrl_fs = dict((cols[7], int(cols[8]))
+                          for cols in tables['controller_fs'])
+    # host_fs columns:
+    # 0=created_at, 1=updated_at, 2=deleted_at,
+    # 3=id, 4=uuid, 5=name, 6=size,
+    # 7=logical_volume, 8=forihostid, 9=state,
+    # 10=supported_functions
+    backup_host_fs = dict((cols[5], int(cols[6]))
+                          for cols in tables['host_fs'])
 
     if not backup_ctrl_fs or not backup_host_fs:
         log_error(
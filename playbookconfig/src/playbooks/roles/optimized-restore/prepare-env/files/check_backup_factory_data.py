@@ -18,27 +18,23 @@
 import subprocess
 import sys
 
+import pg_dump_parser
+
 action = sys.argv[1]
 data_file = sys.argv[2]
 
 
-def read_lines(path):
-    with open(path) as f:
-        return f.readlines()
-
-
 if action == 'cpu':
     # Count CPU topology from i_icpu table
     # Columns: created_at(0), updated_at(1), deleted_at(2), id(3), uuid(4),
     #          cpu(5), core(6), thread(7), cpu_family(8), cpu_model(9),
     #          allocated_function(10), capabilities(11), forihostid(12), forinodeid(13)
-    rows = [r for r in read_lines(data_file) if 'INSERT INTO public.i_icpu VALUES' in r]
+    rows = pg_dump_parser.read_tables(data_file, ['i_icpu'])['i_icpu']
     cpus = len(rows)  # total logical CPUs
     nodes = set()  # unique NUMA nodes (sockets)
     cores = set()  # unique (node, core) pairs (physical cores)
     max_t = 0  # max threads
-    for r in rows:
-        parts = r.split('(', 1)[1].rstrip(');').split(', ')
+    for parts in rows:
         nodes.add(parts[-1])
         cores.add((parts[-1], parts[6]))
         max_t = max(max_t, int(parts[7]))
@@ -47,22 +43,19 @@ if action == 'cpu':
 
 elif action == 'pci':
     devices = set()
-    for line in read_lines(data_file):
-        if 'INSERT INTO public.pci_devices VALUES' in line:
-            parts = line.split('(', 1)[1].rstrip(');').split(', ')
-            devices.add(parts[9].strip("'") + ':' + parts[10].strip("'"))
+    for parts in pg_dump_parser.read_tables(
+            data_file, ['pci_devices'])['pci_devices']:
+        devices.add(parts[9] + ':' + parts[10])
     for d in sorted(devices):
         print(d)
 
 elif action == 'fs':
     backup = {}
-    for line in read_lines(data_file):
-        if 'INSERT INTO public.controller_fs VALUES' in line:
-            p = line.split('(', 1)[1].rstrip(');').split(', ')
-            backup[p[7].strip("'")] = int(p[8])
-        elif 'INSERT INTO public.host_fs VALUES' in line:
-            p = line.split('(', 1)[1].rstrip(');').split(', ')
-            backup[p[5].strip("'")] = int(p[6])
+    tables = pg_dump_parser.read_tables(data_file, ['controller_fs', 'host_fs'])
+    for p in tables['controller_fs']:
+        backup[p[7]] = int(p[8])
+    for p in tables['host_fs']:
+        backup[p[5]] = int(p[6])
     r = subprocess.run(
         ['sudo', '-u', 'postgres', 'psql', '-t', '-A', '-F', ',', '-c',
          "SELECT name, size FROM controller_fs UNION ALL SELECT name, size FROM host_fs",
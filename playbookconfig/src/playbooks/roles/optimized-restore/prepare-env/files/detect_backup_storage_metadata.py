@@ -12,9 +12,9 @@
 #   - Rook-ceph helm user_overrides (helm_overrides table)
 #   - Controller filesystem entries (controller_fs table)
 #
-# The dump uses multi-line INSERT statements (user_overrides can
-# contain embedded YAML with newlines). This script reassembles
-# multi-line statements before parsing.
+# The dump is parsed with the shared pg_dump_parser library, which
+# handles multi-line values (user_overrides can contain embedded YAML
+# with newlines), multi-row INSERT statements and COPY blocks.
 #
 # Usage: detect_backup_storage_metadata.py <sysinv_postgres_dump_file>
 #
@@ -23,96 +23,20 @@
 import json
 import sys
 
+import pg_dump_parser
 
-def iter_insert_statements(filepath, table_name):
-    """Iterate over complete INSERT statements for a table.
+# Tables read from the dump, all in a single pass
+METADATA_TABLES = ['storage_backend', 'kube_app', 'helm_overrides',
+                   'controller_fs']
 
-    Handles multi-line INSERT statements by accumulating lines
-    until a closing ');' is found. Streams line-by-line to avoid
-    loading the entire file into memory.
 
-    Yields complete INSERT statement strings.
-    """
-    marker = "INSERT INTO public.%s VALUES" % table_name
-    accumulating = False
-    buffer = []
-
-    with open(filepath) as f:
-        for line in f:
-            if not accumulating:
-                if marker in line:
-                    buffer = [line]
-                    if line.rstrip().endswith(');'):
-                        yield ''.join(buffer)
-                        buffer = []
-                    else:
-                        accumulating = True
-            else:
-                buffer.append(line)
-                if line.rstrip().endswith(');'):
-                    yield ''.join(buffer)
-                    buffer = []
-                    accumulating = False
-
-
-def parse_insert_values(statement):
-    """Parse a complete INSERT statement into positional values.
-
-    Handles quoted strings with embedded commas, parentheses,
-    and newlines. Returns list of raw string values.
-    """
-    # Find the VALUES ( ... ); portion
-    idx = statement.find('VALUES (')
-    if idx == -1:
-        return None
-    # Skip "VALUES ("
-    content = statement[idx + 8:]
-    # Remove trailing ");\n" or ");"
-    if content.rstrip().endswith(');'):
-        content = content.rstrip()[:-2]
-
-    # Parse respecting quoted strings
-    values = []
-    current = []
-    in_quote = False
-    i = 0
-    while i < len(content):
-        ch = content[i]
-        if in_quote:
-            if ch == "'" and i + 1 < len(content) and content[i + 1] == "'":
-                # Escaped quote ''
-                current.append("''")
-                i += 2
-                continue
-            elif ch == "'":
-                in_quote = False
-                current.append(ch)
-            else:
-                current.append(ch)
-        else:
-            if ch == "'":
-                in_quote = True
-                current.append(ch)
-            elif ch == ',' and not in_quote:
-                values.append(''.join(current).strip())
-                current = []
-            else:
-                current.append(ch)
-        i += 1
-    # Last value
-    values.append(''.join(current).strip())
-    return values
-
-
-def strip_quotes(val):
-    """Remove surrounding single quotes from a SQL value."""
-    if val and val.startswith("'") and val.endswith("'"):
-        return val[1:-1].replace("''", "'")
-    return val
-
-
-def extract_storage_backends(filepath):
-    """Extract storage_backend table entries.
+def read_metadata_tables(filepath):
+    """Read the rows of every table in METADATA_TABLES."""
+    return pg_dump_parser.read_tables(filepath, METADATA_TABLES)
+
+
+def extract_storage_backends(tables):
+    """Extract storage_backend table entries from the dump tables.
 
     Real column order (from dump inspection):
     0=created_at, 1=updated_at, 2=deleted_at, 3=id, 4=uuid,
@@ -120,19 +44,18 @@ def extract_storage_backends(filepath):
     10=capabilities, 11=name
     """
     backends = []
-    for stmt in iter_insert_statements(filepath, 'storage_backend'):
-        cols = parse_insert_values(stmt)
+    for cols in tables['storage_backend']:
         if cols and len(cols) >= 12:
             backends.append({
-                'backend': strip_quotes(cols[5]),
-                'name': strip_quotes(cols[11]),
-                'state': strip_quotes(cols[6]),
-                'services': strip_quotes(cols[9]),
+                'backend': cols[5],
+                'name': cols[11],
+                'state': cols[6],
+                'services': cols[9],
             })
     return backends
 
 
-def extract_helm_overrides_for_app(filepath, app_name):
+def extract_helm_overrides_for_app(tables, app_name):
     """Extract helm_overrides entries for a given app.
 
     First finds the app_id from kube_app table, then extracts
@@ -149,11 +72,10 @@ def extract_helm_overrides_for_app(filepath, app_name):
     """
     # Find app_id
     app_id = None
-    for stmt in iter_insert_statements(filepath, 'kube_app'):
-        cols = parse_insert_values(stmt)
+    for cols in tables['kube_app']:
         if cols and len(cols) >= 4:
-            if strip_quotes(cols[3]) == app_name:
-                app_id = strip_quotes(cols[2])
+            if cols[3] == app_name:
+                app_id = cols[2]
                 break
 
     if app_id is None:
@@ -161,25 +83,24 @@ def extract_helm_overrides_for_app(filepath, app_name):
 
     # Extract overrides
     overrides = []
-    for stmt in iter_insert_statements(filepath, 'helm_overrides'):
-        cols = parse_insert_values(stmt)
+    for cols in tables['helm_overrides']:
         if cols and len(cols) >= 8:
-            line_app_id = strip_quotes(cols[7])
+            line_app_id = cols[7]
             if line_app_id == app_id:
-                user_ov = strip_quotes(cols[6])
+                user_ov = cols[6]
                 if user_ov in ('NULL', '', 'None', None):
                     user_ov = None
                 has_ov = user_ov is not None
                 overrides.append({
-                    'chart_name': strip_quotes(cols[4]),
-                    'namespace': strip_quotes(cols[5]),
+                    'chart_name': cols[4],
+                    'namespace': cols[5],
                     'has_user_overrides': has_ov,
                     'user_overrides': user_ov if has_ov else None,
                 })
     return overrides
 
 
-def extract_controller_fs(filepath):
+def extract_controller_fs(tables):
     """Extract controller_fs entries.
 
     Real column order:
@@ -188,15 +109,14 @@ def extract_controller_fs(filepath):
     10=replicated, 11=supported_functions
     """
     filesystems = []
-    for stmt in iter_insert_statements(filepath, 'controller_fs'):
-        cols = parse_insert_values(stmt)
+    for cols in tables['controller_fs']:
         if cols and len(cols) >= 10:
-            size_raw = strip_quotes(cols[8])
+            size_raw = cols[8]
             size = int(size_raw) if size_raw not in ('NULL', '', None) else 0
             filesystems.append({
-                'name': strip_quotes(cols[7]),
+                'name': cols[7],
                 'size': size,
-                'logical_volume': strip_quotes(cols[9]),
+                'logical_volume': cols[9],
             })
     return filesystems
 
@@ -207,12 +127,11 @@ def main():
               % sys.argv[0], file=sys.stderr)
         sys.exit(1)
 
-    dump_file = sys.argv[1]
+    tables = read_metadata_tables(sys.argv[1])
 
-    storage_backends = extract_storage_backends(dump_file)
-    rook_overrides = extract_helm_overrides_for_app(
-        dump_file, 'rook-ceph')
-    controller_fs = extract_controller_fs(dump_file)
+    storage_backends = extract_storage_backends(tables)
+    rook_overrides = extract_helm_overrides_for_app(tables, 'rook-ceph')
+    controller_fs = extract_controller_fs(tables)
 
     # Determine primary backend type
     primary_backend = None
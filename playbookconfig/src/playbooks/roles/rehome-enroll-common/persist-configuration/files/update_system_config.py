@@ -8,8 +8,8 @@
 #
 
 import configparser
+import openstack_credentials
 import os
-import subprocess
 import sys
 import time
 
@@ -35,7 +35,6 @@ CONF.optionxform = str
 
 RECONFIGURE_NETWORK = False
 RECONFIGURE_SERVICE = False
-SOURCE_COMMAND = 'source /etc/platform/openrc && env'
 
 
 def print_with_timestamp(*args, **kwargs):
@@ -64,6 +63,7 @@ def is_supported_version(version, minimum_version):
 class BaseClient(object):
     def __init__(self):
         self.conf = {}
+        self.openrc = {}
         self.auth_url = os.getenv("OS_AUTH_URL")
         self.auth_token = os.getenv("OS_TOKEN")
         self.system_url = os.getenv("SYSTEM_URL")
@@ -71,19 +71,9 @@ class BaseClient(object):
             self.source_credentials()
 
     def source_credentials(self):
-        with open(os.devnull, "w") as fnull:
-            proc = subprocess.Popen(
-                ['bash', '-c', SOURCE_COMMAND],
-                stdout=subprocess.PIPE, stderr=fnull,
-                universal_newlines=True)
-
+        self.openrc = openstack_credentials.load_openrc()
         # Strip the configurations starts with 'OS_' and change the value to lower
-        for line in proc.stdout:
-            key, _, value = line.partition("=")
-            if key.startswith('OS_'):
-                self.conf[key[3:].lower()] = value.strip()
-
-        proc.communicate()
+        self.conf = openstack_credentials.conf_from_openrc(self.openrc)
 
 
 # CgtsClient class to handle API interactions
@@ -104,17 +94,12 @@ class CgtsClient(BaseClient):
                     system_url=self.system_url,
                 )
             else:
+                token = openstack_credentials.get_token(self.openrc)
                 self._sysinv = cgts_client.get_client(
-                    self.SYSINV_API_VERSION,
-                    os_username=self.conf['username'],
-                    os_password=self.conf['password'],
-                    os_auth_url=self.conf['auth_url'],
-                    os_project_name=self.conf['project_name'],
-                    os_project_domain_name=self.conf['project_domain_name'],
-                    os_user_domain_name=self.conf['user_domain_name'],
-                    os_region_name=self.conf['region_name'],
-                    os_service_type='platform',
-                    os_endpoint_type='internal'
+                    str(self.SYSINV_API_VERSION),
+                    os_auth_token=token.id,
+                    system_url=openstack_credentials.sysinv_endpoint(
+                        token, self.openrc),
                 )
         return self._sysinv
 
@@ -138,14 +123,8 @@ class OpenStackClient(BaseClient):
                     project_domain_name=os.getenv("OS_PROJECT_DOMAIN_NAME", "Default"),
                 )
             else:
-                auth = v3.Password(
-                    auth_url=conf["auth_url"],
-                    username=conf["username"],
-                    password=conf["password"],
-                    user_domain_name=conf["user_domain_name"],
-                    project_name=conf["project_name"],
-                    project_domain_name=conf["project_domain_name"],
-                )
+                return openstack_credentials.keystone_session(
+                    openstack_credentials.get_token(self.openrc))
         except KeyError as e:
             print_with_timestamp(f"Configuration key missing: {e}")
             sys.exit(1)
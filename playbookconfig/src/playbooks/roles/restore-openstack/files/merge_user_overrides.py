@@ -6,10 +6,11 @@
 #
 
 import copy
-import re
 import sys
 import yaml
 
+import pg_dump_parser
+
 
 def parse_yaml(text):
     """
@@ -51,12 +52,7 @@ def escape_sql(value):
 def unwrap(val):
     if not val or val.strip() == "NULL":
         return None
-    val = val.strip()
-    if val.upper().startswith("E'") and val.endswith("'"):
-        val = val[2:-1].replace("''", "'").replace("\\\\", "\\")
-    elif val.startswith("'") and val.endswith("'"):
-        val = val[1:-1].replace("''", "'")
-    return val
+    return pg_dump_parser.parse_value(val)
 
 
 def parse_sql_updates(sql):
@@ -65,25 +61,23 @@ def parse_sql_updates(sql):
     a mapping of names to their system_overrides and user_overrides.
 
     Args:
-        sql: SQL string containing update statements.
+        sql: SQL string or iterable of lines (e.g. an open file)
+             containing update statements.
     """
-    # quote_literal() uses E'...' when the value contains backslashes.
-    # The bellow regex handles both plain ('...') and E-quoted (E'...') strings.
+    # quote_literal() uses E'...' when the value contains backslashes,
+    # pg_dump_parser decodes both plain ('...') and E-quoted strings.
     # Ref: https://www.postgresql.org/docs/14/sql-syntax-lexical.html#SQL-SYNTAX-STRINGS-ESCAPE
-    quoted = r"(?:E)?'(?:''|\\.|[^'])*'(?!')"
-    pattern = re.compile(
-        r"update\s+helm_overrides\s+set\s+"
-        r"system_overrides=(NULL|" + quoted + r"),\s*"
-        r"user_overrides=(NULL|" + quoted + r")\s*"
-        r"where\s+name='([^']+)'",
-        re.IGNORECASE | re.DOTALL,
-    )
+    if isinstance(sql, str):
+        sql = sql.splitlines(True)
     result = {}
-    for system, user, name in pattern.findall(sql):
-        result[name] = {
-            "system_overrides": unwrap(system),
-            "user_overrides": unwrap(user),
-        }
+    for statement in pg_dump_parser.iter_statements(sql):
+        for table, values, where in pg_dump_parser.iter_updates(statement):
+            if table != "helm_overrides" or "name" not in where:
+                continue
+            result[where["name"]] = {
+                "system_overrides": values.get("system_overrides"),
+                "user_overrides": values.get("user_overrides"),
+            }
     return result
 
 
@@ -91,10 +85,10 @@ def main():
     incoming_file, current_file, output_file = sys.argv[1:4]
 
     with open(incoming_file) as f:
-        incoming = parse_sql_updates(f.read())
+        incoming = parse_sql_updates(f)
 
     with open(current_file) as f:
-        current = parse_sql_updates(f.read())
+        current = parse_sql_updates(f)
 
     output = []
 
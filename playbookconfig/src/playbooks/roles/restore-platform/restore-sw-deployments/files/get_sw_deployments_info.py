@@ -7,26 +7,70 @@
 
 from argparse import ArgumentParser
 from collections import defaultdict
+from fnmatch import fnmatch
 from functools import lru_cache
 import json
 from pathlib import Path
 import subprocess
+import tarfile
 import defusedxml.ElementTree as ET
 
-TAR_CMD = ["tar", "--use-compress-program=pigz"]
+DECOMPRESS_CMD = ["pigz", "-dc"]
+
+METADATA_PATTERN = "opt/software/releases/metadata/*/*.xml"
+CONTROLLER_STATE = "opt/software/.controller.state"
 
 MINIMUM_SW_VERSION = (24, 9)
 
 
+def build_backup_index(fileobj):
+    """Index the software deployment members of an uncompressed tar stream.
+
+    The stream is read once, in order. Returns a dict mapping every member
+    matching METADATA_PATTERN or CONTROLLER_STATE to its text content
+    (None for non-regular members such as directories).
+    """
+
+    index = {}
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+            for member in tar:
+                name = member.name
+                if name != CONTROLLER_STATE and not fnmatch(name, METADATA_PATTERN):
+                    continue
+                content = None
+                if member.isfile():
+                    content = tar.extractfile(member).read().decode()
+                index[name] = content
+    except tarfile.TarError:
+        # Keep what was read so far, a truncated or unreadable backup is
+        # handled the same way as one without software deployments data.
+        pass
+    return index
+
+
 @lru_cache(maxsize=None)
+def get_backup_index(backup_data):
+    """Build the software deployments index with a single pass over the backup"""
+
+    with subprocess.Popen(
+        DECOMPRESS_CMD + [backup_data],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ) as p:
+        index = build_backup_index(p.stdout)
+        p.stdout.close()
+    return index
+
+
 def read_file(backup_data, path):
     """Read a single file from the backup tar"""
 
-    return subprocess.check_output(
-        TAR_CMD + ["-Oxf", backup_data, path],
-        text=True,
-        stderr=subprocess.DEVNULL,
-    )
+    content = get_backup_index(backup_data).get(path)
+    if content is None:
+        raise FileNotFoundError(
+            "{} not found in {}".format(path, backup_data))
+    return content
 
 
 def get_sw_version(patch_metadata):
@@ -67,15 +111,7 @@ def get_metadata(backup_data):
     """
 
     metadata = {}
-    p = subprocess.run(
-        TAR_CMD + ["--wildcards", "-tf", backup_data,
-                   "opt/software/releases/metadata/*/*.xml"],
-        text=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.DEVNULL,
-        check=False,
-    )
-    entries = p.stdout.splitlines() if p.returncode == 0 else []
+    entries = [v for v in get_backup_index(backup_data) if v != CONTROLLER_STATE]
     for v in entries:
         state = Path(v).parent.name
         metadata.setdefault(state, []).append(v)
@@ -139,12 +175,7 @@ def get_target_commit(backup_data, deployed_groups):
 def check_if_backup_patched(backup_data):
     """Return if this backup has patching data"""
 
-    rc = subprocess.call(
-        TAR_CMD + ["-tf", backup_data, "opt/software/.controller.state"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-    return rc == 0
+    return CONTROLLER_STATE in get_backup_index(backup_data)
 
 
 def get_deployments_to_restore(deployed_groups):
@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# In-process Kubernetes client shared by the migration scripts.
+#
+# All the requests of a script go through a single API client, so the
+# connection to the API server is reused instead of starting one kubectl
+# process per query. Lists are paginated with limit/continue and parsed
+# page by page from the raw JSON, without building the client models,
+# and accept server-side label and field selectors. The PVs, PVCs and
+# StorageClasses are listed once per run and cached.
+#
+# Items have the same layout as in "kubectl get -o json", except that
+# the API does not repeat kind and apiVersion in each item of a list.
+#
+# The scripts using it are run with this directory in PYTHONPATH.
+
+import json
+import os
+
+from kubernetes import client
+from kubernetes import config
+
+DEFAULT_KUBECONFIG = '/etc/kubernetes/admin.conf'
+
+# Objects requested per page
+PAGE_SIZE = 500
+
+# kind -> (API class, namespaced list method, all namespaces list method)
+KINDS = {
+    'PersistentVolume': ('CoreV1Api', None, 'list_persistent_volume'),
+    'PersistentVolumeClaim': (
+        'CoreV1Api', 'list_namespaced_persistent_volume_claim',
+        'list_persistent_volume_claim_for_all_namespaces'),
+    'Pod': ('CoreV1Api', 'list_namespaced_pod', 'list_pod_for_all_namespaces'),
+    'Node': ('CoreV1Api', None, 'list_node'),
+    'StorageClass': ('StorageV1Api', None, 'list_storage_class'),
+}
+
+
+class KubeClient(object):
+    """Lists Kubernetes objects through one API connection"""
+
+    def __init__(self, kubeconfig=None, page_size=PAGE_SIZE, api_client=None):
+        if api_client is None:
+            config.load_kube_config(
+                config_file=kubeconfig or os.environ.get(
+                    'KUBECONFIG', DEFAULT_KUBECONFIG))
+            api_client = client.ApiClient()
+        self.api_client = api_client
+        self.page_size = page_size
+        self._apis = {}
+        self._cache = {}
+
+    def _api(self, name):
+        if name not in self._apis:
+            self._apis[name] = getattr(client, name)(self.api_client)
+        return self._apis[name]
+
+    def iter_items(self, kind, namespace=None, label_selector=None,
+                   field_selector=None):
+        """Yield the objects of a kind, one page at a time"""
+
+        api_name, namespaced_method, cluster_method = KINDS[kind]
+        api = self._api(api_name)
+        if namespace:
+            if not namespaced_method:
+                raise ValueError('%s is not namespaced' % kind)
+            method = getattr(api, namespaced_method)
+            args = (namespace,)
+        else:
+            method = getattr(api, cluster_method)
+            args = ()
+
+        kwargs = {'limit': self.page_size, '_preload_content': False}
+        if label_selector:
+            kwargs['label_selector'] = label_selector
+        if field_selector:
+            kwargs['field_selector'] = field_selector
+        while True:
+            page = json.loads(method(*args, **kwargs).data)
+            for item in page.get('items') or []:
+                yield item
+            token = (page.get('metadata') or {}).get('continue')
+            if not token:
+                return
+            kwargs['_continue'] = token
+
+    def list(self, kind, **selectors):
+        return list(self.iter_items(kind, **selectors))
+
+    def cached(self, kind):
+        """All the objects of a kind, listed once per run"""
+
+        if kind not in self._cache:
+            self._cache[kind] = self.list(kind)
+        return self._cache[kind]
+
+    def pvs(self):
+        return self.cached('PersistentVolume')
+
+    def pvcs(self):
+        return self.cached('PersistentVolumeClaim')
+
+    def storage_classes(self):
+        return self.cached('StorageClass')
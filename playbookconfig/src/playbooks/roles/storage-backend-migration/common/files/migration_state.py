@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Local state store of the storage backend migration.
+#
+# Records the progress of each role (per host) and of the items a role
+# works through (PVCs, images...) with their timings, in a SQLite database
+# kept next to the migration backups. A failed migration resumes from the
+# items already done instead of starting the role over.
+#
+# The store belongs to one migration run: when a different run id is
+# given, the records of the previous run are dropped.
+#
+# Usage: migration_state.py --db PATH [--run ID] start ROLE [--host HOST]
+#        migration_state.py --db PATH [--run ID] finish|fail ROLE [--host HOST]
+#        migration_state.py --db PATH [--run ID] item ROLE ITEM [--elapsed T]
+#        migration_state.py --db PATH [--run ID] forget ROLE
+#        migration_state.py --db PATH status|reset
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run (
+    id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS roles (
+    role TEXT NOT NULL,
+    host TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started REAL,
+    finished REAL,
+    elapsed REAL,
+    PRIMARY KEY (role, host)
+);
+CREATE TABLE IF NOT EXISTS items (
+    role TEXT NOT NULL,
+    item TEXT NOT NULL,
+    finished REAL NOT NULL,
+    elapsed REAL,
+    PRIMARY KEY (role, item)
+);
+"""
+
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def parse_elapsed(value):
+    """Seconds from a number or an Ansible delta such as 0:01:02.500000"""
+
+    if value is None or value == '':
+        return None
+    seconds = 0.0
+    for part in str(value).split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+class StateStore(object):
+    """Progress of the migration roles and of their items"""
+
+    def __init__(self, path, run_id=None, timeout=30):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=timeout)
+        with self.db:
+            self.db.executescript(SCHEMA)
+            if run_id:
+                self._check_run(run_id)
+
+    def close(self):
+        self.db.close()
+
+    def _check_run(self, run_id):
+        row = self.db.execute('SELECT id FROM run').fetchone()
+        if row and row[0] == run_id:
+            return
+        self._clear()
+        self.db.execute('INSERT INTO run (id) VALUES (?)', (run_id,))
+
+    def _clear(self):
+        for table in ('run', 'roles', 'items'):
+            self.db.execute('DELETE FROM %s' % table)
+
+    def reset(self):
+        with self.db:
+            self._clear()
+
+    def start_role(self, role, host):
+        """Mark the role as running and return its progress so far"""
+
+        with self.db:
+            row = self.db.execute(
+                'SELECT status FROM roles WHERE role = ? AND host = ?',
+                (role, host)).fetchone()
+            self.db.execute(
+                'INSERT OR REPLACE INTO roles (role, host, status, started) '
+                'VALUES (?, ?, ?, ?)', (role, host, RUNNING, time.time()))
+        return {'role': role,
+                'previous_status': row[0] if row else None,
+                'done_items': self.done_items(role)}
+
+    def _end_role(self, role, host, status):
+        now = time.time()
+        with self.db:
+            row = self.db.execute(
+                'SELECT started FROM roles WHERE role = ? AND host = ?',
+                (role, host)).fetchone()
+            started = row[0] if row and row[0] is not None else now
+            self.db.execute(
+                'INSERT OR REPLACE INTO roles '
+                '(role, host, status, started, finished, elapsed) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (role, host, status, started, now, now - started))
+
+    def finish_role(self, role, host):
+        self._end_role(role, host, DONE)
+
+    def fail_role(self, role, host):
+        self._end_role(role, host, FAILED)
+
+    def finish_item(self, role, item, elapsed=None):
+        with self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO items (role, item, finished, elapsed) '
+                'VALUES (?, ?, ?, ?)', (role, item, time.time(), elapsed))
+
+    def done_items(self, role):
+        rows = self.db.execute(
+            'SELECT item FROM items WHERE role = ? ORDER BY finished',
+            (role,)).fetchall()
+        return [row[0] for row in rows]
+
+    def forget(self, role):
+        """Drop the progress of a role, so that it runs from the start"""
+
+        with self.db:
+            self.db.execute('DELETE FROM roles WHERE role = ?', (role,))
+            self.db.execute('DELETE FROM items WHERE role = ?', (role,))
+
+    def status(self):
+        """Timings of the roles and of their items, in order of execution"""
+
+        run = self.db.execute('SELECT id FROM run').fetchone()
+        roles = []
+        for role, host, status, started, elapsed in self.db.execute(
+                'SELECT role, host, status, started, elapsed FROM roles '
+                'ORDER BY started'):
+            items = self.db.execute(
+                'SELECT COUNT(*), SUM(elapsed) FROM items WHERE role = ?',
+                (role,)).fetchone()
+            roles.append({'role': role, 'host': host, 'status': status,
+                          'elapsed': elapsed, 'items': items[0],
+                          'items_elapsed': items[1]})
+        return {'run': run[0] if run else None, 'roles': roles}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Record and query the progress of the migration.')
+    parser.add_argument('--db', required=True, help='Path of the database')
+    parser.add_argument('--run', help='Id of the migration run; the '
+                        'records of another run are dropped')
+    subparsers = parser.add_subparsers(dest='action')
+    subparsers.required = True
+
+    for action in ('start', 'finish', 'fail'):
+        sub = subparsers.add_parser(action)
+        sub.add_argument('role')
+        sub.add_argument('--host', default='localhost')
+
+    sub = subparsers.add_parser('item')
+    sub.add_argument('role')
+    sub.add_argument('item')
+    sub.add_argument('--elapsed', help='Seconds or Ansible delta')
+
+    sub = subparsers.add_parser('forget')
+    sub.add_argument('role')
+
+    subparsers.add_parser('status')
+    subparsers.add_parser('reset')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = StateStore(args.db, args.run)
+    try:
+        if args.action == 'start':
+            print(json.dumps(store.start_role(args.role, args.host)))
+        elif args.action == 'finish':
+            store.finish_role(args.role, args.host)
+        elif args.action == 'fail':
+            store.fail_role(args.role, args.host)
+        elif args.action == 'item':
+            store.finish_item(args.role, args.item,
+                              parse_elapsed(args.elapsed))
+        elif args.action == 'forget':
+            store.forget(args.role)
+        elif args.action == 'status':
+            print(json.dumps(store.status()))
+        elif args.action == 'reset':
+            store.reset()
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
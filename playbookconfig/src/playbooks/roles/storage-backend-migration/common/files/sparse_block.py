@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Sparse backup of block devices.
+#
+# Only the allocated extents of the device are read and stored, each chunk
+# compressed separately by a pool of threads. The extents are taken from an
+# "rbd diff --format json" file when given, else from SEEK_DATA/SEEK_HOLE,
+# and chunks that are all zeros are not stored either.
+#
+# Backup format, all integers big endian:
+#   header   b'STXSPBLK', device size (Q), chunk size (I)
+#   records  offset (Q), data length (I), compressed length (I), zlib data
+#   trailer  END_OFFSET (Q), 0 (I), 32 (I), sha256 of the records
+#
+# Usage:
+#   sparse_block.py export --device DEV --output FILE [--extents FILE]
+#   sparse_block.py import --input FILE --device DEV [--holes zero|skip]
+#
+# The script only uses the standard library so that it can be piped to
+# python3 in the migration pods.
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import struct
+import sys
+import zlib
+
+MAGIC = b'STXSPBLK'
+HEADER = struct.Struct('>QI')
+RECORD = struct.Struct('>QII')
+END_OFFSET = 0xFFFFFFFFFFFFFFFF
+CHUNK_SIZE = 4 * 1024 * 1024
+COMPRESS_LEVEL = 6
+BLKZEROOUT = 0x127F
+
+
+class SparseBlockError(Exception):
+    pass
+
+
+def device_size(fd):
+    return os.lseek(fd, 0, os.SEEK_END)
+
+
+def rbd_diff_extents(path):
+    """Return the (offset, length) extents listed by rbd diff"""
+
+    with open(path) as f:
+        diff = json.load(f)
+    return [(int(e['offset']), int(e['length'])) for e in diff
+            if str(e.get('exists', 'true')).lower() == 'true']
+
+
+def seek_data_extents(fd, size):
+    """Return the data extents of fd, or the whole device if unsupported"""
+
+    extents = []
+    offset = 0
+    try:
+        while offset < size:
+            try:
+                start = os.lseek(fd, offset, os.SEEK_DATA)
+            except OSError as e:
+                if e.errno == errno.ENXIO:
+                    break
+                raise
+            end = os.lseek(fd, start, os.SEEK_HOLE)
+            extents.append((start, end - start))
+            offset = end
+    except (OSError, AttributeError):
+        return [(0, size)]
+    return extents
+
+
+def chunks(extents, size, chunk_size=CHUNK_SIZE):
+    """Split the sorted and merged extents into chunks of chunk_size"""
+
+    merged = []
+    for offset, length in sorted(extents):
+        end = min(offset + length, size)
+        if merged and offset <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        elif end > offset:
+            merged.append([offset, end])
+    for start, end in merged:
+        for offset in range(start, end, chunk_size):
+            yield offset, min(chunk_size, end - offset)
+
+
+def _bounded_map(executor, func, items, window):
+    """executor.map that only keeps window items in flight"""
+
+    pending = []
+    for item in items:
+        pending.append(executor.submit(func, *item))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def export_device(device, output, extents_file=None, workers=None,
+                  chunk_size=CHUNK_SIZE):
+    """Write the sparse backup of device to output, return its stats"""
+
+    workers = workers or os.cpu_count() or 1
+    fd = os.open(device, os.O_RDONLY)
+    try:
+        size = device_size(fd)
+        extents = None
+        if extents_file:
+            try:
+                extents = rbd_diff_extents(extents_file)
+            except FileNotFoundError:
+                pass
+        if extents is None:
+            extents = seek_data_extents(fd, size)
+        zeros = bytes(chunk_size)
+
+        def read_chunk(offset, length):
+            data = os.pread(fd, length, offset)
+            if data == zeros[:len(data)]:
+                return offset, len(data), None
+            return offset, len(data), zlib.compress(data, COMPRESS_LEVEL)
+
+        stats = {'device_size': size, 'data_bytes': 0, 'records': 0,
+                 'stored_bytes': 0}
+        sha256 = hashlib.sha256()
+        tmp = output + '.part'
+        with open(tmp, 'wb') as out, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            out.write(MAGIC + HEADER.pack(size, chunk_size))
+            for offset, length, data in _bounded_map(
+                    executor, read_chunk, chunks(extents, size, chunk_size),
+                    workers * 2):
+                if data is None:
+                    continue
+                record = RECORD.pack(offset, length, len(data))
+                sha256.update(record)
+                sha256.update(data)
+                out.write(record)
+                out.write(data)
+                stats['data_bytes'] += length
+                stats['records'] += 1
+                stats['stored_bytes'] += len(data)
+            out.write(RECORD.pack(END_OFFSET, 0, sha256.digest_size))
+            out.write(sha256.digest())
+        os.rename(tmp, output)
+        return stats
+    finally:
+        os.close(fd)
+
+
+def read_header(f):
+    """Return the (device size, chunk size) of a backup"""
+
+    header = f.read(len(MAGIC) + HEADER.size)
+    if len(header) != len(MAGIC) + HEADER.size or \
+            not header.startswith(MAGIC):
+        raise SparseBlockError('not a sparse block backup')
+    return HEADER.unpack(header[len(MAGIC):])
+
+
+def read_records(f):
+    """Yield the (offset, length, data) records after the header, checked"""
+
+    sha256 = hashlib.sha256()
+    while True:
+        header = f.read(RECORD.size)
+        if len(header) != RECORD.size:
+            raise SparseBlockError('backup is truncated')
+        offset, length, stored = RECORD.unpack(header)
+        data = f.read(stored)
+        if len(data) != stored:
+            raise SparseBlockError('backup is truncated')
+        if offset == END_OFFSET:
+            if data != sha256.digest():
+                raise SparseBlockError('backup checksum mismatch')
+            return
+        sha256.update(header)
+        sha256.update(data)
+        yield offset, length, data
+
+
+def _zero_range(fd, offset, length, zeros):
+    try:
+        fcntl.ioctl(fd, BLKZEROOUT, struct.pack('QQ', offset, length))
+        return
+    except OSError:
+        pass
+    while length > 0:
+        written = os.pwrite(fd, zeros[:min(length, len(zeros))], offset)
+        offset += written
+        length -= written
+
+
+def import_device(backup, device, holes='zero', workers=None):
+    """Write a sparse backup to device, return its stats
+
+    Holes are left alone when holes is 'skip', for targets that already
+    read as zeros such as new thin volumes and files. Otherwise they are
+    zeroed, with BLKZEROOUT when the device supports it.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    try:
+        is_file = stat.S_ISREG(os.stat(device).st_mode)
+    except FileNotFoundError:
+        is_file = True
+    flags = os.O_WRONLY | (os.O_CREAT | os.O_TRUNC if is_file else 0)
+    fd = os.open(device, flags, 0o600)
+    try:
+        with open(backup, 'rb') as f:
+            size, chunk_size = read_header(f)
+            if is_file:
+                os.ftruncate(fd, size)
+                holes = 'skip'
+            elif device_size(fd) < size:
+                raise SparseBlockError('%s is smaller than the backup (%d)'
+                                       % (device, size))
+
+            def write_chunk(offset, length, data):
+                data = zlib.decompress(data)
+                if len(data) != length:
+                    raise SparseBlockError('bad record at %d' % offset)
+                os.pwrite(fd, data, offset)
+                return offset, length
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                written = list(_bounded_map(executor, write_chunk,
+                                            read_records(f), workers * 2))
+        if holes == 'zero':
+            zeros = bytes(chunk_size)
+            position = 0
+            for offset, length in sorted(written) + [(size, 0)]:
+                if offset > position:
+                    _zero_range(fd, position, offset - position, zeros)
+                position = max(position, offset + length)
+        os.fsync(fd)
+        return {'device_size': size,
+                'data_bytes': sum(length for _, length in written),
+                'records': len(written)}
+    finally:
+        os.close(fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Sparse backup of block devices.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export')
+    export_parser.add_argument('--device', required=True)
+    export_parser.add_argument('--output', required=True)
+    export_parser.add_argument('--extents',
+                               help='rbd diff --format json of the device')
+    import_parser = subparsers.add_parser('import')
+    import_parser.add_argument('--input', required=True)
+    import_parser.add_argument('--device', required=True)
+    import_parser.add_argument('--holes', choices=['zero', 'skip'],
+                               default='zero')
+    for subparser in (export_parser, import_parser):
+        subparser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'export':
+            stats = export_device(args.device, args.output, args.extents,
+                                  args.workers)
+        else:
+            stats = import_device(args.input, args.device, args.holes,
+                                  args.workers)
+    except (OSError, SparseBlockError, zlib.error) as e:
+        print('ERROR: %s' % e, file=sys.stderr)
+        return 1
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Collects the Ceph usage of Filesystem PVCs in bulk.
+#
+# PVCs are mapped to their RBD image or CephFS subvolume from one listing
+# of the PVs and PVCs. RBD usage comes from one "rbd du" per pool
+# (fast when the images have the fast-diff feature), CephFS usage from
+# "ceph fs subvolume info" calls run in parallel.
+#
+# Outputs the PVCs with their used_bytes, as consumed by
+# compute_initial_sizes.py.
+# Usage: collect_pvc_usage.py <pvcs json file>
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import subprocess
+import sys
+
+from kube_client import KubeClient
+
+DEFAULT_RBD_POOL = 'kube-rbd'
+DEFAULT_CEPHFS = 'kube-cephfs'
+DEFAULT_SUBVOLUME_GROUP = 'csi'
+
+
+class UsageError(Exception):
+    pass
+
+
+def run_json(cmd):
+    """Run a command with JSON output and return it parsed"""
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise UsageError('%s failed: %s' % (' '.join(cmd),
+                                            result.stderr.strip()))
+    try:
+        return json.loads(result.stdout or 'null')
+    except ValueError as e:
+        raise UsageError('%s: could not parse the output: %s'
+                         % (' '.join(cmd), e))
+
+
+def get_volume_attributes(kube):
+    """Map (namespace, pvc name) to the CSI volume attributes of its PV"""
+
+    pvs = {}
+    for item in kube.pvs():
+        pvs[item['metadata']['name']] = \
+            (item.get('spec', {}).get('csi') or {}).get('volumeAttributes', {})
+    claims = {}
+    for item in kube.pvcs():
+        metadata = item.get('metadata', {})
+        claims[(metadata.get('namespace'), metadata.get('name'))] = \
+            item.get('spec', {}).get('volumeName')
+    return dict((claim, pvs.get(pv, {})) for claim, pv in claims.items())
+
+
+def rbd_pool_usage(pool):
+    """Map image name to used bytes for all images of the pool"""
+
+    try:
+        data = run_json(['rbd', 'du', '--pool', pool, '--format', 'json'])
+    except UsageError:
+        # The images are then sized one by one with rbd diff
+        return {}
+    usage = {}
+    for image in (data or {}).get('images', []):
+        # Snapshots are listed too, only the image itself is sized
+        if image.get('snapshot'):
+            continue
+        usage[image['name']] = int(image.get('used_size', 0))
+    return usage
+
+
+def rbd_image_usage(pool, image):
+    """Used bytes of one image from rbd diff, for images rbd du missed"""
+
+    extents = run_json(['rbd', 'diff', '--pool', pool, '--image', image,
+                        '--format', 'json'])
+    return sum(int(e['length']) for e in extents or []
+               if str(e.get('exists', 'true')).lower() == 'true')
+
+
+def cephfs_subvolume_usage(fs_name, subvolume, group):
+    info = run_json(['ceph', 'fs', 'subvolume', 'info', fs_name, subvolume,
+                     group, '--format', 'json'])
+    return int((info or {}).get('bytes_used', 0) or 0)
+
+
+def collect(pvcs, workers=8, kube=None):
+    """Return the PVCs with their used_bytes"""
+
+    attributes = get_volume_attributes(kube or KubeClient())
+    rbd_pools = {}
+    results = []
+    cephfs_jobs = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for pvc in pvcs:
+            attrs = attributes.get((pvc['namespace'], pvc['name']), {})
+            result = dict(pvc, used_bytes=0)
+            results.append(result)
+            if pvc['type'] == 'CephFS':
+                subvolume = attrs.get('subvolumeName')
+                if subvolume:
+                    cephfs_jobs.append((result, executor.submit(
+                        cephfs_subvolume_usage,
+                        attrs.get('fsName', DEFAULT_CEPHFS), subvolume,
+                        attrs.get('subvolumeGroup', DEFAULT_SUBVOLUME_GROUP))))
+                continue
+            image = attrs.get('imageName')
+            if not image:
+                continue
+            pool = attrs.get('pool', DEFAULT_RBD_POOL)
+            if pool not in rbd_pools:
+                rbd_pools[pool] = rbd_pool_usage(pool)
+            if image in rbd_pools[pool]:
+                result['used_bytes'] = rbd_pools[pool][image]
+            else:
+                result['used_bytes'] = rbd_image_usage(pool, image)
+        for result, future in cephfs_jobs:
+            result['used_bytes'] = future.result()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Collect the Ceph usage of Filesystem PVCs.')
+    parser.add_argument('pvcs', help='JSON file with the array of PVCs')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Number of CephFS subvolumes queried at once')
+    args = parser.parse_args()
+
+    with open(args.pvcs) as f:
+        pvcs = json.load(f)
+    try:
+        results = collect(pvcs, max(1, args.workers))
+    except UsageError as e:
+        sys.exit('ERROR: %s' % e)
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    main()
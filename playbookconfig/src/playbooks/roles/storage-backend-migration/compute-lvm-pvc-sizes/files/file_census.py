@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Counts the files and bytes of several volumes at once.
+#
+# All the roots are walked together by a pool of threads sharing a queue
+# of directories, without crossing filesystems (like find -xdev). Every
+# entry below a root is counted, as "find -mindepth 1" does, and the sizes
+# of regular files are added up.
+#
+# Outputs a JSON map of key -> {"files": N, "bytes": N}.
+# Usage: file_census.py --root KEY=PATH [--root KEY=PATH]... [--workers N]
+#
+# The script only uses the standard library so that it can be piped to
+# python3 in the migration pods.
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+
+
+def census(roots, workers=16):
+    """Return {key: {'files': N, 'bytes': N}} for the (key, path) roots"""
+
+    results = dict((key, {'files': 0, 'bytes': 0}) for key, _ in roots)
+    lock = threading.Lock()
+    directories = queue.Queue()
+    for key, path in roots:
+        try:
+            directories.put((key, path, os.lstat(path).st_dev))
+        except OSError as e:
+            print('Could not open %s: %s' % (path, e), file=sys.stderr)
+
+    def scan(key, path, device):
+        files = size = 0
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    files += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            if st.st_dev == device:
+                                directories.put((key, entry.path, device))
+                        elif entry.is_file(follow_symlinks=False):
+                            size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError as e:
+            print('Could not read %s: %s' % (path, e), file=sys.stderr)
+        with lock:
+            results[key]['files'] += files
+            results[key]['bytes'] += size
+
+    def worker():
+        while True:
+            item = directories.get()
+            if item is None:
+                return
+            try:
+                scan(*item)
+            finally:
+                directories.task_done()
+
+    threads = [threading.Thread(target=worker, daemon=True)
+               for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    directories.join()
+    for _ in threads:
+        directories.put(None)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def parse_root(value):
+    key, sep, path = value.partition('=')
+    if not sep or not key or not path:
+        raise argparse.ArgumentTypeError('expected KEY=PATH, got %s' % value)
+    return key, path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Count the files and bytes of several volumes at once.')
+    parser.add_argument('--root', type=parse_root, action='append',
+                        required=True, help='KEY=PATH of a volume to count')
+    parser.add_argument('--workers', type=int, default=16,
+                        help='Number of directories read at once')
+    args = parser.parse_args()
+
+    print(json.dumps(census(args.root, args.workers)))
+
+
+if __name__ == '__main__':
+    main()
@@ -26,7 +26,8 @@ def main():
         description='Finalize PVC target sizes with file density decision.')
     parser.add_argument('initial_sizing', help='JSON array from compute_initial_sizes')
     parser.add_argument('--file-counts', required=True,
-                        help='JSON dict of namespace/name -> file count')
+                        help='JSON dict of namespace/name -> file count, '
+                             'or the output of file_census.py')
     parser.add_argument('--block-pvcs', required=True,
                         help='JSON array of block PVCs with requested_size')
     parser.add_argument('--xfs-min-bytes', type=int, required=True,
@@ -50,7 +51,11 @@ def main():
             continue
 
         key = f"{pvc['namespace']}/{pvc['name']}"
-        file_count = int(file_counts.get(key, 0))
+        file_count = file_counts.get(key, 0)
+        # file_census.py reports {"files": N, "bytes": N} per PVC
+        if isinstance(file_count, dict):
+            file_count = file_count.get('files', 0)
+        file_count = int(file_count)
         used_gib = pvc['used_bytes'] / GIB
         files_per_gib = int(file_count / used_gib) if used_gib > 0 else 0
         upsize_percent = pvc['upsize_percent']
@@ -10,45 +10,33 @@
 
 import json
 import re
-import subprocess
 import sys
 
+from kube_client import KubeClient
 
-def run_kubectl_json(*args):
-    """Run kubectl with -o json and return parsed JSON, or None on failure."""
-    result = subprocess.run(
-        ["kubectl"] + list(args) + ["-o", "json"],
-        capture_output=True, text=True
-    )
-    if result.returncode != 0:
-        return None
-    return json.loads(result.stdout)
 
-
-def get_pv_reclaim_policies():
+def get_pv_reclaim_policies(kube):
     """Build a map of PV name -> persistentVolumeReclaimPolicy."""
-    data = run_kubectl_json("get", "pv")
-    if not data:
-        return {}
     return {
         item["metadata"]["name"]: item["spec"].get(
             "persistentVolumeReclaimPolicy", "Delete"
         )
-        for item in data.get("items", [])
+        for item in kube.pvs()
     }
 
 
-def get_pvcs(regex):
+def get_pvcs(regex, kube=None):
     """Get all PVCs filtered by cephfs/general storage class."""
-    data = run_kubectl_json("get", "pvc", "-A")
-    if not data:
+    kube = kube or KubeClient()
+    pvcs = kube.pvcs()
+    if not pvcs:
         return []
 
-    pv_policies = get_pv_reclaim_policies()
+    pv_policies = get_pv_reclaim_policies(kube)
     pattern = re.compile(regex) if regex else re.compile(".*")
     results = []
 
-    for item in data.get("items", []):
+    for item in pvcs:
         spec = item.get("spec", {})
         metadata = item.get("metadata", {})
 
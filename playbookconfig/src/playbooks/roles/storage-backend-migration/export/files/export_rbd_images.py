@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Exports every RBD image of every pool to <backup-dir>/<pool>/<image>.bkp.gz,
+# running a bounded number of exports at once.
+#
+# The sha256 and size of each backup file are computed while it is written
+# and saved to <backup-dir>/manifest.json as soon as the image is done, so
+# that a new run after an interruption skips the images already exported.
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+MANIFEST = 'manifest.json'
+CHUNK_SIZE = 1024 * 1024
+EXPORT_FORMATS = ['2', '1']
+
+
+class ExportError(Exception):
+    pass
+
+
+def run_json(cmd):
+    return json.loads(subprocess.check_output(cmd) or '[]')
+
+
+def list_images():
+    """Return the (pool, image) pairs to export, skipping snapshot images"""
+
+    images = []
+    for pool in run_json(['ceph', 'osd', 'pool', 'ls', '--format', 'json']):
+        print('Checking pool: %s' % pool)
+        try:
+            names = run_json(['rbd', 'ls', '-p', pool, '--format', 'json'])
+        except (subprocess.CalledProcessError, ValueError):
+            continue
+        if not names:
+            print('Skipping: No RBD images found in pool %s' % pool)
+            continue
+        for name in names:
+            if 'rbd-snap' in name:
+                print('Skipping snapshot image: %s/%s image' % (pool, name))
+                continue
+            images.append((pool, name))
+    return images
+
+
+class Manifest(object):
+    """Backup files already exported, saved after each image"""
+
+    def __init__(self, backup_dir):
+        self.backup_dir = backup_dir
+        self.path = os.path.join(backup_dir, MANIFEST)
+        self.images = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.images = json.load(f)['images']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def is_done(self, key):
+        """Whether the image was exported and its file is still complete"""
+
+        entry = self.images.get(key)
+        if not entry:
+            return False
+        try:
+            size = os.path.getsize(os.path.join(self.backup_dir, entry['file']))
+        except OSError:
+            return False
+        return size == entry['bytes']
+
+    def add(self, key, entry):
+        with self._lock:
+            self.images[key] = entry
+            fd, tmp = tempfile.mkstemp(dir=self.backup_dir)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'images': self.images}, f, indent=2, sort_keys=True)
+            os.rename(tmp, self.path)
+
+
+def export_image(pool, name, path, export_format, pigz_threads):
+    """Stream rbd export through pigz to path, return (sha256, size)"""
+
+    # stderr goes to a file, a full pipe would block the export
+    rbd_log = tempfile.TemporaryFile()
+    rbd = subprocess.Popen(
+        ['rbd', 'export', '--no-progress', '--export-format', export_format,
+         '%s/%s' % (pool, name), '-'],
+        stdout=subprocess.PIPE, stderr=rbd_log)
+    pigz = subprocess.Popen(['pigz', '-p', str(pigz_threads)],
+                            stdin=rbd.stdout, stdout=subprocess.PIPE)
+    rbd.stdout.close()
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, 'wb') as f:
+            for chunk in iter(lambda: pigz.stdout.read(CHUNK_SIZE), b''):
+                sha256.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except OSError as e:
+        rbd.kill()
+        raise ExportError('%s/%s: could not write %s, possibly out of space: '
+                          '%s' % (pool, name, path, e))
+    finally:
+        pigz.stdout.close()
+        pigz.wait()
+        rbd.wait()
+        rbd_log.seek(0)
+        stderr = rbd_log.read().decode(errors='replace').strip()
+        rbd_log.close()
+    if rbd.returncode != 0:
+        raise ExportError('%s/%s: rbd export failed: %s' % (pool, name, stderr))
+    if pigz.returncode != 0:
+        raise ExportError('%s/%s: pigz failed' % (pool, name))
+    return sha256.hexdigest(), size
+
+
+class RbdExporter(object):
+
+    def __init__(self, backup_dir, workers, pigz_threads=None):
+        self.backup_dir = backup_dir
+        self.workers = workers
+        self.pigz_threads = pigz_threads or \
+            max(1, (os.cpu_count() or 1) // workers)
+        self.manifest = Manifest(backup_dir)
+        self.failed = threading.Event()
+
+    def export(self, pool, name):
+        key = '%s/%s' % (pool, name)
+        if self.failed.is_set():
+            return False
+        if self.manifest.is_done(key):
+            print('Skipping %s: already exported' % key)
+            return True
+
+        rel_path = os.path.join(pool, '%s.bkp.gz' % name)
+        path = os.path.join(self.backup_dir, rel_path)
+        partial = path + '.part'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        print('Backing up: %s image' % key)
+        error = None
+        for export_format in EXPORT_FORMATS:
+            try:
+                sha256, size = export_image(pool, name, partial,
+                                            export_format, self.pigz_threads)
+                break
+            except ExportError as e:
+                error = e
+                if export_format == EXPORT_FORMATS[0]:
+                    print('Retrying: trying export format 1 for %s' % key)
+        else:
+            self.failed.set()
+            if os.path.exists(partial):
+                os.remove(partial)
+            print('ERROR: %s' % error, file=sys.stderr)
+            return False
+
+        os.rename(partial, path)
+        self.manifest.add(key, {'file': rel_path, 'bytes': size,
+                                'sha256': sha256,
+                                'export_format': int(export_format)})
+        print('Exported: %s (%d bytes, sha256 %s)' % (key, size, sha256))
+        return True
+
+    def run(self, images):
+        """Export the images, stop scheduling new exports after a failure"""
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(lambda image: self.export(*image),
+                                        images))
+        return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export all RBD images to compressed backup files.')
+    parser.add_argument('--backup-dir', required=True,
+                        help='Directory for the backup files and manifest')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of images exported at once')
+    args = parser.parse_args()
+
+    images = list_images()
+    exporter = RbdExporter(args.backup_dir, max(1, args.workers))
+    print('Exporting %d RBD images, %d at a time'
+          % (len(images), exporter.workers))
+    if not exporter.run(images):
+        print('ERROR: RBD export failed, completed images are kept in %s'
+              % exporter.manifest.path)
+        return 1
+    print('SUCCESS: All RBD pools processed.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
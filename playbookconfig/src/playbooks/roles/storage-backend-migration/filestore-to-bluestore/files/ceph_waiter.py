@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Waits for the Ceph cluster to reach one or more conditions at once:
+#
+#   --pg-states        no PG is incomplete, inactive or peering
+#   --active-clean     the PGs are active+clean (or a ratio of them)
+#   --osd-drained ID   the OSD holds no PG (can be repeated)
+#
+# A single cluster connection is used and each mon command is sent once
+# per check, whatever the number of conditions that need it.
+#
+# The interval between checks adapts to the progress: it follows the
+# estimated time to completion while the cluster makes progress, so that
+# the end of the wait is seen shortly after it happens, and backs off up
+# to --max-interval while nothing moves, to spare the monitors. The ETA
+# comes from the progress rate over the last --rate-window seconds.
+#
+# With --telemetry PREFIX, every check is appended to PREFIX.jsonl (work
+# left, rate, ETA, recovered objects and bytes per second from "pg stat")
+# and PREFIX.json holds the current ETA and a summary of the recovery
+# rates, for the playbook to read.
+#
+# The stall timer adds up the intervals between checks and resets whenever
+# the work left decreases. If no progress is detected within the stall
+# timeout, the script exits with an error. A check that fails counts as no
+# progress, except a failed "pg stat" of --active-clean alone, which is
+# retried without counting, like the recovery wait always did.
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+
+import rados
+
+logging.basicConfig(
+    format="%(asctime)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    level=logging.INFO,
+    stream=sys.stdout,
+)
+log = logging.getLogger(__name__)
+
+BAD_STATES = ("incomplete", "inactive", "peering")
+
+# Period over which the progress rate is measured (in seconds)
+RATE_WINDOW = 120
+
+
+def pg_summary(data):
+    """The PG summary of "pg stat", nested in pg_summary on recent releases."""
+    return data.get("pg_summary", data)
+
+
+class PgStatesCleared(object):
+    """No PG is left in the given states."""
+
+    command = "pg stat"
+    failure_stalls = True
+
+    def __init__(self, states=BAD_STATES):
+        self.states = states
+
+    def remaining(self, data):
+        return sum(
+            s["num"] for s in pg_summary(data)["num_pg_by_state"]
+            if any(b in s["name"] for b in self.states)
+        )
+
+    def describe(self, remaining):
+        return "PGs in %s states: %d" % ("|".join(self.states), remaining)
+
+
+class ActiveClean(object):
+    """At least the given ratio of the PGs are active+clean."""
+
+    command = "pg stat"
+    # Failed checks do not count toward the stall
+    failure_stalls = False
+
+    def __init__(self, ratio=1.0):
+        self.ratio = ratio
+        self.num_pgs = 0
+
+    def remaining(self, data):
+        summary = pg_summary(data)
+        self.num_pgs = summary["num_pgs"]
+        active_clean = next(
+            (s["num"] for s in summary["num_pg_by_state"]
+             if s["name"] == "active+clean"),
+            0,
+        )
+        return max(0, math.ceil(self.num_pgs * self.ratio) - active_clean)
+
+    def describe(self, remaining):
+        return "PGs active+clean: %d/%d" % (
+            self.num_pgs - remaining, self.num_pgs)
+
+
+class OsdDrained(object):
+    """The OSD holds no PG."""
+
+    command = "osd df"
+    failure_stalls = True
+
+    def __init__(self, osd_id):
+        self.osd_id = osd_id
+
+    def remaining(self, data):
+        for node in data["nodes"]:
+            if node["id"] == self.osd_id:
+                return node["pgs"]
+        return None
+
+    def describe(self, remaining):
+        return "osd.%d: %d PGs" % (self.osd_id, remaining)
+
+
+def recovery_rates(data):
+    """Return the (bytes/s, objects/s) recovery rates of "pg stat".
+
+    Ceph leaves the rates out when nothing is recovering.
+    """
+    for source in (data, pg_summary(data)):
+        if "recovering_bytes_per_sec" in source:
+            return (source["recovering_bytes_per_sec"],
+                    source.get("recovering_objects_per_sec", 0))
+    return 0, 0
+
+
+def recovery_throughput(data):
+    """Describe the recovery rate reported by "pg stat", if any."""
+    bytes_sec, objects_sec = recovery_rates(data)
+    if not bytes_sec and not objects_sec:
+        return None
+    return "recovery %.1f MiB/s, %d objects/s" % (
+        bytes_sec / 1048576.0, objects_sec)
+
+
+class RateWindow(object):
+    """Progress rate over the last seconds of a wait."""
+
+    def __init__(self, window=RATE_WINDOW):
+        self.window = window
+        self.samples = []
+
+    def add(self, now, left):
+        self.samples.append((now, left))
+        # Keep one sample older than the window to measure across it
+        while len(self.samples) > 2 and \
+                now - self.samples[1][0] >= self.window:
+            self.samples.pop(0)
+
+    def rate(self):
+        """Work done per second, 0 when nothing moved."""
+        if len(self.samples) < 2:
+            return 0.0
+        (first_time, first_left), (last_time, last_left) = \
+            self.samples[0], self.samples[-1]
+        if last_left >= first_left or last_time <= first_time:
+            return 0.0
+        return (first_left - last_left) / float(last_time - first_time)
+
+
+class Telemetry(object):
+    """Time series and summary of a wait, written as it goes."""
+
+    def __init__(self, prefix, clock=time.time):
+        self.samples_path = prefix + ".jsonl"
+        self.summary_path = prefix + ".json"
+        self.clock = clock
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.summary = {
+            "status": "waiting",
+            "started": clock(),
+            "elapsed": 0,
+            "checks": 0,
+            "left": None,
+            "rate": 0.0,
+            "eta": None,
+            "recovering_bytes_per_sec": {"last": 0, "average": 0, "peak": 0},
+            "recovering_objects_per_sec": {"last": 0, "average": 0,
+                                           "peak": 0},
+            "recovered_bytes": 0,
+            "recovered_objects": 0,
+        }
+        self._last_elapsed = 0
+        open(self.samples_path, "w").close()
+
+    def record(self, elapsed, conditions, left, rate, eta, pg_stat):
+        bytes_sec, objects_sec = recovery_rates(pg_stat or {})
+        sample = {
+            "time": self.clock(),
+            "elapsed": elapsed,
+            "conditions": conditions,
+            "left": left,
+            "rate": rate,
+            "eta": eta,
+            "recovering_bytes_per_sec": bytes_sec,
+            "recovering_objects_per_sec": objects_sec,
+        }
+        with open(self.samples_path, "a") as f:
+            f.write(json.dumps(sample) + "\n")
+
+        summary = self.summary
+        # The rates of a check are taken to hold until the next one
+        period = elapsed - self._last_elapsed
+        self._last_elapsed = elapsed
+        for key, value, total in (
+                ("recovering_bytes_per_sec", bytes_sec, "recovered_bytes"),
+                ("recovering_objects_per_sec", objects_sec,
+                 "recovered_objects")):
+            summary[total] += int(value * period)
+            summary[key]["last"] = value
+            summary[key]["peak"] = max(summary[key]["peak"], value)
+            summary[key]["average"] = (summary[total] / elapsed
+                                       if elapsed else value)
+        summary.update(elapsed=elapsed, checks=summary["checks"] + 1,
+                       left=left, rate=rate, eta=eta)
+        self._write()
+
+    def finish(self, status):
+        self.summary.update(status=status, finished=self.clock())
+        if status != "done":
+            self.summary["eta"] = None
+        self._write()
+
+    def _write(self):
+        tmp = self.summary_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.summary, f)
+        os.replace(tmp, self.summary_path)
+
+
+class CephWaiter(object):
+    """Waits on several conditions with a single cluster connection."""
+
+    def __init__(self, cluster, predicates, stall_timeout,
+                 min_interval=2, max_interval=30, rate_window=RATE_WINDOW,
+                 telemetry=None, clock=time.monotonic, sleep=time.sleep):
+        self.cluster = cluster
+        self.predicates = predicates
+        self.stall_timeout = stall_timeout
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.rate_window = rate_window
+        self.telemetry = telemetry
+        self.clock = clock
+        self.sleep = sleep
+
+    def query(self, prefix):
+        """Return the parsed output of a mon command, or None on failure."""
+        ret, buf, _ = self.cluster.mon_command(
+            json.dumps({"prefix": prefix, "format": "json"}), b""
+        )
+        if ret != 0:
+            return None
+        try:
+            return json.loads(buf)
+        except ValueError:
+            return None
+
+    def check(self):
+        """Return the work left for each condition and the command outputs.
+
+        The work left of a condition is None when it could not be checked.
+        """
+        commands = [p.command for p in self.predicates]
+        if self.telemetry:
+            # Source of the recovery rates
+            commands.append("pg stat")
+        outputs = {}
+        for command in commands:
+            if command not in outputs:
+                outputs[command] = self.query(command)
+        remaining = []
+        for predicate in self.predicates:
+            data = outputs[predicate.command]
+            try:
+                remaining.append(
+                    None if data is None else predicate.remaining(data))
+            except (KeyError, TypeError):
+                remaining.append(None)
+        return remaining, outputs
+
+    def next_interval(self, interval, left, rate, stalled):
+        """Pick the delay before the next check."""
+        if rate > 0:
+            # Check again around half way to the expected completion
+            interval = left / rate / 2.0
+        elif interval is None:
+            interval = self.min_interval
+        else:
+            interval = interval * 2
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        # Do not sleep far past the stall timeout
+        return max(self.min_interval,
+                   min(interval, self.stall_timeout - stalled))
+
+    def failure_stalls(self, remaining):
+        """Whether the failed checks count toward the stall."""
+        return any(p.failure_stalls
+                   for p, r in zip(self.predicates, remaining) if r is None)
+
+    def describe(self, remaining):
+        return "; ".join(p.describe(r) if r is not None else
+                         "%s failed" % p.command
+                         for p, r in zip(self.predicates, remaining))
+
+    def wait(self):
+        """Return True once all the conditions hold, False on a stall."""
+        start = self.clock()
+        stalled = 0
+        last_left = None
+        window = RateWindow(self.rate_window)
+        interval = None
+
+        while True:
+            remaining, outputs = self.check()
+            now = self.clock()
+            left = sum(remaining) if None not in remaining else None
+
+            # The interval slept before this check
+            slept = interval or 0
+            if left is not None:
+                window.add(now, left)
+                if last_left is not None and left < last_left:
+                    stalled = 0
+                else:
+                    stalled += slept
+                last_left = left
+            elif self.failure_stalls(remaining):
+                stalled += slept
+            rate = window.rate() if left is not None else 0.0
+            eta = left / rate if rate > 0 else None
+            if left == 0:
+                eta = 0
+
+            if self.telemetry:
+                self.telemetry.record(now - start, self.describe(remaining),
+                                      left, rate, eta, outputs.get("pg stat"))
+
+            if left == 0:
+                log.info(self.describe(remaining))
+                log.info("Done waiting.")
+                if self.telemetry:
+                    self.telemetry.finish("done")
+                return True
+
+            if stalled >= self.stall_timeout:
+                log.error("No progress for %ds. %s", self.stall_timeout,
+                          self.describe(remaining))
+                if self.telemetry:
+                    self.telemetry.finish("stalled")
+                return False
+
+            interval = self.next_interval(interval, left or 0, rate, stalled)
+            self.log_progress(remaining, outputs, rate, eta, interval,
+                              stalled)
+            self.sleep(interval)
+
+    def log_progress(self, remaining, outputs, rate, eta, interval,
+                     stalled):
+        parts = [self.describe(remaining)]
+        if eta is not None:
+            parts.append("%.2f PG/s, ETA %ds" % (rate, eta))
+        if outputs.get("pg stat"):
+            throughput = recovery_throughput(outputs["pg stat"])
+            if throughput:
+                parts.append(throughput)
+        parts.append("next check in %ds (stall: %d/%ds)" % (
+            interval, stalled, self.stall_timeout))
+        log.info("; ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pg-states", action="store_true",
+                        help="Wait for no PG incomplete|inactive|peering")
+    parser.add_argument("--active-clean", action="store_true",
+                        help="Wait for the PGs to be active+clean")
+    parser.add_argument("--active-clean-ratio", type=float, default=1.0)
+    parser.add_argument("--osd-drained", type=int, action="append",
+                        default=[], help="Wait for the OSD to hold no PG")
+    parser.add_argument("--stall-timeout", type=int, required=True)
+    parser.add_argument("--min-interval", type=int, default=2)
+    parser.add_argument("--max-interval", type=int, default=30)
+    parser.add_argument("--rate-window", type=int, default=RATE_WINDOW,
+                        help="Seconds over which the ETA is measured")
+    parser.add_argument("--telemetry", metavar="PREFIX",
+                        help="Write PREFIX.jsonl and PREFIX.json")
+    args = parser.parse_args()
+
+    predicates = []
+    if args.pg_states:
+        predicates.append(PgStatesCleared())
+    if args.active_clean:
+        predicates.append(ActiveClean(args.active_clean_ratio))
+    predicates.extend(OsdDrained(osd_id) for osd_id in args.osd_drained)
+    if not predicates:
+        parser.error("nothing to wait for")
+
+    log.info("Waiting for: %s", ", ".join(
+        p.__doc__.strip().rstrip(".") for p in predicates))
+
+    telemetry = Telemetry(args.telemetry) if args.telemetry else None
+    with rados.Rados(conffile=rados.Rados.DEFAULT_CONF_FILES) as cluster:
+        waiter = CephWaiter(cluster, predicates, args.stall_timeout,
+                            args.min_interval, args.max_interval,
+                            args.rate_window, telemetry)
+        return 0 if waiter.wait() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
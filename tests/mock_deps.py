@@ -39,6 +39,10 @@ def install_mocks():
 
     :returns: None
     """
+    # Modules shared by the scripts of several roles are real dependencies
+    from test_helpers import add_role_dirs
+    add_role_dirs(["common/load-openrc/files"])
+
     # Only install if not already present
     if "cgtsclient" in sys.modules:
         return
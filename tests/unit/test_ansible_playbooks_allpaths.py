@@ -6,8 +6,10 @@
 
 """All-paths coverage tests for remaining uncovered lines."""
 
+import io
 import os
 import sys
+import tarfile
 import tempfile
 import unittest
 from io import StringIO
@@ -66,14 +68,63 @@ class TestGetSwDeploymentsInfoAllPaths(SimpleModuleTestCase):
 
     module_name = "get_sw_deployments_info"
 
-    @patch("get_sw_deployments_info.subprocess")
-    def test_read_file(self, mock_subprocess):
-        mock_subprocess.check_output.return_value = "file content"
-        mock_subprocess.DEVNULL = -1
-        self.mod.read_file.cache_clear()
+    @patch("get_sw_deployments_info.get_backup_index")
+    def test_read_file(self, mock_index):
+        mock_index.return_value = {"some/path": "file content"}
         result = self.mod.read_file("backup.tar", "some/path")
         self.assertEqual(result, "file content")
 
+    @patch("get_sw_deployments_info.get_backup_index")
+    def test_read_file_missing(self, mock_index):
+        mock_index.return_value = {"some/dir": None}
+        with self.assertRaises(FileNotFoundError):
+            self.mod.read_file("backup.tar", "some/dir")
+
+    def _make_tar(self, members):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            for name, data in members:
+                info = tarfile.TarInfo(name)
+                if data is None:
+                    info.type = tarfile.DIRTYPE
+                    tar.addfile(info)
+                else:
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+        buf.seek(0)
+        return buf
+
+    def test_build_backup_index(self):
+        meta = "opt/software/releases/metadata/deployed/p1-metadata.xml"
+        stream = self._make_tar([
+            ("etc/hosts", b"127.0.0.1 localhost"),
+            (meta, b"<patch/>"),
+            ("opt/software/.controller.state", None),
+            ("opt/software/releases/metadata/deployed/readme.txt", b"x"),
+        ])
+        index = self.mod.build_backup_index(stream)
+        self.assertEqual(
+            index,
+            {meta: "<patch/>", "opt/software/.controller.state": None},
+        )
+
+    def test_build_backup_index_truncated(self):
+        meta = "opt/software/releases/metadata/available/p1-metadata.xml"
+        stream = self._make_tar([(meta, b"<patch/>")])
+        truncated = io.BytesIO(stream.getvalue()[:300])
+        self.assertEqual(self.mod.build_backup_index(truncated), {})
+
+    @patch("get_sw_deployments_info.subprocess.Popen")
+    def test_get_backup_index_single_pass(self, mock_popen):
+        meta = "opt/software/releases/metadata/deployed/p1-metadata.xml"
+        proc = mock_popen.return_value.__enter__.return_value
+        proc.stdout = self._make_tar([(meta, b"<patch/>")])
+        self.mod.get_backup_index.cache_clear()
+        self.assertEqual(self.mod.read_file("b.tgz", meta), "<patch/>")
+        self.assertTrue(self.mod.get_backup_index("b.tgz"))
+        self.assertEqual(mock_popen.call_count, 1)
+        self.mod.get_backup_index.cache_clear()
+
     @patch("get_sw_deployments_info.get_tar_excludes", return_value=[])
     @patch(
         "get_sw_deployments_info.get_tar_transforms", return_value=[]
@@ -12,7 +12,7 @@ import tempfile
 import textwrap
 import unittest
 from io import StringIO
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import yaml
 
@@ -96,19 +96,17 @@ class TestGetSwDeploymentsInfoExtended(SimpleModuleTestCase):
 
     module_name = "get_sw_deployments_info"
 
-    @patch("get_sw_deployments_info.subprocess")
-    def test_check_if_backup_patched_true(self, mock_subprocess):
-        mock_subprocess.call.return_value = 0
-        mock_subprocess.DEVNULL = -1
+    @patch("get_sw_deployments_info.get_backup_index")
+    def test_check_if_backup_patched_true(self, mock_index):
+        mock_index.return_value = {"opt/software/.controller.state": None}
         # Clear lru_cache
         self.mod.check_if_backup_patched.cache_clear()
         result = self.mod.check_if_backup_patched("test.tar")
         self.assertTrue(result)
 
-    @patch("get_sw_deployments_info.subprocess")
-    def test_check_if_backup_patched_false(self, mock_subprocess):
-        mock_subprocess.call.return_value = 1
-        mock_subprocess.DEVNULL = -1
+    @patch("get_sw_deployments_info.get_backup_index")
+    def test_check_if_backup_patched_false(self, mock_index):
+        mock_index.return_value = {}
         self.mod.check_if_backup_patched.cache_clear()
         result = self.mod.check_if_backup_patched("test2.tar")
         self.assertFalse(result)
@@ -198,30 +196,23 @@ class TestGetSwDeploymentsInfoExtended(SimpleModuleTestCase):
         excludes = self.mod.get_tar_excludes("backup.tar", metadata)
         self.assertEqual(excludes, [])
 
-    @patch("get_sw_deployments_info.subprocess")
-    def test_get_metadata_empty(self, mock_subprocess):
-        mock_result = MagicMock()
-        mock_result.returncode = 1
-        mock_result.stdout = ""
-        mock_subprocess.run.return_value = mock_result
-        mock_subprocess.DEVNULL = -1
+    @patch("get_sw_deployments_info.get_backup_index")
+    def test_get_metadata_empty(self, mock_index):
+        mock_index.return_value = {}
         self.mod.get_metadata.cache_clear()
         result = self.mod.get_metadata("empty_backup.tar")
         self.assertEqual(result, {})
 
     @patch("get_sw_deployments_info.read_file")
-    @patch("get_sw_deployments_info.subprocess")
+    @patch("get_sw_deployments_info.get_backup_index")
     def test_get_metadata_with_entries(
-        self, mock_subprocess, mock_read
+        self, mock_index, mock_read
     ):
         """Test get_metadata with entries."""
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = (
-            "opt/software/metadata/deployed/p1-metadata.xml\n"
-        )
-        mock_subprocess.run.return_value = mock_result
-        mock_subprocess.DEVNULL = -1
+        mock_index.return_value = {
+            "opt/software/metadata/deployed/p1-metadata.xml": "<patch/>",
+            "opt/software/.controller.state": None,
+        }
         mock_read.return_value = (
             "<patch><sw_version>24.9</sw_version></patch>"
         )
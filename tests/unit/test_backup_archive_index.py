@@ -0,0 +1,151 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the indexed platform backup archive helper."""
+
+import gzip
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["common/files"])
+
+import backup_archive_index as bai
+
+
+class TestBlockCompressor(unittest.TestCase):
+    """Tests for the parallel block compressor."""
+
+    def test_blocks_are_independent_gzip_members(self):
+        out = io.BytesIO()
+        compressor = bai.BlockCompressor(out, block_size=10, workers=3)
+        data = bytes(range(95))
+        compressor.write(data[:33])
+        compressor.write(data[33:])
+        compressor.close()
+        self.assertEqual(gzip.decompress(out.getvalue()), data)
+        self.assertEqual(len(compressor.blocks), 10)
+        self.assertEqual([b[0] for b in compressor.blocks],
+                         list(range(0, 100, 10)))
+        for uoff, coff in compressor.blocks:
+            reader = bai._BlockReader(io.BytesIO(out.getvalue()[coff:]))
+            self.assertEqual(reader.read(5), data[uoff:uoff + 5])
+
+    def test_block_reader_skip(self):
+        payload = gzip.compress(b"abc") + gzip.compress(b"defgh")
+        reader = bai._BlockReader(io.BytesIO(payload), skip=2)
+        self.assertEqual(reader.read(4), b"cdef")
+        self.assertEqual(reader.read(), b"gh")
+        self.assertEqual(reader.read(1), b"")
+
+
+class TestIndexedArchive(unittest.TestCase):
+    """Round-trip tests for create and extract."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.src = os.path.join(self.tmp, "src")
+        os.makedirs(os.path.join(self.src, "postgres"))
+        os.makedirs(os.path.join(self.src, "skip"))
+        self.files = {}
+        for i in range(5):
+            name = os.path.join(self.src, "postgres",
+                                "db%d.postgreSql.data" % i)
+            content = (("row %d\n" % i) * 5000).encode()
+            with open(name, "wb") as f:
+                f.write(content)
+            self.files[os.path.basename(name)] = content
+        with open(os.path.join(self.src, "skip", "ignored"), "w") as f:
+            f.write("ignored")
+        self.archive = os.path.join(self.tmp, "backup.tgz")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _create(self):
+        rc = bai.create_archive(
+            self.archive, [os.path.join(self.src, "*")],
+            excludes=["*/skip"], workers=2, block_size=4096)
+        self.assertEqual(rc, 0)
+
+    def test_create_is_readable_by_tar(self):
+        self._create()
+        with tarfile.open(self.archive, "r:gz") as tar:
+            names = tar.getnames()
+        self.assertEqual(
+            len([n for n in names if n.endswith(".postgreSql.data")]), 5)
+        self.assertFalse([n for n in names if "skip" in n])
+
+    def test_index_describes_archive(self):
+        self._create()
+        index = bai.load_index(self.archive)
+        self.assertEqual(index["archive_size"],
+                         os.path.getsize(self.archive))
+        member = [m for m in index["members"]
+                  if m["name"].endswith("db3.postgreSql.data")][0]
+        self.assertEqual(member["size"], len(self.files["db3.postgreSql.data"]))
+        self.assertGreater(len(index["blocks"]), 1)
+
+    def test_extract_with_index(self):
+        self._create()
+        dest = os.path.join(self.tmp, "out")
+        os.makedirs(dest)
+        with patch.object(bai.subprocess, "call") as mock_call:
+            rc = bai.extract(self.archive, dest, ["*/*.postgreSql.*"],
+                             flatten=True)
+        self.assertEqual(rc, 0)
+        mock_call.assert_not_called()
+        for name, content in self.files.items():
+            with open(os.path.join(dest, name), "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_extract_no_match(self):
+        self._create()
+        self.assertEqual(bai.extract(self.archive, self.tmp, ["*.none"]), 2)
+
+    def test_stale_index_is_ignored(self):
+        self._create()
+        with open(self.archive, "ab") as f:
+            f.write(gzip.compress(b""))
+        self.assertIsNone(bai.load_index(self.archive))
+
+    def test_index_found_through_link(self):
+        self._create()
+        link = os.path.join(self.tmp, "staged.tgz")
+        os.symlink(self.archive, link)
+        self.assertIsNotNone(bai.load_index(link))
+
+    @patch("backup_archive_index.subprocess.call", return_value=0)
+    def test_extract_without_index_falls_back_to_tar(self, mock_call):
+        rc = bai.extract(self.archive, "/tmp/out", ["*/*.postgreSql.*"],
+                         flatten=True)
+        self.assertEqual(rc, 0)
+        cmd = mock_call.call_args[0][0]
+        self.assertIn("--transform=s,.*/,,", cmd)
+        self.assertEqual(cmd[-1], "*/*.postgreSql.*")
+
+    @patch("backup_archive_index.extract", side_effect=OSError("boom"))
+    def test_main_reports_errors(self, _mock):
+        rc = bai.main(["extract", "-f", self.archive, "-C", self.tmp, "*"])
+        self.assertEqual(rc, 2)
+
+    def test_main_create(self):
+        rc = bai.main(["create", "-f", self.archive, "--workers", "2",
+                       os.path.join(self.src, "postgres")])
+        self.assertEqual(rc, 0)
+        self.assertTrue(os.path.exists(self.archive + ".idx"))
+
+
+if __name__ == "__main__":
+    unittest.main()
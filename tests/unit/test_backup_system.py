@@ -0,0 +1,124 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the backup-system role helper scripts."""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["backup/backup-system/files"])
+
+import dump_databases
+
+
+class TestDumpDatabases(unittest.TestCase):
+    """Tests for the concurrent pg_dump stage."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _fake_run(self, cmd, stdout=None, **kwargs):
+        stdout.write(("-- dump of %s\n" % cmd[-1]).encode())
+        return MagicMock(returncode=0, stderr=b"")
+
+    def test_parse_database(self):
+        self.assertEqual(dump_databases.parse_database("sysinv"),
+                         ("sysinv", []))
+        self.assertEqual(dump_databases.parse_database("dcorch:a,b"),
+                         ("dcorch", ["a", "b"]))
+
+    def test_get_dump_cmd(self):
+        cmd = dump_databases.get_dump_cmd("fm", ["alarm"])
+        self.assertEqual(cmd[:4], ["sudo", "-u", "postgres", "pg_dump"])
+        self.assertIn("--inserts", cmd)
+        self.assertIn("--exclude-table=alarm", cmd)
+        self.assertEqual(cmd[-1], "fm")
+
+    def test_get_dump_cmd_formats(self):
+        rows = dump_databases.get_dump_cmd("fm", [], "rows", 500)
+        self.assertIn("--rows-per-insert=500", rows)
+        self.assertNotIn("--inserts", rows)
+        copy = dump_databases.get_dump_cmd("fm", [], "copy")
+        self.assertFalse([a for a in copy if "insert" in a])
+
+    def test_inserts_only_databases_keep_inserts(self):
+        cmds = []
+
+        def run(cmd, stdout=None, **kwargs):
+            cmds.append(cmd)
+            return MagicMock(returncode=0, stderr=b"")
+
+        with patch.object(dump_databases.subprocess, "run", side_effect=run):
+            report = dump_databases.dump_databases(
+                [("sysinv", []), ("keystone", [])], self.tmp, 1,
+                dump_format="copy", inserts_only=["sysinv"])
+        self.assertEqual([r["format"] for r in report], ["inserts", "copy"])
+        self.assertIn("--inserts", cmds[0])
+        self.assertNotIn("--inserts", cmds[1])
+
+    def test_dump_databases_writes_each_file(self):
+        with patch.object(dump_databases.subprocess, "run",
+                          side_effect=self._fake_run):
+            report = dump_databases.dump_databases(
+                [("sysinv", []), ("fm", ["alarm"])], self.tmp, 2)
+        self.assertEqual([r["database"] for r in report], ["sysinv", "fm"])
+        for r in report:
+            with open(os.path.join(self.tmp,
+                                   r["database"] + ".postgreSql.data")) as f:
+                self.assertIn(r["database"], f.read())
+            self.assertEqual(r["bytes"], os.path.getsize(r["path"]))
+            self.assertEqual(r["rc"], 0)
+
+    def test_dump_databases_bounded_concurrency(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def slow_run(cmd, stdout=None, **kwargs):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            return MagicMock(returncode=0, stderr=b"")
+
+        with patch.object(dump_databases.subprocess, "run",
+                          side_effect=slow_run):
+            dump_databases.dump_databases(
+                [("db%d" % i, []) for i in range(6)], self.tmp, 2)
+        self.assertEqual(state["peak"], 2)
+
+    def test_main_reports_failures(self):
+        def run(cmd, stdout=None, **kwargs):
+            rc = 1 if cmd[-1] == "keystone" else 0
+            return MagicMock(returncode=rc, stderr=b"no such database")
+
+        out, err = StringIO(), StringIO()
+        with patch.object(dump_databases.subprocess, "run", side_effect=run), \
+                patch("sys.stdout", out), patch("sys.stderr", err):
+            rc = dump_databases.main(
+                ["--output-dir", self.tmp, "sysinv", "keystone"])
+        self.assertEqual(rc, 1)
+        self.assertEqual(len(json.loads(out.getvalue())), 2)
+        self.assertIn("keystone", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the Ceph waiter of filestore-to-bluestore."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["storage-backend-migration/filestore-to-bluestore/files"])
+sys.modules.setdefault("rados", MagicMock())
+
+import ceph_waiter
+
+
+def pg_stat(active_clean, num_pgs=100, bad=0):
+    states = [{"name": "active+clean", "num": active_clean}]
+    if bad:
+        states.append({"name": "peering", "num": bad})
+    return {"pg_summary": {"num_pgs": num_pgs, "num_pg_by_state": states},
+            "recovering_bytes_per_sec": 10485760,
+            "recovering_objects_per_sec": 5}
+
+
+def osd_df(pgs):
+    return {"nodes": [{"id": 1, "pgs": 7}, {"id": 3, "pgs": pgs}]}
+
+
+class FakeCluster(object):
+    """Replays the outputs of each mon command, one per call."""
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.calls = []
+
+    def mon_command(self, cmd, inbuf):
+        prefix = json.loads(cmd)["prefix"]
+        self.calls.append(prefix)
+        queue = self.outputs[prefix]
+        data = queue.pop(0) if len(queue) > 1 else queue[0]
+        if data is None:
+            return -1, b"", "error"
+        return 0, json.dumps(data).encode(), ""
+
+
+class TestCephWaiter(unittest.TestCase):
+    """Tests for CephWaiter."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def _sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def _waiter(self, cluster, predicates, stall_timeout=60):
+        return ceph_waiter.CephWaiter(
+            cluster, predicates, stall_timeout, min_interval=1,
+            max_interval=30, clock=lambda: self.now, sleep=self._sleep)
+
+    def test_several_conditions_share_one_query(self):
+        cluster = FakeCluster({
+            "pg stat": [pg_stat(90, bad=2), pg_stat(95), pg_stat(100)],
+            "osd df": [osd_df(4), osd_df(2), osd_df(0)],
+        })
+        predicates = [ceph_waiter.PgStatesCleared(),
+                      ceph_waiter.ActiveClean(),
+                      ceph_waiter.OsdDrained(3)]
+        self.assertTrue(self._waiter(cluster, predicates).wait())
+        # One pg stat per check for both PG conditions
+        self.assertEqual(cluster.calls.count("pg stat"), 3)
+        self.assertEqual(cluster.calls.count("osd df"), 3)
+
+    def test_interval_follows_progress(self):
+        active_clean = [pg_stat(n) for n in range(0, 101, 10)]
+        cluster = FakeCluster({"pg stat": active_clean})
+        self.assertTrue(
+            self._waiter(cluster, [ceph_waiter.ActiveClean()]).wait())
+        # Checks get closer together as completion nears
+        self.assertEqual(self.sleeps[0], 1)
+        self.assertGreater(max(self.sleeps), self.sleeps[-1])
+        self.assertTrue(all(1 <= s <= 30 for s in self.sleeps))
+
+    def test_backs_off_then_fails_on_stall(self):
+        cluster = FakeCluster({"pg stat": [pg_stat(50)]})
+        self.assertFalse(self._waiter(cluster, [ceph_waiter.ActiveClean()],
+                                      stall_timeout=100).wait())
+        self.assertEqual(self.sleeps[:6], [1, 2, 4, 8, 16, 30])
+        self.assertLess(self.now, 100 + 30)
+
+    def test_failed_query_counts_as_stall(self):
+        cluster = FakeCluster({"osd df": [None]})
+        self.assertFalse(self._waiter(cluster, [ceph_waiter.OsdDrained(3)],
+                                      stall_timeout=10).wait())
+
+    def test_failed_recovery_query_does_not_count_as_stall(self):
+        cluster = FakeCluster({"pg stat": [None] * 6 + [pg_stat(100)]})
+        self.assertTrue(self._waiter(cluster, [ceph_waiter.ActiveClean()],
+                                     stall_timeout=10).wait())
+        self.assertGreater(self.now, 10)
+
+    def test_stall_counts_the_intervals_between_checks(self):
+        cluster = FakeCluster({"pg stat": [pg_stat(50)]})
+        waiter = self._waiter(cluster, [ceph_waiter.ActiveClean()],
+                              stall_timeout=10)
+        # Slow queries do not count toward the stall
+        query = waiter.query
+
+        def slow_query(prefix):
+            self.now += 5
+            return query(prefix)
+
+        waiter.query = slow_query
+        self.assertFalse(waiter.wait())
+        self.assertEqual(sum(self.sleeps), 10)
+
+    def test_active_clean_ratio(self):
+        cluster = FakeCluster({"pg stat": [pg_stat(95)]})
+        self.assertTrue(self._waiter(
+            cluster, [ceph_waiter.ActiveClean(0.95)]).wait())
+
+    def test_recovery_throughput(self):
+        self.assertEqual(ceph_waiter.recovery_throughput(pg_stat(1)),
+                         "recovery 10.0 MiB/s, 5 objects/s")
+        self.assertIsNone(ceph_waiter.recovery_throughput({}))
+
+    def test_rate_window(self):
+        window = ceph_waiter.RateWindow(window=60)
+        window.add(0, 100)
+        self.assertEqual(window.rate(), 0.0)
+        window.add(30, 70)
+        window.add(60, 70)
+        self.assertEqual(window.rate(), 0.5)
+        # Only the last minute counts
+        window.add(100, 70)
+        self.assertEqual(window.rate(), 0.0)
+
+    def test_telemetry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prefix = os.path.join(tmp, "telemetry", "host-recovery")
+            telemetry = ceph_waiter.Telemetry(prefix, clock=lambda: 1000.0)
+            cluster = FakeCluster({
+                "osd df": [osd_df(20), osd_df(10), osd_df(0)],
+                "pg stat": [pg_stat(90), pg_stat(95), pg_stat(100)],
+            })
+            waiter = ceph_waiter.CephWaiter(
+                cluster, [ceph_waiter.OsdDrained(3)], 60, min_interval=5,
+                telemetry=telemetry, clock=lambda: self.now,
+                sleep=self._sleep)
+            self.assertTrue(waiter.wait())
+
+            with open(prefix + ".jsonl") as f:
+                samples = [json.loads(line) for line in f]
+            with open(prefix + ".json") as f:
+                summary = json.load(f)
+
+        # pg stat is read for the recovery rates of a drain wait too
+        self.assertEqual(cluster.calls.count("pg stat"), 3)
+        self.assertEqual([s["left"] for s in samples], [20, 10, 0])
+        self.assertIsNone(samples[0]["eta"])
+        self.assertEqual(samples[1]["rate"], 2.0)
+        self.assertEqual(samples[1]["eta"], 5.0)
+        self.assertEqual(samples[1]["conditions"], "osd.3: 10 PGs")
+        self.assertEqual(summary["status"], "done")
+        self.assertEqual(summary["checks"], 3)
+        self.assertEqual(summary["eta"], 0)
+        self.assertEqual(summary["recovering_bytes_per_sec"]["peak"],
+                         10485760)
+        self.assertEqual(summary["recovered_objects"], 5 * self.now)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the bulk PVC usage collector of compute-lvm-pvc-sizes."""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["storage-backend-migration/common/files",
+               "storage-backend-migration/compute-lvm-pvc-sizes/files"])
+sys.modules.setdefault("kubernetes", MagicMock())
+
+import collect_pvc_usage
+
+PVS = [
+    {"metadata": {"name": "pv-1"},
+     "spec": {"csi": {"volumeAttributes": {"pool": "kube-rbd",
+                                           "imageName": "csi-vol-1"}}}},
+    {"metadata": {"name": "pv-2"},
+     "spec": {"csi": {"volumeAttributes": {"imageName": "csi-vol-2"}}}},
+    {"metadata": {"name": "pv-3"},
+     "spec": {"csi": {"volumeAttributes": {"fsName": "kube-cephfs",
+                                           "subvolumeName": "csi-vol-3"}}}},
+    {"metadata": {"name": "pv-local"}, "spec": {"hostPath": {}}},
+]
+PVCS = [
+    {"metadata": {"namespace": "ns", "name": "rbd-1"},
+     "spec": {"volumeName": "pv-1"}},
+    {"metadata": {"namespace": "ns", "name": "rbd-2"},
+     "spec": {"volumeName": "pv-2"}},
+    {"metadata": {"namespace": "ns", "name": "fs-1"},
+     "spec": {"volumeName": "pv-3"}},
+]
+
+RBD_DU = {"images": [
+    {"name": "csi-vol-1", "snapshot": "snap", "used_size": 1},
+    {"name": "csi-vol-1", "provisioned_size": 100, "used_size": 40},
+]}
+
+
+class TestCollectPvcUsage(unittest.TestCase):
+    """Tests for collect()."""
+
+    def setUp(self):
+        self.calls = []
+        self.kube = MagicMock()
+        self.kube.pvs.return_value = PVS
+        self.kube.pvcs.return_value = PVCS
+
+    def _run(self, cmd, **kwargs):
+        self.calls.append(cmd[:3])
+        outputs = {
+            ("rbd", "du", "--pool"): RBD_DU,
+            ("rbd", "diff", "--pool"): [
+                {"offset": 0, "length": 7, "exists": "true"},
+                {"offset": 7, "length": 5, "exists": "false"}],
+            ("ceph", "fs", "subvolume"): {"bytes_used": 30},
+        }
+        return subprocess.CompletedProcess(
+            cmd, 0, stdout=json.dumps(outputs[tuple(cmd[:3])]), stderr="")
+
+    def test_usage_of_all_pvcs(self):
+        pvcs = [{"namespace": "ns", "name": "rbd-1", "type": "RBD"},
+                {"namespace": "ns", "name": "rbd-2", "type": "RBD"},
+                {"namespace": "ns", "name": "fs-1", "type": "CephFS"},
+                {"namespace": "ns", "name": "unbound", "type": "RBD"}]
+        with patch.object(collect_pvc_usage.subprocess, "run", self._run):
+            results = collect_pvc_usage.collect(pvcs, workers=2,
+                                                kube=self.kube)
+        self.assertEqual([r["used_bytes"] for r in results], [40, 7, 30, 0])
+        self.assertEqual(results[0]["type"], "RBD")
+        # One rbd du for the pool
+        self.assertEqual(self.calls.count(["rbd", "du", "--pool"]), 1)
+
+    def test_failed_query_is_an_error(self):
+        def failed(cmd, **kwargs):
+            return subprocess.CompletedProcess(cmd, 1, stdout="",
+                                               stderr="timed out")
+        with patch.object(collect_pvc_usage.subprocess, "run", failed):
+            with self.assertRaises(collect_pvc_usage.UsageError):
+                collect_pvc_usage.collect(
+                    [{"namespace": "ns", "name": "rbd-1", "type": "RBD"}],
+                    kube=self.kube)
+
+
+if __name__ == "__main__":
+    unittest.main()
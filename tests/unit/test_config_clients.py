@@ -63,14 +63,18 @@ class TestUSCClients(BaseModuleTestCase):
         _ = self._token_client("CgtsClient").sysinv
 
     def test_cgts_client_sysinv_with_password(self):
-        _ = _password_client(self.m, "CgtsClient").sysinv
+        with patch("openstack_credentials.get_token") as get_token:
+            _ = _password_client(self.m, "CgtsClient").sysinv
+        get_token.assert_called_once()
 
     def test_openstack_client_with_token(self):
         _ = self._token_client().barbican
 
     def test_openstack_client_keystone_session_password(self):
         c = _password_client(self.m)
-        _ = c._get_new_keystone_session(c.conf)
+        with patch("openstack_credentials.get_token") as get_token:
+            _ = c._get_new_keystone_session(c.conf)
+        get_token.assert_called_once()
 
     def test_openstack_client_list_secrets(self):
         c = self._token_client()
@@ -283,7 +287,9 @@ class TestKSVMore(BaseModuleTestCase):
     mod_name = "ksv_cl"
 
     def test_cgts_client_class(self):
-        _ = _password_client(self.module, "CgtsClient").sysinv
+        with patch("openstack_credentials.get_token") as get_token:
+            _ = _password_client(self.module, "CgtsClient").sysinv
+        get_token.assert_called_once()
 
     def test_get_kubernetes_version_empty(self):
         c = MagicMock()
@@ -453,16 +453,11 @@ class TestCPAFinal(BaseModuleTestCase):
     mod_name = "cpa3"
 
     def test_get_os_env(self):
-        self.m.subprocess = MagicMock()
-        proc = MagicMock()
-        proc.stdout = iter(OS_ENV_LINES)
-        proc.communicate = MagicMock()
-        self.m.subprocess.Popen.return_value.__enter__ = lambda s: proc
-        self.m.subprocess.Popen.return_value.__exit__ = MagicMock(
-            return_value=False
-        )
-        result = self.m.get_os_env()
+        env = dict(line.strip().split("=", 1) for line in OS_ENV_LINES)
+        with patch("openstack_credentials.load_openrc", return_value=env):
+            result = self.m.get_os_env()
         self.assertIn("username", result)
+        self.assertEqual(result["user_domain_name"], "D")
 
     def test_build_patch_file_mapping_empty(self):
         checker = self.m.PatchChecker([], "24.09", "24.09")
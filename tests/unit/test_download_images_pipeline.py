@@ -0,0 +1,170 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the staged image download pipeline of download_images."""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from base_test import BaseModuleTestCase
+
+
+class TestImagePipeline(BaseModuleTestCase):
+    """Tests for ImagePipeline and its use by the download functions."""
+
+    role_path = "common/push-docker-images/files"
+    filename = "download_images.py"
+    mod_name = "dli_pipeline"
+
+    def setUp(self):
+        os.environ.setdefault("REGISTRIES", "{}")
+        super().setUp()
+        self.auth_calls = []
+
+        def auth():
+            self.auth_calls.append(1)
+            return {"username": "u", "password": "p"}
+
+        self.m.get_local_registry_auth = auth
+        self.m.docker = MagicMock()
+        self.m.docker.errors.APIError = type("APIError", (Exception,), {})
+        self.m.docker.errors.NotFound = type("NotFound", (Exception,), {})
+        self.m.subprocess = MagicMock()
+        self.m.crictl_image_list = []
+        self.m.backed_up_crictl_cache_images = None
+        self.m.purge_images_list_file = None
+
+    def _missing_client(self):
+        client = MagicMock()
+        client.inspect_distribution.side_effect = \
+            self.m.docker.errors.APIError("not found")
+        client.pull.return_value = '{"status": "ok"}'
+        return client
+
+    def test_clients_and_auth_are_shared(self):
+        clients = []
+
+        def new_client():
+            clients.append(self._missing_client())
+            return clients[-1]
+
+        self.m.docker.APIClient.side_effect = new_client
+        pipeline = self.m.ImagePipeline(1, 1, 1)
+        images = ["k8s.gcr.io/img%d:v1" % i for i in range(10)]
+        failed = self.m.map_function(
+            images, self.m.download_and_push_an_image, pipeline=pipeline)
+        self.assertEqual(failed, [])
+        self.assertEqual(len(self.auth_calls), 1)
+        self.assertLessEqual(len(clients), pipeline.threads)
+        self.assertEqual(sum(c.push.call_count for c in clients), 10)
+        self.assertEqual(self.m.subprocess.check_call.call_count, 10)
+
+    def test_stage_limits_are_independent(self):
+        lock = threading.Lock()
+        running = {"pull": 0, "push": 0}
+        peak = {"pull": 0, "push": 0}
+
+        def track(stage):
+            def call(*args, **kwargs):
+                with lock:
+                    running[stage] += 1
+                    peak[stage] = max(peak[stage], running[stage])
+                time.sleep(0.02)
+                with lock:
+                    running[stage] -= 1
+                return '{"status": "ok"}'
+            return call
+
+        def new_client():
+            client = self._missing_client()
+            client.pull.side_effect = track("pull")
+            client.push.side_effect = track("push")
+            return client
+
+        self.m.docker.APIClient.side_effect = new_client
+        pipeline = self.m.ImagePipeline(2, 1, 3)
+        tuples = [("img%d:v1" % i, "src/img%d:v1" % i, None)
+                  for i in range(8)]
+        failed = self.m.map_function(
+            tuples, self.m.download_and_push_an_image_for_prestage,
+            pipeline=pipeline)
+        self.assertEqual(failed, [])
+        self.assertEqual(peak["pull"], 2)
+        self.assertEqual(peak["push"], 1)
+
+    def test_layer_dedup_skips_docker_for_complete_images(self):
+        client = self._missing_client()
+        self.m.docker.APIClient.return_value = client
+        pipeline = self.m.ImagePipeline(1, 1, 1)
+        pipeline.dedup = MagicMock()
+
+        def populate(source_img, repo, reference, copy_missing=False):
+            done = source_img.endswith("a:v1")
+            return done, {"present": 1, "mounted": 1 if done else 0,
+                          "missing": 0 if done else 1,
+                          "blobs": ["c", "l"]}
+
+        pipeline.dedup.populate.side_effect = populate
+        failed = self.m.map_function(
+            ["k8s.gcr.io/a:v1", "k8s.gcr.io/b:v1"],
+            self.m.download_and_push_an_image, pipeline=pipeline)
+        self.assertEqual(failed, [])
+        pipeline.dedup.populate.assert_any_call(
+            "k8s.gcr.io/a:v1", "k8s.gcr.io/a", "v1", copy_missing=False)
+        client.pull.assert_called_once_with("k8s.gcr.io/b:v1")
+        pipeline.dedup.index.add.assert_called_once_with(
+            "k8s.gcr.io/b", ["c", "l"])
+        self.assertEqual(self.m.subprocess.check_call.call_count, 2)
+
+    def test_direct_copy_never_uses_docker(self):
+        client = self._missing_client()
+        self.m.docker.APIClient.return_value = client
+        pipeline = self.m.ImagePipeline(1, 1, 1)
+        pipeline.dedup = MagicMock()
+        pipeline.direct_copy = True
+        pipeline.dedup.populate.return_value = (True, {
+            "present": 0, "mounted": 1, "missing": 2, "copied": 2,
+            "copied_bytes": 10, "blobs": ["c", "l1", "l2"]})
+        tuples = [("img%d:v1" % i, "src/img%d:v1" % i, None)
+                  for i in range(3)]
+        failed = self.m.map_function(
+            tuples, self.m.download_and_push_an_image_for_prestage,
+            pipeline=pipeline)
+        self.assertEqual(failed, [])
+        pipeline.dedup.populate.assert_any_call(
+            "src/img1:v1", "img1", "v1", copy_missing=True)
+        client.pull.assert_not_called()
+        client.push.assert_not_called()
+
+    def test_pulled_images_are_added_to_inventory(self):
+        self.m.docker.APIClient.return_value = self._missing_client()
+        inventory = MagicMock()
+        pipeline = self.m.ImagePipeline(1, 1, 1, inventory=inventory)
+        self.m.map_function(["k8s.gcr.io/a:v1"],
+                            self.m.download_and_push_an_image,
+                            pipeline=pipeline)
+        inventory.add.assert_called_once_with(
+            "registry.local:9001/k8s.gcr.io/a:v1")
+
+    def test_failed_images_are_reported(self):
+        client = self._missing_client()
+        client.pull.side_effect = Exception("timeout")
+        self.m.docker.APIClient.return_value = client
+        self.m.time = MagicMock()
+        failed = self.m.map_function(
+            ["k8s.gcr.io/a:v1", "k8s.gcr.io/b:v1"],
+            self.m.download_and_push_an_image,
+            pipeline=self.m.ImagePipeline(2, 2, 2))
+        self.assertEqual(sorted(failed), ["k8s.gcr.io/a:v1", "k8s.gcr.io/b:v1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
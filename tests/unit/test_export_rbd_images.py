@@ -0,0 +1,120 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the concurrent RBD export of storage-backend-migration."""
+
+import gzip
+import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["storage-backend-migration/export/files"])
+
+import export_rbd_images
+
+# rbd export --no-progress --export-format FORMAT POOL/IMAGE -
+FAKE_RBD = """#!/bin/sh
+echo "$5 $4" >> "$RBD_LOG"
+case "$5" in
+  *broken*) echo "rbd: error opening image" >&2; exit 1 ;;
+  *old*) [ "$4" = 2 ] && exit 22 ;;
+esac
+printf 'data of %s' "$5"
+"""
+
+FAKE_PIGZ = """#!/bin/sh
+exec gzip -c
+"""
+
+
+class TestRbdExporter(unittest.TestCase):
+    """Tests for RbdExporter."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.backup_dir = os.path.join(self.tmp, "rbd")
+        os.makedirs(self.backup_dir)
+        bin_dir = os.path.join(self.tmp, "bin")
+        os.makedirs(bin_dir)
+        for name, content in (("rbd", FAKE_RBD), ("pigz", FAKE_PIGZ)):
+            path = os.path.join(bin_dir, name)
+            with open(path, "w") as f:
+                f.write(content)
+            os.chmod(path, stat.S_IRWXU)
+        self.rbd_log = os.path.join(self.tmp, "rbd.log")
+        env = {"PATH": bin_dir + os.pathsep + os.environ["PATH"],
+               "RBD_LOG": self.rbd_log}
+        patcher = patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _run(self, images):
+        exporter = export_rbd_images.RbdExporter(self.backup_dir, workers=2)
+        return exporter.run(images)
+
+    def _exports(self):
+        with open(self.rbd_log) as f:
+            return [line.split()[0] for line in f]
+
+    def _manifest(self):
+        with open(os.path.join(self.backup_dir, "manifest.json")) as f:
+            return json.load(f)["images"]
+
+    def test_export_records_checksums(self):
+        images = [("kube-rbd", "pvc-1"), ("kube-rbd", "pvc-2"),
+                  ("images", "old-1")]
+        self.assertTrue(self._run(images))
+        manifest = self._manifest()
+        self.assertEqual(sorted(manifest), ["images/old-1", "kube-rbd/pvc-1",
+                                            "kube-rbd/pvc-2"])
+        for key, entry in manifest.items():
+            path = os.path.join(self.backup_dir, entry["file"])
+            with open(path, "rb") as f:
+                data = f.read()
+            self.assertEqual(gzip.decompress(data),
+                             ("data of %s" % key).encode())
+            self.assertEqual(entry["sha256"], hashlib.sha256(data).hexdigest())
+            self.assertEqual(entry["bytes"], len(data))
+        self.assertEqual(manifest["images/old-1"]["export_format"], 1)
+        self.assertEqual(manifest["kube-rbd/pvc-1"]["export_format"], 2)
+
+    def test_resume_skips_exported_images(self):
+        self.assertTrue(self._run([("kube-rbd", "pvc-1")]))
+        # A truncated backup file is exported again
+        with open(os.path.join(self.backup_dir, "kube-rbd", "pvc-1.bkp.gz"),
+                  "ab") as f:
+            f.write(b"x")
+        self.assertTrue(self._run([("kube-rbd", "pvc-1")]))
+        self.assertTrue(self._run([("kube-rbd", "pvc-1"),
+                                   ("kube-rbd", "pvc-2")]))
+        self.assertEqual(self._exports(), ["kube-rbd/pvc-1", "kube-rbd/pvc-1",
+                                           "kube-rbd/pvc-2"])
+
+    def test_failed_export_is_not_recorded(self):
+        self.assertFalse(self._run([("kube-rbd", "broken"),
+                                    ("kube-rbd", "pvc-1")]))
+        manifest = self._manifest() if os.path.exists(
+            os.path.join(self.backup_dir, "manifest.json")) else {}
+        self.assertNotIn("kube-rbd/broken", manifest)
+        self.assertEqual(os.listdir(os.path.join(self.backup_dir, "kube-rbd")),
+                         [f for f in ["pvc-1.bkp.gz"]
+                          if "kube-rbd/pvc-1" in manifest])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the parallel file census of compute-lvm-pvc-sizes."""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["storage-backend-migration/compute-lvm-pvc-sizes/files"])
+
+import file_census
+
+
+class TestFileCensus(unittest.TestCase):
+    """Tests for census()."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _volume(self, name, dirs, files_per_dir, size):
+        root = os.path.join(self.tmp, name)
+        for d in range(dirs):
+            path = os.path.join(root, "d%d" % d, "sub")
+            os.makedirs(path)
+            for f in range(files_per_dir):
+                with open(os.path.join(path, "f%d" % f), "wb") as fh:
+                    fh.write(b"x" * size)
+        os.symlink("d0", os.path.join(root, "link"))
+        return root
+
+    def test_counts_like_find(self):
+        vol1 = self._volume("vol1", 3, 5, 10)
+        vol2 = self._volume("vol2", 1, 2, 100)
+        results = file_census.census([("ns/vol1", vol1), ("ns/vol2", vol2),
+                                      ("ns/missing", vol1 + "-missing")],
+                                     workers=4)
+        # Entries below the root: d, d/sub, files, plus the symlink
+        self.assertEqual(results["ns/vol1"], {"files": 3 * 7 + 1,
+                                              "bytes": 150})
+        self.assertEqual(results["ns/vol2"], {"files": 5, "bytes": 200})
+        self.assertEqual(results["ns/missing"], {"files": 0, "bytes": 0})
+
+    def test_other_filesystems_are_not_walked(self):
+        vol = self._volume("vol", 2, 1, 1)
+        # The directories below the root look like other filesystems
+        with patch.object(file_census.os, "lstat",
+                          return_value=MagicMock(st_dev=-1)):
+            results = file_census.census([("ns/vol", vol)], workers=2)
+        # d0, d1 and the symlink are counted but not walked
+        self.assertEqual(results["ns/vol"], {"files": 3, "bytes": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the cached containerd image inventory."""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["common/push-docker-images/files"])
+
+import image_inventory
+
+CRICTL_OUTPUT = json.dumps({"images": [
+    {"id": "sha256:1", "repoTags": ["registry.local:9001/a:v1",
+                                    "registry.local:9001/a:latest"],
+     "repoDigests": ["registry.local:9001/a@sha256:d1"]},
+    {"id": "sha256:2", "repoTags": [], "repoDigests": []},
+]}).encode()
+
+
+class TestImageInventory(unittest.TestCase):
+    """Tests for ImageInventory."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self._tmp.name, "inventory.json")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _load(self, output=CRICTL_OUTPUT, ttl=600):
+        check_output = MagicMock(return_value=output)
+        with patch.object(image_inventory.subprocess, "check_output",
+                          check_output):
+            inventory = image_inventory.ImageInventory(self.cache, ttl).load()
+        return inventory, check_output.call_count
+
+    def test_lookup_by_tag_and_digest(self):
+        inventory, _ = self._load()
+        self.assertIn("registry.local:9001/a:latest", inventory)
+        self.assertIn("registry.local:9001/a@sha256:d1", inventory)
+        self.assertNotIn("registry.local:9001/b:v1", inventory)
+        self.assertEqual(len(inventory), 2)
+
+    def test_saved_inventory_is_reused_until_expired(self):
+        inventory, calls = self._load()
+        self.assertEqual(calls, 1)
+        inventory.add("registry.local:9001/b:v1")
+
+        inventory, calls = self._load()
+        self.assertEqual(calls, 0)
+        self.assertIn("registry.local:9001/b:v1", inventory)
+
+        old = time.time() - 601
+        os.utime(self.cache, (old, old))
+        inventory, calls = self._load()
+        self.assertEqual(calls, 1)
+        self.assertNotIn("registry.local:9001/b:v1", inventory)
+
+    def test_invalidate(self):
+        inventory, _ = self._load()
+        inventory.invalidate()
+        inventory.invalidate()
+        _, calls = self._load()
+        self.assertEqual(calls, 1)
+
+    def test_has_digest(self):
+        inventory, _ = self._load()
+        tag = "registry.local:9001/a:v1"
+        inspecti = json.dumps({"status": {"repoDigests": [
+            "registry.local:9001/a@sha256:d1"]}}).encode()
+        with patch.object(image_inventory.subprocess, "check_output",
+                          return_value=inspecti) as check_output:
+            self.assertTrue(inventory.has_digest(tag, "sha256:d1"))
+            # New content pushed under the same tag
+            self.assertFalse(inventory.has_digest(tag, "sha256:d2"))
+            self.assertFalse(inventory.has_digest(tag, None))
+        self.assertEqual(check_output.call_count, 1)
+
+    def test_has_digest_confirms_with_crictl(self):
+        inventory, _ = self._load()
+        # The image was garbage-collected since the inventory was saved
+        with patch.object(image_inventory.subprocess, "check_output",
+                          side_effect=image_inventory.subprocess
+                          .CalledProcessError(1, "crictl")):
+            self.assertFalse(inventory.has_digest("registry.local:9001/a:v1",
+                                                  "sha256:d1"))
+
+    def test_added_digest_is_saved(self):
+        inventory, _ = self._load()
+        inventory.add("registry.local:9001/b:v1", "sha256:d3")
+        inventory, _ = self._load()
+        self.assertIn("registry.local:9001/b@sha256:d3", inventory)
+        self.assertEqual(inventory.tags["registry.local:9001/b:v1"],
+                         "sha256:d3")
+
+    def test_push_digest(self):
+        output = "\r\n".join([
+            '{"status": "Pushing"}',
+            '{"status": "v1: digest: sha256:d4 size: 527"}',
+            '{"progressDetail": {}, "aux": {"Tag": "v1", '
+            '"Digest": "sha256:d4", "Size": 527}}'])
+        self.assertEqual(image_inventory.push_digest(output), "sha256:d4")
+        self.assertIsNone(image_inventory.push_digest('{"status": "x"}'))
+        self.assertEqual(
+            image_inventory.repo_digest("registry.local:9001/a/b:v1", "d"),
+            "registry.local:9001/a/b@d")
+
+    def test_failed_query_is_not_saved(self):
+        inventory, _ = self._load(output=b"not json")
+        self.assertEqual(len(inventory), 0)
+        self.assertFalse(os.path.exists(self.cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
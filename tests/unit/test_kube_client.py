@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the shared Kubernetes client of storage-backend-migration."""
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["storage-backend-migration/common/files",
+               "storage-backend-migration/discovery-pvcs/files"])
+sys.modules.setdefault("kubernetes", MagicMock())
+
+import get_pvcs_json
+import kube_client
+
+
+def pvc(namespace, name, storage_class, pv):
+    return {"metadata": {"namespace": namespace, "name": name},
+            "spec": {"storageClassName": storage_class, "volumeName": pv,
+                     "resources": {"requests": {"storage": "1Gi"}}}}
+
+
+class FakeCoreV1Api(object):
+    """Serves the PVCs and PVs in pages of the requested size."""
+
+    calls = []
+    objects = {}
+
+    def __init__(self, api_client):
+        self.api_client = api_client
+
+    def _page(self, kind, limit, _continue=None, **kwargs):
+        self.calls.append((kind, limit, _continue, kwargs))
+        items = self.objects[kind]
+        start = int(_continue or 0)
+        end = start + limit
+        page = {"items": items[start:end],
+                "metadata": {"continue": str(end) if end < len(items)
+                             else ""}}
+        return MagicMock(data=json.dumps(page).encode())
+
+    def list_persistent_volume_claim_for_all_namespaces(self, **kwargs):
+        return self._page("pvc", **kwargs)
+
+    def list_namespaced_persistent_volume_claim(self, namespace, **kwargs):
+        return self._page("pvc", **kwargs)
+
+    def list_persistent_volume(self, **kwargs):
+        return self._page("pv", **kwargs)
+
+
+class TestKubeClient(unittest.TestCase):
+    """Tests for KubeClient."""
+
+    def setUp(self):
+        FakeCoreV1Api.calls = []
+        FakeCoreV1Api.objects = {
+            "pvc": [pvc("ns", "data-%d" % i, "general", "pv-%d" % i)
+                    for i in range(5)] +
+                   [pvc("ns", "fs", "cephfs", "pv-fs"),
+                    pvc("other", "local", "local-path", "pv-local")],
+            "pv": [{"metadata": {"name": "pv-1"},
+                    "spec": {"persistentVolumeReclaimPolicy": "Retain"}}],
+        }
+        patcher = patch.object(kube_client, "client",
+                               MagicMock(CoreV1Api=FakeCoreV1Api))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.kube = kube_client.KubeClient(page_size=3,
+                                           api_client=object())
+
+    def test_paginated_list(self):
+        names = [i["metadata"]["name"] for i in self.kube.list(
+            "PersistentVolumeClaim", namespace="ns",
+            label_selector="app=db", field_selector="metadata.name!=x")]
+        self.assertEqual(len(names), 7)
+        self.assertEqual([c[2] for c in FakeCoreV1Api.calls],
+                         [None, "3", "6"])
+        self.assertEqual(FakeCoreV1Api.calls[0][3]["label_selector"],
+                         "app=db")
+        self.assertEqual(FakeCoreV1Api.calls[0][3]["field_selector"],
+                         "metadata.name!=x")
+
+    def test_cluster_scoped_kind_in_namespace(self):
+        with self.assertRaises(ValueError):
+            self.kube.list("PersistentVolume", namespace="ns")
+
+    def test_lists_are_cached_per_run(self):
+        self.kube.pvcs()
+        self.kube.pvcs()
+        self.assertEqual(len(FakeCoreV1Api.calls), 3)
+
+    def test_get_pvcs_json(self):
+        pvcs = get_pvcs_json.get_pvcs("data-[01]$", kube=self.kube)
+        self.assertEqual(len(pvcs), 6)
+        self.assertEqual([p["name"] for p in pvcs if p["match"]],
+                         ["data-0", "data-1"])
+        self.assertEqual(pvcs[1]["reclaim_policy"], "Retain")
+        self.assertEqual(pvcs[5]["type"], "CephFS")
+
+
+if __name__ == "__main__":
+    unittest.main()
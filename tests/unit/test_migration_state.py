@@ -0,0 +1,88 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the migration state store of storage-backend-migration."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["storage-backend-migration/common/files"])
+
+import migration_state
+
+
+class TestStateStore(unittest.TestCase):
+    """Tests for StateStore."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self._tmp.name, "backups", "state.db")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _store(self, run_id="run-1"):
+        store = migration_state.StateStore(self.db, run_id)
+        self.addCleanup(store.close)
+        return store
+
+    def test_resume_from_done_items(self):
+        store = self._store()
+        progress = store.start_role("import-lvm", "controller-0")
+        self.assertEqual(progress["previous_status"], None)
+        self.assertEqual(progress["done_items"], [])
+        store.finish_item("import-lvm", "block/ns/pvc-1", 12.5)
+        store.finish_item("import-lvm", "block/ns/pvc-2")
+        store.fail_role("import-lvm", "controller-0")
+
+        # The same run resumes with the items already done
+        store = self._store()
+        progress = store.start_role("import-lvm", "controller-0")
+        self.assertEqual(progress["previous_status"], "failed")
+        self.assertEqual(progress["done_items"],
+                         ["block/ns/pvc-1", "block/ns/pvc-2"])
+        store.finish_role("import-lvm", "controller-0")
+
+        status = store.status()
+        self.assertEqual(status["run"], "run-1")
+        self.assertEqual(status["roles"][0]["status"], "done")
+        self.assertEqual(status["roles"][0]["items"], 2)
+        self.assertEqual(status["roles"][0]["items_elapsed"], 12.5)
+
+    def test_another_run_starts_fresh(self):
+        store = self._store()
+        store.start_role("import-lvm", "controller-0")
+        store.finish_item("import-lvm", "block/ns/pvc-1")
+
+        # Without a run id, the records are kept
+        self.assertEqual(self._store(None).done_items("import-lvm"),
+                         ["block/ns/pvc-1"])
+        store = self._store("run-2")
+        self.assertEqual(store.done_items("import-lvm"), [])
+        self.assertEqual(store.status(), {"run": "run-2", "roles": []})
+
+    def test_forget(self):
+        store = self._store()
+        store.finish_item("import-lvm", "block/ns/pvc-1")
+        store.finish_item("export-lvm", "block/ns/pvc-1")
+        store.forget("import-lvm")
+        self.assertEqual(store.done_items("import-lvm"), [])
+        self.assertEqual(store.done_items("export-lvm"), ["block/ns/pvc-1"])
+
+    def test_parse_elapsed(self):
+        self.assertEqual(migration_state.parse_elapsed("0:01:02.500000"),
+                         62.5)
+        self.assertEqual(migration_state.parse_elapsed("3"), 3.0)
+        self.assertIsNone(migration_state.parse_elapsed(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the shared platform credentials of load-openrc."""
+
+import datetime
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["common/load-openrc/files"])
+
+import openstack_credentials as oc
+
+OPENRC = """
+unset OS_SERVICE_TOKEN
+export OS_USERNAME=admin
+export OS_PASSWORD=`TERM=linux /opt/platform/.keyring/22.12/.CREDENTIAL 2>/dev/null`
+export OS_AUTH_URL="http://192.168.204.2:5000/v3"
+export OS_PROJECT_NAME='admin'
+export OS_USER_DOMAIN_NAME=Default
+export OS_PROJECT_DOMAIN_NAME=Default
+export OS_REGION_NAME=RegionOne
+export PS1='[\\u@\\h \\W(keystone_$OS_USERNAME)]\\$ '
+"""
+
+
+def token(expires_in=3600, token_id="tok"):
+    expires = (datetime.datetime.now(datetime.timezone.utc) +
+               datetime.timedelta(seconds=expires_in))
+    return oc.Token(token_id, {"token": {
+        "expires_at": expires.strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
+        "catalog": [{"type": "platform", "endpoints": [
+            {"interface": "internal", "region": "RegionOne",
+             "url": "http://sysinv:6385"},
+            {"interface": "admin", "region": "RegionOne",
+             "url": "https://sysinv:6386"},
+            {"interface": "internal", "region": "Other",
+             "url": "http://other:6385"}]}]}})
+
+
+class TestOpenrc(unittest.TestCase):
+    """Tests for the openrc parsing."""
+
+    def test_parse_openrc(self):
+        env = oc.parse_openrc(
+            OPENRC, keyring_get=lambda service, user: "%s-%s" % (service,
+                                                                 user))
+        self.assertEqual(env["OS_PASSWORD"], "CGCS-admin")
+        self.assertEqual(env["OS_AUTH_URL"], "http://192.168.204.2:5000/v3")
+        self.assertEqual(env["OS_PROJECT_NAME"], "admin")
+        self.assertNotIn("OS_SERVICE_TOKEN", env)
+
+    def test_load_openrc_falls_back_to_bash(self):
+        with tempfile.NamedTemporaryFile("w", suffix="openrc") as f:
+            f.write("export OS_USERNAME=admin\n")
+            f.flush()
+            with patch.object(oc, "source_openrc",
+                              return_value={"OS_USERNAME": "x"}) as source:
+                self.assertEqual(oc.load_openrc(f.name), {"OS_USERNAME": "x"})
+        source.assert_called_once_with(f.name)
+
+    def test_conf_from_openrc(self):
+        self.assertEqual(oc.conf_from_openrc({"OS_AUTH_URL": "u"}),
+                         {"auth_url": "u"})
+
+
+class TestToken(unittest.TestCase):
+    """Tests for Token."""
+
+    def test_valid(self):
+        self.assertTrue(token(3600).valid())
+        self.assertFalse(token(60).valid())
+
+    def test_endpoint(self):
+        t = token()
+        self.assertEqual(t.endpoint("platform", region="RegionOne"),
+                         "http://sysinv:6385")
+        self.assertEqual(t.endpoint("platform", "admin", "RegionOne"),
+                         "https://sysinv:6386")
+        self.assertEqual(t.endpoint("platform", region="Other"),
+                         "http://other:6385")
+        with self.assertRaises(LookupError):
+            t.endpoint("identity")
+
+
+class TestTokenCache(unittest.TestCase):
+    """Tests for TokenCache and get_token."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.directory = os.path.join(self.tmp, "tokens")
+        self.env = {"OS_AUTH_URL": "http://ks:5000", "OS_USERNAME": "admin",
+                    "OS_PASSWORD": "pw", "OS_PROJECT_NAME": "admin"}
+
+    def test_put_and_get(self):
+        cache = oc.TokenCache(self.directory)
+        key = cache.key(self.env)
+        cache.put(key, token())
+        self.assertEqual(cache.get(key).id, "tok")
+        self.assertEqual(stat.S_IMODE(os.stat(self.directory).st_mode),
+                         0o700)
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        cache.clear()
+        self.assertIsNone(cache.get(key))
+
+    def test_expiring_token_is_not_reused(self):
+        cache = oc.TokenCache(self.directory)
+        key = cache.key(self.env)
+        cache.put(key, token(60))
+        self.assertIsNone(cache.get(key))
+
+    def test_key_follows_credentials(self):
+        other = dict(self.env, OS_PASSWORD="new")
+        self.assertNotEqual(oc.TokenCache.key(self.env),
+                            oc.TokenCache.key(other))
+
+    def test_get_token_reuses_the_cache(self):
+        with patch.object(oc, "issue_token",
+                          side_effect=[token(token_id="a"),
+                                       token(token_id="b")]) as issue:
+            self.assertEqual(oc.get_token(self.env, self.directory).id, "a")
+            self.assertEqual(oc.get_token(self.env, self.directory).id, "a")
+            self.assertEqual(issue.call_count, 1)
+            oc.invalidate(self.directory)
+            self.assertEqual(oc.get_token(self.env, self.directory).id, "b")
+
+    def test_get_token_without_cache(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop(oc.TOKEN_CACHE_ENV, None)
+            with patch.object(oc, "issue_token",
+                              return_value=token()) as issue:
+                oc.get_token(self.env)
+                oc.get_token(self.env)
+        self.assertEqual(issue.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the optimized-restore postgres dump readers."""
+
+import os
+import runpy
+import sys
+import tempfile
+import textwrap
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mock_deps import install_mocks
+from test_helpers import ROLES, add_role_dirs
+
+install_mocks()
+add_role_dirs([
+    "optimized-restore/apply-manifest/files",
+    "optimized-restore/prepare-env/files",
+    "common/files",
+])
+
+import compare_backup_lvs
+import detect_backup_storage_metadata as dbsm
+
+CHECK_FACTORY_DATA = os.path.join(
+    ROLES, "optimized-restore", "prepare-env", "files",
+    "check_backup_factory_data.py")
+
+TS = "'2026-01-01 00:00:00+00'"
+
+INSERTS_DUMP = textwrap.dedent("""\
+    INSERT INTO public.controller_fs VALUES ({ts}, NULL, NULL, 1, 'u1', 1, 'available', 'platform', 10, 'platform-lv', true, 'x');
+    INSERT INTO public.host_fs VALUES ({ts}, NULL, NULL, 1, 'u2', 'backup', 25, 'backup-lv', 1, 'available', 'x');
+    INSERT INTO public.storage_backend VALUES ({ts}, NULL, NULL, 1, 'u3', 'ceph-rook', 'configured', NULL, 1, 'block', '{{}}', 'ceph-rook-store');
+    INSERT INTO public.kube_app VALUES ({ts}, NULL, 7, 'rook-ceph', '1.0', 'm', 'f', 'applied', 'done', true, 0, NULL, NULL);
+    INSERT INTO public.helm_overrides VALUES ({ts}, NULL, NULL, 1, 'rook-ceph', 'rook-ceph', 'a: 1
+    b: ''x, (y)''
+    ', 7, NULL);
+    """).format(ts=TS)
+
+ROWS_DUMP = textwrap.dedent("""\
+    INSERT INTO public.controller_fs VALUES
+    \t({ts}, NULL, NULL, 1, 'u1', 1, 'available', 'platform', 10, 'platform-lv', true, 'x');
+    INSERT INTO public.host_fs VALUES
+    \t({ts}, NULL, NULL, 1, 'u2', 'backup', 25, 'backup-lv', 1, 'available', 'x'),
+    \t({ts}, NULL, NULL, 2, 'u4', 'scratch', 16, 'scratch-lv', 1, 'available', 'x');
+    INSERT INTO public.storage_backend VALUES
+    \t({ts}, NULL, NULL, 1, 'u3', 'ceph-rook', 'configured', NULL, 1, 'block', '{{}}', 'ceph-rook-store');
+    INSERT INTO public.kube_app VALUES
+    \t({ts}, NULL, 6, 'other', '1.0', 'm', 'f', 'applied', 'done', true, 0, NULL, NULL),
+    \t({ts}, NULL, 7, 'rook-ceph', '1.0', 'm', 'f', 'applied', 'done', true, 0, NULL, NULL);
+    INSERT INTO public.helm_overrides VALUES
+    \t({ts}, NULL, NULL, 1, 'rook-ceph', 'rook-ceph', 'a: 1
+    b: ''x, (y)''
+    ', 7, NULL),
+    \t({ts}, NULL, NULL, 2, 'rook-ceph-provisioner', 'rook-ceph', NULL, 7, NULL);
+    """).format(ts=TS)
+
+COPY_DUMP = textwrap.dedent("""\
+    COPY public.controller_fs (created_at, updated_at, deleted_at, id, uuid, forisystemid, state, name, size, logical_volume, replicated, supported_functions) FROM stdin;
+    2026-01-01\t\\N\t\\N\t1\tu1\t1\tavailable\tplatform\t10\tplatform-lv\tt\tx
+    \\.
+
+    COPY public.host_fs (created_at, updated_at, deleted_at, id, uuid, name, size, logical_volume, forihostid, state, supported_functions) FROM stdin;
+    2026-01-01\t\\N\t\\N\t1\tu2\tbackup\t25\tbackup-lv\t1\tavailable\tx
+    \\.
+
+    COPY public.storage_backend (created_at, updated_at, deleted_at, id, uuid, backend, state, task, forisystemid, services, capabilities, name) FROM stdin;
+    2026-01-01\t\\N\t\\N\t1\tu3\tceph-rook\tconfigured\t\\N\t1\tblock\t{}\tceph-rook-store
+    \\.
+
+    COPY public.kube_app (created_at, updated_at, id, name, app_version, manifest_name, manifest_file, status, progress, active, recovery_attempts, app_metadata, deleted_at) FROM stdin;
+    2026-01-01\t\\N\t7\trook-ceph\t1.0\tm\tf\tapplied\tdone\tt\t0\t\\N\t\\N
+    \\.
+
+    COPY public.helm_overrides (created_at, updated_at, deleted_at, id, name, namespace, user_overrides, app_id, attributes) FROM stdin;
+    2026-01-01\t\\N\t\\N\t1\trook-ceph\trook-ceph\ta: 1\\nb: 'x, (y)'\\n\t7\t\\N
+    \\.
+    """)
+
+
+class DumpFileTestCase(unittest.TestCase):
+    """Base that writes dump fixtures to a temp dir."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_dump(self, content):
+        path = os.path.join(self._tmp.name, "sysinv.postgreSql.data")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+
+class TestCompareBackupLvsFormats(DumpFileTestCase):
+    """get_backup_fs_sizes reads every dump format."""
+
+    def test_inserts(self):
+        ctrl, host = compare_backup_lvs.get_backup_fs_sizes(
+            self.write_dump(INSERTS_DUMP))
+        self.assertEqual(ctrl, {"platform": 10})
+        self.assertEqual(host, {"backup": 25})
+
+    def test_multi_row_inserts(self):
+        ctrl, host = compare_backup_lvs.get_backup_fs_sizes(
+            self.write_dump(ROWS_DUMP))
+        self.assertEqual(ctrl, {"platform": 10})
+        self.assertEqual(host, {"backup": 25, "scratch": 16})
+
+    def test_copy(self):
+        ctrl, host = compare_backup_lvs.get_backup_fs_sizes(
+            self.write_dump(COPY_DUMP))
+        self.assertEqual(ctrl, {"platform": 10})
+        self.assertEqual(host, {"backup": 25})
+
+
+class TestDetectBackupStorageMetadataFormats(DumpFileTestCase):
+    """detect_backup_storage_metadata reads every dump format."""
+
+    def _check(self, path):
+        tables = dbsm.read_metadata_tables(path)
+        backends = dbsm.extract_storage_backends(tables)
+        self.assertEqual(backends[0]["backend"], "ceph-rook")
+        self.assertEqual(backends[0]["state"], "configured")
+        overrides = dbsm.extract_helm_overrides_for_app(tables, "rook-ceph")
+        self.assertEqual(overrides[0]["chart_name"], "rook-ceph")
+        self.assertEqual(overrides[0]["user_overrides"],
+                         "a: 1\nb: 'x, (y)'\n")
+        fs = dbsm.extract_controller_fs(tables)
+        self.assertEqual(fs, [{"name": "platform", "size": 10,
+                               "logical_volume": "platform-lv"}])
+        return overrides
+
+    def test_inserts(self):
+        self._check(self.write_dump(INSERTS_DUMP))
+
+    def test_multi_row_inserts(self):
+        overrides = self._check(self.write_dump(ROWS_DUMP))
+        self.assertEqual(len(overrides), 2)
+        self.assertFalse(overrides[1]["has_user_overrides"])
+
+    def test_copy(self):
+        self._check(self.write_dump(COPY_DUMP))
+
+
+class TestCheckBackupFactoryDataFormats(DumpFileTestCase):
+    """check_backup_factory_data reads every dump format."""
+
+    CPU_INSERTS = (
+        "INSERT INTO public.i_icpu VALUES ({ts}, NULL, NULL, 1, 'u', 0, 0, 0, "
+        "'f', 'm', 'Platform', NULL, 1, 0);\n"
+        "INSERT INTO public.i_icpu VALUES ({ts}, NULL, NULL, 2, 'u', 1, 0, 1, "
+        "'f', 'm', 'Platform', NULL, 1, 0);\n").format(ts=TS)
+
+    CPU_COPY = (
+        "COPY public.i_icpu (created_at, updated_at, deleted_at, id, uuid, "
+        "cpu, core, thread, cpu_family, cpu_model, allocated_function, "
+        "capabilities, forihostid, forinodeid) FROM stdin;\n"
+        "x\t\\N\t\\N\t1\tu\t0\t0\t0\tf\tm\tPlatform\t\\N\t1\t0\n"
+        "x\t\\N\t\\N\t2\tu\t1\t0\t1\tf\tm\tPlatform\t\\N\t1\t0\n"
+        "\\.\n")
+
+    def _run(self, action, content):
+        path = self.write_dump(content)
+        out = StringIO()
+        with patch.object(sys, "argv", ["prog", action, path]), \
+                patch("sys.stdout", out):
+            runpy.run_path(CHECK_FACTORY_DATA, run_name="__main__")
+        return out.getvalue()
+
+    def test_cpu_inserts(self):
+        self.assertEqual(self._run("cpu", self.CPU_INSERTS), "2,1,1,2\n")
+
+    def test_cpu_copy(self):
+        self.assertEqual(self._run("cpu", self.CPU_COPY), "2,1,1,2\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
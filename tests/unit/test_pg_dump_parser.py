@@ -0,0 +1,107 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the shared streaming postgres dump parser."""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["common/files"])
+
+import pg_dump_parser
+
+DUMP = """--
+-- PostgreSQL database dump
+--
+
+SET statement_timeout = 0;
+INSERT INTO public.a VALUES (1, 'x;y', NULL);
+INSERT INTO public.b VALUES (2, 'multi
+line ''q'' ;', E'back\\\\slash\\n');
+INSERT INTO public.b VALUES
+\t(3, 'r1'),
+\t(4, '(r2)');
+COPY public.b (id, v) FROM stdin;
+5\tc\\tx
+6\t\\N
+\\.
+
+COPY public.a (id, v) FROM stdin;
+7\tz
+\\.
+
+SELECT pg_catalog.setval('public.a_id_seq', 7, true);
+"""
+
+
+class TestPgDumpParser(unittest.TestCase):
+    """Tests for pg_dump_parser."""
+
+    def test_iter_rows_all_formats(self):
+        rows = list(pg_dump_parser.iter_rows(io.StringIO(DUMP), ["b"]))
+        self.assertEqual(rows, [
+            ("b", ["2", "multi\nline 'q' ;", "back\\slash\n"]),
+            ("b", ["3", "r1"]),
+            ("b", ["4", "(r2)"]),
+            ("b", ["5", "c\tx"]),
+            ("b", ["6", None]),
+        ])
+
+    def test_read_tables_single_pass(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".sql") as f:
+            f.write(DUMP)
+            f.flush()
+            tables = pg_dump_parser.read_tables(f.name, ["a", "b", "c"])
+        self.assertEqual(tables["a"], [["1", "x;y", None], ["7", "z"]])
+        self.assertEqual(len(tables["b"]), 5)
+        self.assertEqual(tables["c"], [])
+
+    def test_iter_statements(self):
+        statements = list(pg_dump_parser.iter_statements(
+            io.StringIO(DUMP)))
+        self.assertEqual(statements[0], "SET statement_timeout = 0;")
+        self.assertEqual(len(statements), 5)
+        self.assertTrue(statements[-1].startswith("SELECT"))
+
+    def test_iter_statements_without_semicolon(self):
+        statements = list(pg_dump_parser.iter_statements(["SELECT 'a;'\n"]))
+        self.assertEqual(statements, ["SELECT 'a;'\n"])
+
+    def test_iter_updates(self):
+        sql = ("update helm_overrides set system_overrides=E'a\\\\b', "
+               "user_overrides=NULL where name='c1'\n"
+               "update helm_overrides set system_overrides='s''2', "
+               "user_overrides='u' where name='c2' and namespace='x';")
+        updates = list(pg_dump_parser.iter_updates(sql))
+        self.assertEqual(updates, [
+            ["helm_overrides",
+             {"system_overrides": "a\\b", "user_overrides": None},
+             {"name": "c1"}],
+            ["helm_overrides",
+             {"system_overrides": "s'2", "user_overrides": "u"},
+             {"name": "c2", "namespace": "x"}],
+        ])
+
+    def test_parse_value(self):
+        self.assertIsNone(pg_dump_parser.parse_value("NULL"))
+        self.assertEqual(pg_dump_parser.parse_value("'it''s'"), "it's")
+        self.assertEqual(pg_dump_parser.parse_value("E'\\x41\\101'"), "AA")
+        self.assertEqual(pg_dump_parser.parse_value("-42"), "-42")
+
+    def test_decode_copy_field(self):
+        self.assertIsNone(pg_dump_parser.decode_copy_field("\\N"))
+        self.assertEqual(pg_dump_parser.decode_copy_field("a\\\\b\\nc''"),
+                         "a\\b\nc''")
+
+
+if __name__ == "__main__":
+    unittest.main()
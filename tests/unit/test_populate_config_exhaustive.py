@@ -43,7 +43,16 @@ class TestPICExhaustive(BaseModuleTestCase):
         self.configure_conf(**kwargs)
         return self.create_client()
 
-    # Secondary network functions
+    # Secondary networks
+    def _populate_with_secondary(self, c, function):
+        """Populate a network and check its secondary pool is assigned."""
+        c.sysinv.address_pool.create.side_effect = [
+            MagicMock(uuid="p-uuid"), MagicMock(uuid="p2-uuid")]
+        function(c)
+        self.assertEqual(c.sysinv.address_pool.create.call_count, 2)
+        c.sysinv.network_addrpool.assign.assert_called_once_with(
+            network_uuid="n-uuid", address_pool_uuid="p2-uuid")
+
     def _net(self, name):
         """Create a mock network matching sysinv constant name."""
         n = MagicMock()
@@ -63,7 +72,7 @@ class TestPICExhaustive(BaseModuleTestCase):
         c.sysinv.network.list.return_value = [
             self._net(self.m.sysinv_constants.NETWORK_TYPE_MGMT)
         ]
-        self.m.populate_mgmt_network_secondary(c)
+        self._populate_with_secondary(c, self.m.populate_mgmt_network)
 
     def test_populate_oam_network_secondary(self):
         c = self._create_test_client(
@@ -73,7 +82,7 @@ class TestPICExhaustive(BaseModuleTestCase):
         c.sysinv.network.list.return_value = [
             self._net(self.m.sysinv_constants.NETWORK_TYPE_OAM)
         ]
-        self.m.populate_oam_network_secondary(c)
+        self._populate_with_secondary(c, self.m.populate_oam_network)
 
     def test_populate_multicast_network_secondary(self):
         c = self._create_test_client(
@@ -82,7 +91,7 @@ class TestPICExhaustive(BaseModuleTestCase):
         c.sysinv.network.list.return_value = [
             self._net(self.m.sysinv_constants.NETWORK_TYPE_MULTICAST)
         ]
-        self.m.populate_multicast_network_secondary(c)
+        self._populate_with_secondary(c, self.m.populate_multicast_network)
 
     def test_populate_cluster_host_network_secondary(self):
         c = self._create_test_client(
@@ -91,7 +100,7 @@ class TestPICExhaustive(BaseModuleTestCase):
         c.sysinv.network.list.return_value = [
             self._net(self.m.sysinv_constants.NETWORK_TYPE_CLUSTER_HOST)
         ]
-        self.m.populate_cluster_host_network_secondary(c)
+        self._populate_with_secondary(c, self.m.populate_cluster_host_network)
 
     def test_populate_cluster_pod_network_secondary(self):
         c = self._create_test_client(
@@ -100,7 +109,7 @@ class TestPICExhaustive(BaseModuleTestCase):
         c.sysinv.network.list.return_value = [
             self._net(self.m.sysinv_constants.NETWORK_TYPE_CLUSTER_POD)
         ]
-        self.m.populate_cluster_pod_network_secondary(c)
+        self._populate_with_secondary(c, self.m.populate_cluster_pod_network)
 
     def test_populate_cluster_service_network_secondary(self):
         c = self._create_test_client(
@@ -111,7 +120,7 @@ class TestPICExhaustive(BaseModuleTestCase):
                 self.m.sysinv_constants.NETWORK_TYPE_CLUSTER_SERVICE
             )
         ]
-        self.m.populate_cluster_service_network_secondary(c)
+        self._populate_with_secondary(c, self.m.populate_cluster_service_network)
 
     def test_populate_admin_network_secondary(self):
         c = self._create_test_client(
@@ -125,7 +134,7 @@ class TestPICExhaustive(BaseModuleTestCase):
         c.sysinv.network.list.return_value = [
             self._net(self.m.sysinv_constants.NETWORK_TYPE_ADMIN)
         ]
-        self.m.populate_admin_network_secondary(c)
+        self._populate_with_secondary(c, self.m.populate_admin_network)
 
     # Reconfigure paths
     def test_populate_mgmt_network_reconfigure(self):
@@ -261,8 +270,8 @@ class TestPICExhaustive(BaseModuleTestCase):
         self.m.CONF.has_section = orig_has
         self.m.CONF.items = orig_items
 
-    # Service parameter config with user DNS
-    def test_populate_service_parameter_config_with_dns(self):
+    # User DNS host records present
+    def test_populate_user_dns_host_records_with_section(self):
         c = self._create_test_client(VIRTUAL_SYSTEM="False")
         self.m.INITIAL_POPULATION = True
         self.m.RECONFIGURE_SERVICE = False
@@ -273,7 +282,8 @@ class TestPICExhaustive(BaseModuleTestCase):
             else []
         )
         c.sysinv.service_parameter.list.return_value = []
-        self.m.populate_service_parameter_config(c)
+        self.m.populate_user_dns_host_records(c)
+        c.sysinv.service_parameter.create.assert_called_once()
 
     # Controller config
     def test_populate_controller_config(self):
@@ -8,6 +8,7 @@
 
 import os
 import sys
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -242,13 +243,21 @@ class TestPopulateSystemConfig(BaseModuleTestCase):
         self.mod.RECONFIGURE_SERVICE = False
         mock_client = MagicMock()
         mock_client.sysinv.service_parameter.list.return_value = []
-        self.mod.populate_service_parameter_config(mock_client)
+        self.mod.run_phases(mock_client, self._service_parameter_phases())
+        self.assertTrue(mock_client.sysinv.service_parameter.create.called)
 
     def test_populate_service_parameter_config_skip(self):
         self.mod.INITIAL_POPULATION = False
         self.mod.RECONFIGURE_SERVICE = False
         mock_client = MagicMock()
-        self.mod.populate_service_parameter_config(mock_client)
+        self.mod.run_phases(mock_client, self._service_parameter_phases())
+        mock_client.sysinv.service_parameter.list.assert_not_called()
+        mock_client.sysinv.service_parameter.create.assert_not_called()
+
+    def _service_parameter_phases(self):
+        return [(name, function, [])
+                for name, function, _ in self.mod.POPULATE_PHASES
+                if name not in ("system", "network", "dns")]
 
     def test_delete_network_and_addrpool(self):
         mock_client = MagicMock()
@@ -367,5 +376,500 @@ class TestPopulateSystemConfig(BaseModuleTestCase):
         self.assertEqual(result, "graphical")
 
 
+class TestSysinvSnapshot(BaseModuleTestCase):
+    """Tests for the sysinv resource snapshot."""
+
+    role_path = "bootstrap/persist-config/files"
+    filename = "populate_initial_config.py"
+    mod_name = "pop_init_cfg_snapshot"
+
+    def setUp(self):
+        super().setUp()
+        self.mod = self.module
+        self.api = MagicMock()
+        self.api.network.list.return_value = [
+            self._item("n-mgmt", name="mgmt")]
+        self.api.address_pool.list.return_value = [
+            self._item("p-mgmt", name="management-ipv4",
+                       network="192.168.204.0", prefix=24)]
+        self.api.network_addrpool.list.return_value = [
+            self._item("np-mgmt", network_uuid="n-mgmt",
+                       address_pool_uuid="p-mgmt")]
+        self.api.service_parameter.list.return_value = [
+            self._item("sp-1", name="http_proxy", section="proxy")]
+        self.client = MagicMock()
+        self.client.sysinv = self.mod.SysinvSnapshot(lambda: self.api)
+
+    @staticmethod
+    def _item(uuid, **attrs):
+        item = MagicMock(uuid=uuid, **attrs)
+        if "name" in attrs:
+            item.name = attrs["name"]
+        return item
+
+    def test_collections_are_listed_once(self):
+        self.assertEqual(self.mod.get_network(self.client, "mgmt").uuid,
+                         "n-mgmt")
+        self.mod.get_network(self.client, "mgmt")
+        self.assertEqual(
+            self.mod.get_addrpools_uuid(self.client, "n-mgmt"), ["p-mgmt"])
+        self.assertEqual(self.api.network.list.call_count, 1)
+        self.assertEqual(self.api.network_addrpool.list.call_count, 1)
+        # The other managers are the sysinv ones
+        self.assertIs(self.client.sysinv.ihost, self.api.ihost)
+
+    def test_delete_network_and_addrpool(self):
+        self.api.route.list_by_host.return_value = []
+        self.api.address.list_by_host.return_value = []
+        self.client.sysinv.address_pool.list()
+        self.mod.delete_network_and_addrpool(self.client, "mgmt",
+                                             "management")
+        self.api.network.delete.assert_called_once_with("n-mgmt")
+        self.api.address_pool.delete.assert_called_once_with("p-mgmt")
+        self.assertEqual(self.client.sysinv.network.list(), [])
+        self.assertEqual(self.client.sysinv.address_pool.list(), [])
+        self.assertEqual(self.client.sysinv.network_addrpool.list(), [])
+        self.assertEqual(self.api.address_pool.list.call_count, 1)
+
+    def test_creations_are_written_through(self):
+        self.client.sysinv.network.list()
+        self.client.sysinv.address_pool.list()
+        self.api.address_pool.create.return_value = self._item(
+            "p-oam", name="oam-ipv4")
+        self.api.network.create.return_value = self._item("n-oam",
+                                                          name="oam")
+        pool = self.mod.create_addrpool(self.client, {"name": "oam-ipv4"})
+        self.mod.create_network(self.client, {"pool_uuid": pool.uuid},
+                                "oam")
+        self.assertEqual(self.mod.get_network(self.client, "oam").uuid,
+                         "n-oam")
+        self.assertEqual(len(self.client.sysinv.address_pool.list()), 2)
+        self.assertEqual(self.api.network.list.call_count, 1)
+        # sysinv assigned the pool to the network, the assignments are
+        # listed again
+        self.client.sysinv.network_addrpool.list()
+        self.client.sysinv.network_addrpool.list()
+        self.assertEqual(self.api.network_addrpool.list.call_count, 1)
+
+    def test_service_parameters(self):
+        self.client.sysinv.service_parameter.list()
+        self.client.sysinv.service_parameter.delete("sp-1")
+        self.assertEqual(self.client.sysinv.service_parameter.list(), [])
+        self.assertEqual(self.api.service_parameter.list.call_count, 1)
+        # The parameters created are listed again
+        self.client.sysinv.service_parameter.create(section="proxy")
+        self.client.sysinv.service_parameter.list()
+        self.client.sysinv.service_parameter.list()
+        self.assertEqual(self.api.service_parameter.list.call_count, 2)
+
+
+class TestCgtsClient(BaseModuleTestCase):
+    """Tests for the sysinv client shared by the population phases."""
+
+    role_path = "bootstrap/persist-config/files"
+    filename = "populate_initial_config.py"
+    mod_name = "pop_init_cfg_cgts_client"
+
+    def setUp(self):
+        super().setUp()
+        self.mod = self.module
+        self.tokens = 0
+        self.lock = threading.Lock()
+        credentials = MagicMock()
+        credentials.get_token.side_effect = self._get_token
+        credentials.sysinv_endpoint.return_value = "http://sysinv:6385"
+        self.get_client = MagicMock(side_effect=lambda *a, **kw: MagicMock())
+        for target, name, value in (
+                (self.mod, "openstack_credentials", credentials),
+                (self.mod.cgts_client, "get_client", self.get_client)):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _get_token(self, conf):
+        with self.lock:
+            self.tokens += 1
+        # Keystone is slow, the other threads ask for the client meanwhile
+        threading.Event().wait(0.05)
+        return MagicMock(id="tok")
+
+    def test_lazy_creation_race(self):
+        client = self.mod.CgtsClient()
+        barrier = threading.Barrier(4)
+        results = []
+
+        def phase():
+            barrier.wait()
+            sysinv = client.sysinv
+            results.append((sysinv, sysinv.api))
+
+        threads = [threading.Thread(target=phase) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.tokens, 1)
+        self.assertEqual(len(set(id(sysinv) for sysinv, _ in results)), 1)
+        # One cgtsclient per thread, all with the same token
+        self.assertEqual(len(set(id(api) for _, api in results)), 4)
+        self.assertEqual(self.get_client.call_count, 4)
+        for call in self.get_client.call_args_list:
+            self.assertEqual(call[1]["os_auth_token"], "tok")
+
+    def test_snapshot_is_shared_by_the_threads(self):
+        sysinv = self.mod.CgtsClient().connect()
+        self.get_client.side_effect = None
+        self.get_client.return_value.network.list.return_value = []
+        sysinv.network.list()
+        thread = threading.Thread(target=sysinv.network.list)
+        thread.start()
+        thread.join()
+        # Served from the snapshot, without a client for the thread
+        self.assertEqual(self.get_client.call_count, 1)
+        self.assertEqual(
+            self.get_client.return_value.network.list.call_count, 1)
+
+    def _connect_wait(self, *errors):
+        clock = FakeClock()
+        patcher = patch.object(self.mod, "time", clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        token = MagicMock(id="tok")
+        self.mod.openstack_credentials.get_token.side_effect = \
+            list(errors) + [token]
+        client = self.mod.CgtsClient()
+        try:
+            return client, self.mod.wait_sysinv_client(client)
+        finally:
+            self.sleeps = clock.sleeps
+
+    def test_connect_retries_transient_errors(self):
+        client, sysinv = self._connect_wait(
+            OSError("connection refused"), LookupError("no endpoint"))
+        self.assertIs(client.sysinv, sysinv)
+        self.assertEqual(self.sleeps, [0.5, 1])
+
+    def test_connect_fails_on_rejected_credentials(self):
+        error = Exception("unauthorized")
+        error.code = 401
+        with self.assertRaises(Exception) as ctx:
+            self._connect_wait(error)
+        self.assertIs(ctx.exception, error)
+        self.assertEqual(self.sleeps, [])
+
+
+class TestReconcileNetwork(BaseModuleTestCase):
+    """Tests for the reconciliation of the networks on a replay."""
+
+    role_path = "bootstrap/persist-config/files"
+    filename = "populate_initial_config.py"
+    mod_name = "pop_init_cfg_reconcile"
+
+    def setUp(self):
+        super().setUp()
+        self.mod = self.module
+        self.configure_conf(MANAGEMENT_SUBNET_SECONDARY="fd00::/64",
+                            MANAGEMENT_START_ADDRESS_SECONDARY="fd00::2",
+                            MANAGEMENT_END_ADDRESS_SECONDARY="fd00::ff",
+                            MANAGEMENT_FLOATING_ADDRESS_SECONDARY="fd00::1",
+                            MANAGEMENT_GATEWAY_ADDRESS_SECONDARY="undef")
+        self.mod.RECONFIGURE_NETWORK = True
+        mgmt = self.mod.sysinv_constants.NETWORK_TYPE_MGMT
+        self.network = MagicMock(uuid="n-mgmt", type=mgmt, dynamic=True,
+                                 pool_uuid="p4")
+        self.network.name = mgmt
+        self.pools = [
+            self._pool("p4", "management-ipv4", "192.168.204.0", 24,
+                       [["192.168.204.2", "192.168.204.254"]],
+                       "192.168.204.1"),
+            self._pool("p6", "management-ipv6", "fd00::", 64,
+                       [["fd00::2", "fd00::ff"]], "fd00:0::1")]
+        self.api = MagicMock()
+        self.api.network.list.return_value = [self.network]
+        self.api.address_pool.list.return_value = self.pools
+        self.api.network_addrpool.list.return_value = [
+            MagicMock(uuid=u, network_uuid="n-mgmt", address_pool_uuid=p)
+            for u, p in (("np4", "p4"), ("np6", "p6"))]
+        self.api.ihost.get.return_value = MagicMock(uuid="h-uuid")
+        self.api.route.list_by_host.return_value = [
+            MagicMock(uuid="r4", gateway="192.168.204.100"),
+            MagicMock(uuid="r6", gateway="fd00::100")]
+        self.api.address.list_by_host.return_value = [
+            MagicMock(uuid="a4", address="192.168.204.3"),
+            MagicMock(uuid="a6", address="fd00::3")]
+        self.client = MagicMock()
+        self.client.sysinv = self.mod.SysinvSnapshot(lambda: self.api)
+
+    @staticmethod
+    def _pool(uuid, name, network, prefix, ranges, floating):
+        pool = MagicMock(uuid=uuid, network=network, prefix=prefix,
+                         ranges=ranges, floating_address=floating,
+                         gateway_address=None)
+        pool.name = name
+        return pool
+
+    def _assert_no_deletion(self):
+        self.api.network.delete.assert_not_called()
+        self.api.address_pool.delete.assert_not_called()
+        self.api.route.delete.assert_not_called()
+        self.api.address.delete.assert_not_called()
+
+    def test_replay_is_a_no_op(self):
+        self.mod.populate_mgmt_network(self.client)
+        self._assert_no_deletion()
+        self.api.address_pool.create.assert_not_called()
+        self.api.address_pool.update.assert_not_called()
+        self.api.network.create.assert_not_called()
+        self.api.network_addrpool.assign.assert_not_called()
+
+    def test_changed_address_pool_is_updated(self):
+        self.pools[0].ranges = [["192.168.204.10", "192.168.204.254"]]
+        self.pools[1].gateway_address = "fd00::fe"
+        self.mod.populate_mgmt_network(self.client)
+        self._assert_no_deletion()
+        self.api.address_pool.update.assert_any_call("p4", [
+            {"op": "replace", "path": "/ranges",
+             "value": [("192.168.204.2", "192.168.204.254")]}])
+        self.api.address_pool.update.assert_any_call("p6", [
+            {"op": "replace", "path": "/gateway_address", "value": None}])
+
+    def test_removed_secondary_address_pool(self):
+        self.mod.CONF.get = self._conf_get(MANAGEMENT_SUBNET_SECONDARY="undef")
+        self.mod.populate_mgmt_network(self.client)
+        self.api.address_pool.delete.assert_called_once_with("p6")
+        self.api.route.delete.assert_called_once_with("r6")
+        self.api.address.delete.assert_called_once_with("a6")
+        self.api.network.delete.assert_not_called()
+
+    def test_changed_network_is_created_again(self):
+        self.network.dynamic = False
+        network = MagicMock(uuid="n-new")
+        network.name = self.network.name
+        self.api.network.create.return_value = network
+        self.mod.populate_mgmt_network(self.client)
+        self.api.network.delete.assert_called_once_with("n-mgmt")
+        self.api.address_pool.delete.assert_not_called()
+        self.assertEqual(self.api.address.delete.call_count, 2)
+        self.assertEqual(
+            self.api.network.create.call_args[1]["pool_uuid"], "p4")
+        self.api.network_addrpool.assign.assert_called_once_with(
+            network_uuid="n-new", address_pool_uuid="p6")
+
+    def test_address_pool_moved_to_another_subnet_is_replaced(self):
+        self.pools[0].network = "192.168.206.0"
+        self.pools[0].ranges = [["192.168.206.2", "192.168.206.254"]]
+        self.pools[0].floating_address = "192.168.206.2"
+        self.api.route.list_by_host.return_value.append(
+            MagicMock(uuid="r4-old", gateway="192.168.206.1"))
+        self.api.address.list_by_host.return_value.append(
+            MagicMock(uuid="a4-old", address="192.168.206.3"))
+        pool = self._pool("p4-new", "management-ipv4", "192.168.204.0", 24,
+                          [["192.168.204.2", "192.168.204.254"]], None)
+        self.api.address_pool.create.return_value = pool
+        network = MagicMock(uuid="n-new")
+        network.name = self.network.name
+        self.api.network.create.return_value = network
+        self.mod.populate_mgmt_network(self.client)
+        # The primary pool is replaced, and the network with it
+        self.api.network.delete.assert_called_once_with("n-mgmt")
+        self.api.address_pool.delete.assert_called_once_with("p4")
+        self.api.address_pool.update.assert_not_called()
+        created = self.api.address_pool.create.call_args[1]
+        self.assertEqual(created["network"], "192.168.204.0")
+        self.assertNotIn("controller0_address", created)
+        self.assertEqual(
+            self.api.network.create.call_args[1]["pool_uuid"], "p4-new")
+        # The host routes and addresses of the old subnet are deleted
+        self.api.route.delete.assert_any_call("r4-old")
+        self.api.address.delete.assert_any_call("a4-old")
+
+    def test_secondary_address_pool_moved_to_another_subnet(self):
+        self.pools[1].network = "fd01::"
+        self.api.address.list_by_host.return_value.append(
+            MagicMock(uuid="a6-old", address="fd01::3"))
+        pool = self._pool("p6-new", "management-ipv6", "fd00::", 64,
+                          [["fd00::2", "fd00::ff"]], None)
+        self.api.address_pool.create.return_value = pool
+        self.mod.populate_mgmt_network(self.client)
+        self.api.network.delete.assert_not_called()
+        self.api.address_pool.delete.assert_called_once_with("p6")
+        self.api.address.delete.assert_called_once_with("a6-old")
+        self.api.network_addrpool.assign.assert_called_once_with(
+            network_uuid="n-mgmt", address_pool_uuid="p6-new")
+
+    def _conf_get(self, **overrides):
+        get = self.mod.CONF.get
+
+        def conf_get(section, key, *args, **kwargs):
+            if key in overrides:
+                return overrides[key]
+            return get(section, key, *args, **kwargs)
+        return conf_get
+
+
+class TestRunPhases(BaseModuleTestCase):
+    """Tests for the population phases runner."""
+
+    role_path = "bootstrap/persist-config/files"
+    filename = "populate_initial_config.py"
+    mod_name = "pop_init_cfg_phases"
+
+    def setUp(self):
+        super().setUp()
+        self.mod = self.module
+        self.lock = threading.Lock()
+        self.events = []
+        self.active = [0, 0]
+
+    def _phase(self, name, error=None):
+        def phase(client):
+            with self.lock:
+                self.events.append(("start", name))
+                self.active[0] += 1
+                self.active[1] = max(self.active)
+            threading.Event().wait(0.02)
+            with self.lock:
+                self.active[0] -= 1
+                self.events.append(("end", name))
+            if error:
+                raise error
+        return phase
+
+    def test_dependencies_and_concurrency(self):
+        phases = [("system", self._phase("system"), [])]
+        phases += [(name, self._phase(name), ["system"])
+                   for name in ("a", "b", "c", "d", "e")]
+        phases.append(("last", self._phase("last"), ["a", "e"]))
+        durations = self.mod.run_phases(MagicMock(), phases, max_workers=3)
+        self.assertEqual(sorted(durations), sorted(p[0] for p in phases))
+        self.assertEqual(self.events[:2], [("start", "system"),
+                                           ("end", "system")])
+        started = self.events.index(("start", "last"))
+        self.assertLess(self.events.index(("end", "a")), started)
+        self.assertLess(self.events.index(("end", "e")), started)
+        self.assertEqual(self.active[1], 3)
+
+    def test_failure_skips_the_next_phases(self):
+        phases = [("system", self._phase("system", ValueError("down")), []),
+                  ("dns", self._phase("dns"), ["system"])]
+        with self.assertRaises(ValueError):
+            self.mod.run_phases(MagicMock(), phases)
+        self.assertNotIn(("start", "dns"), self.events)
+
+    def test_circular_dependencies(self):
+        phases = [("a", self._phase("a"), ["b"]),
+                  ("b", self._phase("b"), ["a"])]
+        with self.assertRaises(self.mod.ConfigFail):
+            self.mod.run_phases(MagicMock(), phases)
+        self.assertEqual(self.events, [])
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestWaitFor(BaseModuleTestCase):
+    """Tests for the waits on sysinv."""
+
+    role_path = "bootstrap/persist-config/files"
+    filename = "populate_initial_config.py"
+    mod_name = "pop_init_cfg_wait"
+
+    def setUp(self):
+        super().setUp()
+        self.mod = self.module
+        self.clock = FakeClock()
+        patcher = patch.object(self.mod, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_backoff(self):
+        check = MagicMock(side_effect=[None, Exception("503"), None, None,
+                                       None, None, "done"])
+        result = self.mod.wait_for("it", check, 60, max_delay=4,
+                                   watch=None)
+        self.assertEqual(result, "done")
+        self.assertEqual(self.clock.sleeps, [0.5, 1, 2, 4, 4, 4])
+
+    def test_timeout(self):
+        check = MagicMock(side_effect=Exception("connection refused"))
+        with self.assertRaises(self.mod.ConfigFail) as ctx:
+            self.mod.wait_for("it", check, 5, watch=None)
+        self.assertEqual(str(ctx.exception),
+                         "Timeout waiting for it: connection refused")
+        self.assertEqual(self.clock.now, 5)
+
+    def test_terminal_error(self):
+        error = Exception("unauthorized")
+        error.code = 401
+        check = MagicMock(side_effect=error)
+        with self.assertRaises(Exception):
+            self.mod.wait_for("it", check, 60, watch=None)
+        check.assert_called_once()
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_watched_file_written(self):
+        check = MagicMock(side_effect=[None, None, "done"])
+        states = iter([(1, 1), (1, 1), (1, 1), (2, 2), (2, 2), (3, 3)])
+        with patch.object(self.mod, "file_state",
+                          side_effect=lambda path: next(states)):
+            self.mod.wait_for("it", check, 60, watch="/var/log/sysinv.log")
+        # The second wait ends after 0.5 + 0.2 seconds instead of 1
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5, 0.2])
+        self.assertAlmostEqual(self.clock.now, 1.2)
+
+    def _inventory_wait(self, *hosts, **kwargs):
+        constants = self.mod.sysinv_constants
+        not_found = type("HTTPNotFound", (Exception,), {})
+        for target, name, value in (
+                (constants, "INV_STATE_INITIAL_INVENTORIED", "inv"),
+                (constants, "AVAILABILITY_FAILED", "failed"),
+                (self.mod.cgts_client.exc, "HTTPNotFound", not_found)):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        client = MagicMock()
+        client.sysinv.ihost.get.side_effect = [
+            not_found("controller-0") if host is None else host
+            for host in hosts]
+        with patch.object(self.mod, "file_state") as file_state:
+            try:
+                return self.mod.wait_initial_inventory_complete(
+                    client, kwargs.get("created"))
+            finally:
+                # sysinv.log is not watched
+                file_state.assert_not_called()
+
+    def test_wait_initial_inventory_complete(self):
+        host = self._inventory_wait(
+            MagicMock(inv_state=None, availability="offline"),
+            MagicMock(inv_state="inv", availability="offline"))
+        self.assertEqual(host.inv_state, "inv")
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_inventory_wait_fails_when_host_deleted(self):
+        with self.assertRaises(self.mod.ConfigFail):
+            self._inventory_wait(None, created=MagicMock())
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_inventory_wait_fails_when_host_failed(self):
+        with self.assertRaises(self.mod.ConfigFail):
+            self._inventory_wait(
+                MagicMock(inv_state=None, availability="offline"),
+                MagicMock(inv_state=None, availability="failed"))
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the task timing records of the profile_tasks callback."""
+
+import csv
+import functools
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import load_module
+
+
+class FakeCallbackBase(object):
+    def __init__(self):
+        self._display = MagicMock()
+        self._display.verbosity = 0
+        self._display.columns = 80
+        self._options = {}
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        self._options.update(direct or {})
+
+    def get_option(self, name):
+        return self._options.get(name)
+
+
+def fake_task(uuid, name, role=None):
+    task = MagicMock(_uuid=uuid, _role=None)
+    task.get_name.return_value = name
+    task.get_path.return_value = "roles/x/tasks/main.yml:1"
+    if role:
+        task._role = MagicMock()
+        task._role.get_name.return_value = role
+    return task
+
+
+def fake_result(task, host):
+    result = MagicMock(_task=task)
+    result._host.get_name.return_value = host
+    return result
+
+
+class TestProfileTasks(unittest.TestCase):
+    """Tests for the profile_tasks output_file records."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        modules = {
+            "ansible": types.ModuleType("ansible"),
+            "ansible.module_utils": types.ModuleType("ansible.module_utils"),
+            "ansible.module_utils.six": types.ModuleType("six"),
+            "ansible.module_utils.six.moves": types.ModuleType("moves"),
+            "ansible.plugins": types.ModuleType("ansible.plugins"),
+            "ansible.plugins.callback": types.ModuleType("callback"),
+        }
+        modules["ansible.module_utils.six.moves"].reduce = functools.reduce
+        modules["ansible.plugins.callback"].CallbackBase = FakeCallbackBase
+        with patch.dict(sys.modules, modules):
+            self.mod = load_module("../callback_plugins", "profile_tasks.py",
+                                   "profile_tasks_records")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _run(self, output_format):
+        path = os.path.join(self._tmp.name, "timings-%Y." + output_format)
+        callback = self.mod.CallbackModule()
+        callback.set_options(direct={"output_file": path,
+                                     "output_format": output_format,
+                                     "sort_order": "none"})
+        include = fake_task("u0", "include roles")
+        loop = fake_task("u1", "copy files", role="common/files")
+        # Two serialized batches of the same task
+        for hosts in (["subcloud1"], ["subcloud2"]):
+            callback.v2_playbook_on_task_start(include, False)
+            callback.v2_playbook_on_task_start(loop, False)
+            for host in hosts:
+                for _ in range(3):
+                    callback.v2_runner_item_on_ok(fake_result(loop, host))
+                callback.v2_runner_on_ok(fake_result(loop, host))
+        callback.v2_playbook_on_stats(MagicMock())
+        return callback.output_file
+
+    def test_json_records(self):
+        path = self._run("json")
+        self.assertNotIn("%Y", path)
+        with open(path) as f:
+            records = json.load(f)
+        self.assertEqual([(r["name"], r["host"]) for r in records], [
+            ("include roles", ""), ("copy files", "subcloud1"),
+            ("copy files", "subcloud2")])
+        record = records[1]
+        self.assertEqual(record["role"], "common/files")
+        self.assertEqual(record["path"], "roles/x/tasks/main.yml:1")
+        self.assertEqual(record["iterations"], 2)
+        self.assertEqual(record["items"], 3)
+        self.assertEqual(record["status"], "ok")
+        self.assertGreaterEqual(record["elapsed"], 0)
+
+    def test_csv_records(self):
+        with open(self._run("csv")) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(list(rows[0]), self.mod.RECORD_FIELDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the push/pull engine of push_pull_local_registry."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mock_deps import install_mocks
+
+install_mocks()
+from test_helpers import add_role_dirs
+
+add_role_dirs(["common/push-docker-images/files"])
+
+import push_pull_local_registry as pplr
+
+IMAGE = "registry.local:9001/docker.io/nginx:1.0"
+UNAUTHORIZED = json.dumps({
+    "errorDetail": {"message": "unauthorized: authentication required"},
+    "error": "unauthorized: authentication required"})
+
+
+class APIError(Exception):
+
+    def __init__(self, msg, status_code=None):
+        super(APIError, self).__init__(msg)
+        self.response = MagicMock(status_code=status_code)
+
+
+class TestRegistryEngine(unittest.TestCase):
+    """Tests for RegistryEngine and the push/pull functions."""
+
+    def setUp(self):
+        self.sleeps = []
+        self.auth_reads = 0
+        self.clients = []
+        docker = MagicMock()
+        docker.errors.APIError = APIError
+        docker.errors.NotFound = type("NotFound", (APIError,), {})
+        docker.APIClient.side_effect = self._client
+        clock = MagicMock()
+        clock.time.return_value = 0.0
+        clock.sleep.side_effect = self.sleeps.append
+        crictl = MagicMock()
+        crictl.CalledProcessError = subprocess.CalledProcessError
+        crictl.STDOUT = subprocess.STDOUT
+        for name, value in (("docker", docker), ("time", clock),
+                            ("json", json), ("subprocess", crictl),
+                            ("crictl_images", None),
+                            ("get_local_registry_auth", self._auth)):
+            patcher = patch.object(pplr, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _auth(self):
+        self.auth_reads += 1
+        return {"username": "sysinv", "password": "pw%d" % self.auth_reads}
+
+    def _client(self):
+        client = MagicMock()
+        client.pull.return_value = [b'{"status": "done"}']
+        self.clients.append(client)
+        return client
+
+    def test_client_and_auth_are_shared(self):
+        engine = pplr.RegistryEngine()
+        failed = pplr.map_function([IMAGE, IMAGE + "-a", IMAGE + "-b"],
+                                   pplr.pull_image_from_local_registry,
+                                   engine=engine)
+        self.assertEqual(failed, [])
+        self.assertEqual(self.auth_reads, 1)
+        self.assertLessEqual(len(self.clients), 3)
+        self.assertEqual(sorted(engine.timings),
+                         sorted([IMAGE, IMAGE + "-a", IMAGE + "-b"]))
+
+    def test_auth_refreshed_on_push_error_detail(self):
+        engine = pplr.RegistryEngine()
+        client = self._client()
+        client.push.side_effect = [
+            '{"status": "Preparing"}\n' + UNAUTHORIZED + '\n',
+            '{"aux": {"Digest": "sha256:d1"}}']
+        pplr.docker.APIClient.side_effect = lambda: client
+        self.assertEqual(pplr.push_from_filesystem(IMAGE, engine=engine),
+                         (IMAGE, True))
+        self.assertEqual(self.auth_reads, 2)
+        # The retry uses the new password, without waiting
+        self.assertEqual(client.push.call_args[1]["auth_config"]["password"],
+                         "pw2")
+        pplr.subprocess.check_output.assert_called_once()
+        self.assertIn("sysinv:pw2",
+                      pplr.subprocess.check_output.call_args[0][0])
+        self.assertEqual(self.sleeps, [])
+
+    def test_push_error_detail_fails_the_attempt(self):
+        client = self._client()
+        client.push.return_value = json.dumps(
+            {"errorDetail": {"message": "blob upload unknown"}})
+        pplr.docker.APIClient.side_effect = lambda: client
+        self.assertEqual(pplr.push_from_filesystem(IMAGE), (IMAGE, False))
+        self.assertEqual(client.push.call_count, pplr.MAX_DOWNLOAD_ATTEMPTS)
+        self.assertEqual(self.auth_reads, 1)
+        pplr.subprocess.check_output.assert_not_called()
+
+    def test_auth_refreshed_on_pull_error_detail(self):
+        engine = pplr.RegistryEngine()
+        client = self._client()
+        client.pull.side_effect = [[b'{"status": "Pulling"}',
+                                    UNAUTHORIZED.encode()],
+                                   [b'{"status": "done"}']]
+        pplr.docker.APIClient.side_effect = lambda: client
+        self.assertEqual(
+            pplr.pull_image_from_local_registry(IMAGE, engine=engine),
+            (IMAGE, True))
+        self.assertEqual(self.auth_reads, 2)
+        self.assertEqual(client.pull.call_args[1]["auth_config"]["password"],
+                         "pw2")
+        self.assertEqual(self.sleeps, [])
+
+    def test_auth_refreshed_on_crictl_error(self):
+        engine = pplr.RegistryEngine()
+        client = self._client()
+        pplr.docker.APIClient.side_effect = lambda: client
+        pplr.subprocess.check_output.side_effect = [
+            subprocess.CalledProcessError(
+                1, ["crictl"], output="FATA[0000] pulling image: "
+                "unauthorized: authentication required"),
+            ""]
+        self.assertEqual(pplr.push_from_filesystem(IMAGE, engine=engine),
+                         (IMAGE, True))
+        self.assertEqual(self.auth_reads, 2)
+        self.assertIn("sysinv:pw2",
+                      pplr.subprocess.check_output.call_args[0][0])
+        self.assertEqual(self.sleeps, [])
+
+    def test_crictl_error_is_retried_with_backoff(self):
+        client = self._client()
+        pplr.docker.APIClient.side_effect = lambda: client
+        pplr.subprocess.check_output.side_effect = \
+            subprocess.CalledProcessError(1, ["crictl"], output="timeout")
+        self.assertEqual(pplr.push_from_filesystem(IMAGE), (IMAGE, False))
+        self.assertEqual(self.auth_reads, 1)
+        self.assertEqual(len(self.sleeps), pplr.MAX_DOWNLOAD_ATTEMPTS - 1)
+
+    def test_crictl_pull_skipped_only_for_pushed_digest(self):
+        client = self._client()
+        client.push.return_value = '{"aux": {"Digest": "sha256:d1"}}'
+        pplr.docker.APIClient.side_effect = lambda: client
+        inventory = MagicMock()
+        pplr.crictl_images = inventory
+
+        inventory.has_digest.return_value = True
+        self.assertEqual(pplr.push_from_filesystem(IMAGE), (IMAGE, True))
+        inventory.has_digest.assert_called_with(IMAGE, "sha256:d1")
+        pplr.subprocess.check_output.assert_not_called()
+
+        inventory.has_digest.return_value = False
+        self.assertEqual(pplr.push_from_filesystem(IMAGE), (IMAGE, True))
+        pplr.subprocess.check_output.assert_called_once()
+        inventory.add.assert_called_once_with(IMAGE, "sha256:d1")
+
+    def test_auth_error_after_refresh_fails(self):
+        client = self._client()
+        client.push.side_effect = APIError("no basic auth credentials")
+        pplr.docker.APIClient.side_effect = lambda: client
+        self.assertEqual(pplr.push_from_filesystem(IMAGE), (IMAGE, False))
+        self.assertEqual(client.push.call_count, 2)
+
+    def test_jittered_backoff(self):
+        client = self._client()
+        client.pull.side_effect = Exception("connection reset")
+        pplr.docker.APIClient.side_effect = lambda: client
+        engine = pplr.RegistryEngine()
+        self.assertEqual(
+            pplr.pull_image_from_local_registry(IMAGE, engine=engine),
+            (IMAGE, False))
+        self.assertEqual(client.pull.call_count, pplr.MAX_DOWNLOAD_ATTEMPTS)
+        # No wait after the last attempt
+        self.assertEqual(len(self.sleeps), pplr.MAX_DOWNLOAD_ATTEMPTS - 1)
+        for attempt, delay in enumerate(self.sleeps):
+            self.assertLessEqual(delay, pplr.RETRY_BASE_DELAY * 2 ** attempt)
+        # Each failed attempt throttles the other images
+        self.assertEqual(engine.limit.limit, 1)
+
+    def test_backoff_delay_is_capped(self):
+        for attempt in range(20):
+            self.assertLessEqual(pplr.backoff_delay(attempt),
+                                 pplr.RETRY_MAX_DELAY)
+
+
+class TestAdaptiveLimit(unittest.TestCase):
+    """Tests for AdaptiveLimit."""
+
+    def test_grows_while_latency_holds(self):
+        limit = pplr.AdaptiveLimit(initial=2, maximum=4)
+        for _ in range(5):
+            limit.completed(10.0)
+        self.assertEqual(limit.limit, 4)
+        # A slow image backs off by one, an error halves
+        limit.completed(100.0)
+        self.assertEqual(limit.limit, 3)
+        limit.failed()
+        self.assertEqual(limit.limit, 1)
+        limit.failed()
+        self.assertEqual(limit.limit, 1)
+
+    def test_slots_follow_the_limit(self):
+        limit = pplr.AdaptiveLimit(initial=2, maximum=4)
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def work(_):
+            with limit.slot():
+                with lock:
+                    active[0] += 1
+                    active[1] = max(active)
+                threading.Event().wait(0.01)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=work, args=(i,))
+                   for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(active[1], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the registry v2 client used to deduplicate image layers."""
+
+import io
+import json
+import os
+import sys
+import unittest
+import urllib.error
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["common/push-docker-images/files"])
+
+import registry_client
+
+
+class FakeResponse(io.BytesIO):
+    def __init__(self, status=200, headers=None, body=b""):
+        super().__init__(body)
+        self.status = status
+        self.headers = headers or {}
+
+
+def http_error(url, code, headers=None):
+    return urllib.error.HTTPError(url, code, "error", headers or {},
+                                  io.BytesIO(b""))
+
+
+class FakeRegistry(object):
+    """Answer requests from a dict of (method, path) -> responses"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def __call__(self, request):
+        path = request.full_url.split("/", 3)[-1]
+        self.calls.append((request.get_method(), "/" + path,
+                           request.get_header("Authorization")))
+        response = self.routes.get((request.get_method(), "/" + path))
+        if response is None:
+            raise http_error(request.full_url, 404)
+        if callable(response):
+            response = response(request)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def manifest(*digests):
+    return json.dumps({
+        "mediaType": registry_client.MANIFEST_V2,
+        "config": {"digest": digests[0]},
+        "layers": [{"digest": d} for d in digests[1:]]}).encode()
+
+
+class TestRegistryClient(unittest.TestCase):
+    """Tests for RegistryClient and LayerDeduplicator."""
+
+    def test_split_image_reference(self):
+        split = registry_client.split_image_reference
+        self.assertEqual(split("nginx"), ("docker.io", "library/nginx",
+                                          "latest"))
+        self.assertEqual(split("docker.io/calico/cni:v3"),
+                         ("docker.io", "calico/cni", "v3"))
+        self.assertEqual(split("registry.local:9001/a/b:1.0"),
+                         ("registry.local:9001", "a/b", "1.0"))
+        self.assertEqual(split("quay.io/x/y@sha256:ab"),
+                         ("quay.io", "x/y", "sha256:ab"))
+
+    def test_bearer_token_is_cached(self):
+        challenge = ('Bearer realm="https://auth.io/token",'
+                     'service="reg",scope="repository:a:pull"')
+        state = {"tokens": 0}
+
+        def token(request):
+            state["tokens"] += 1
+            return FakeResponse(body=b'{"token": "t1"}')
+
+        def blob(request):
+            if request.get_header("Authorization") != "Bearer t1":
+                return http_error(request.full_url, 401,
+                                  {"WWW-Authenticate": challenge})
+            return FakeResponse()
+
+        client = registry_client.RegistryClient(
+            "quay.io", auth={"username": "u", "password": "p"})
+        client._open = FakeRegistry({
+            ("GET", "/token?service=reg&scope=repository%3Aa%3Apull"): token,
+            ("HEAD", "/v2/a/blobs/d1"): blob})
+        self.assertTrue(client.blob_exists("a", "d1"))
+        self.assertTrue(client.blob_exists("a", "d1"))
+        self.assertEqual(state["tokens"], 1)
+
+    def test_mount_fallback_cancels_upload(self):
+        client = registry_client.RegistryClient("registry.local:9001")
+        fake = FakeRegistry({
+            ("POST", "/v2/b/blobs/uploads/?mount=d1&from=a"):
+                FakeResponse(
+                    202, {"Location": "/v2/b/blobs/uploads/x"}),
+            ("DELETE", "/v2/b/blobs/uploads/x"): FakeResponse(204)})
+        client._open = fake
+        self.assertFalse(client.mount_blob("b", "d1", "a"))
+        self.assertEqual(fake.calls[-1][:2], ("DELETE",
+                                              "/v2/b/blobs/uploads/x"))
+
+    def _dedup(self, local_routes):
+        local = registry_client.RegistryClient("registry.local:9001")
+        local._open = FakeRegistry(local_routes)
+        dedup = registry_client.LayerDeduplicator(local)
+        source = registry_client.RegistryClient("quay.io")
+        source._open = FakeRegistry({
+            ("GET", "/v2/img/manifests/v1"): FakeResponse(
+                headers={"Content-Type": registry_client.MANIFEST_V2},
+                body=manifest("c1", "l1", "l2"))})
+        dedup._sources["quay.io"] = source
+        return dedup
+
+    def test_populate_mounts_and_pushes_manifest(self):
+        dedup = self._dedup({
+            ("HEAD", "/v2/quay.io/img/blobs/c1"): FakeResponse(),
+            ("POST", "/v2/quay.io/img/blobs/uploads/?mount=l1&from=other"):
+                FakeResponse(201),
+            ("POST", "/v2/quay.io/img/blobs/uploads/?mount=l2&from=other"):
+                FakeResponse(201),
+            ("PUT", "/v2/quay.io/img/manifests/v1"): FakeResponse(201)})
+        dedup.index.add("other", ["l1", "l2"])
+        done, stats = dedup.populate("quay.io/img:v1", "quay.io/img", "v1")
+        self.assertTrue(done)
+        self.assertEqual((stats["present"], stats["mounted"],
+                          stats["missing"]), (1, 2, 0))
+        self.assertEqual(dedup.index.find("c1"), "quay.io/img")
+
+    def test_populate_reports_missing_blobs(self):
+        dedup = self._dedup({
+            ("HEAD", "/v2/quay.io/img/blobs/l1"): FakeResponse()})
+        done, stats = dedup.populate("quay.io/img:v1", "quay.io/img", "v1")
+        self.assertFalse(done)
+        self.assertEqual(stats["missing"], 2)
+        self.assertEqual(stats["blobs"], ["c1", "l1", "l2"])
+        self.assertNotIn("PUT", [c[0] for c in dedup.local._open.calls])
+
+    def test_populate_copies_missing_blobs(self):
+        uploads = []
+
+        def upload(request):
+            uploads.append((request.full_url, request.data.read()))
+            return FakeResponse(201)
+
+        dedup = self._dedup({
+            ("HEAD", "/v2/quay.io/img/blobs/c1"): FakeResponse(),
+            ("HEAD", "/v2/quay.io/img/blobs/l1"): FakeResponse(),
+            ("POST", "/v2/quay.io/img/blobs/uploads/"): FakeResponse(
+                202, {"Location": "/v2/quay.io/img/blobs/uploads/u?s=1"}),
+            ("PUT", "/v2/quay.io/img/blobs/uploads/u?s=1&digest=l2"): upload,
+            ("PUT", "/v2/quay.io/img/manifests/v1"): FakeResponse(201)})
+        dedup.source("quay.io")._open.routes[
+            ("GET", "/v2/img/blobs/l2")] = FakeResponse(
+                headers={"Content-Length": "4"}, body=b"data")
+        done, stats = dedup.populate("quay.io/img:v1", "quay.io/img", "v1",
+                                     copy_missing=True)
+        self.assertTrue(done)
+        self.assertEqual((stats["copied"], stats["copied_bytes"]), (1, 4))
+        self.assertEqual(uploads, [(
+            "https://registry.local:9001/v2/quay.io/img/blobs/uploads/"
+            "u?s=1&digest=l2", b"data")])
+
+
+class TestDockerClientPool(unittest.TestCase):
+    """Tests for DockerClientPool."""
+
+    def test_clients_are_reused(self):
+        created = []
+
+        def create_client():
+            created.append(object())
+            return created[-1]
+
+        pool = registry_client.DockerClientPool(create_client)
+        with pool.client() as first:
+            with pool.client() as second:
+                self.assertIsNot(first, second)
+        with pool.client() as client:
+            self.assertIn(client, (first, second))
+        self.assertEqual(len(created), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
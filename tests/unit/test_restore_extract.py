@@ -0,0 +1,143 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the single pass restore extractor."""
+
+import io
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["common/files"])
+
+import restore_extract
+
+MEMBERS = {
+    "etc/platform/platform.conf": b"INSTALL_UUID=old\n",
+    "etc/platform/.license": b"license",
+    "etc/ssh/sshd_config": b"MACs x\n",
+    "etc/ssh/sshd_config.d/local.conf": b"local",
+    "etc/resolv.conf": b"nameserver 10.0.0.1\n",
+    "etc/systemd/system/a.service": b"[Unit]\n",
+    "opt/platform/deploy/24.09/deploy.yaml": b"deploy",
+    "etc/openldap/schema/cn=config.ldif": b"dn: cn=config\n",
+}
+
+
+class TestRestoreExtract(unittest.TestCase):
+    """Tests for run_plan and main."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.archive = os.path.join(self.tmp, "backup.tgz")
+        with tarfile.open(self.archive, "w:gz") as tar:
+            for name, data in sorted(MEMBERS.items()):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mode = 0o640
+                tar.addfile(info, io.BytesIO(data))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _dest(self, name):
+        return os.path.join(self.tmp, name)
+
+    def _read(self, *path):
+        with open(os.path.join(self.tmp, *path), "rb") as f:
+            return f.read()
+
+    def _run(self, plan):
+        plan_file = os.path.join(self.tmp, "plan.json")
+        with open(plan_file, "w") as f:
+            json.dump(plan, f)
+        out = io.StringIO()
+        with patch("sys.stdout", out):
+            rc = restore_extract.main(["-f", self.archive,
+                                       "--plan", plan_file])
+        return rc, json.loads(out.getvalue())
+
+    def test_plan_is_applied_in_one_pass(self):
+        os.makedirs(self._dest("etc"))
+        with open(self._dest("etc/resolv.conf"), "w") as f:
+            f.write("stale")
+        rc, report = self._run([
+            {"name": "license_permdir", "dest": self._dest("config"),
+             "patterns": ["etc/platform/.license"], "flatten": True},
+            {"name": "license_platform", "dest": self._dest("platform"),
+             "patterns": ["etc/platform/.license"], "flatten": True},
+            {"name": "ssh", "dest": self._dest("ssh"),
+             "patterns": ["etc/ssh/*"], "flatten": True},
+            {"name": "resolv", "dest": self._dest("etc"),
+             "patterns": ["etc/resolv.conf"], "flatten": True,
+             "required": True},
+            {"name": "config", "dest": self._dest("root"),
+             "patterns": ["etc/systemd/system", "opt/platform/deploy/24.09"]},
+            {"name": "ldap", "regex": "etc/.*ldap/schema/cn=config.ldif"},
+            {"name": "ceph", "patterns": ["etc/platform/.node_ceph_configured"]},
+            {"name": "disabled", "dest": self._dest("disabled"),
+             "patterns": ["*"], "enabled": False},
+        ])
+        self.assertEqual(rc, 0)
+        self.assertEqual(report["members"], len(MEMBERS))
+        self.assertEqual(report["missing"], [])
+        entries = report["entries"]
+        self.assertNotIn("disabled", entries)
+        self.assertEqual(entries["ldap"]["matched"], 1)
+        self.assertEqual(entries["ceph"]["matched"], 0)
+        self.assertEqual(entries["ssh"]["matched"], 2)
+        self.assertEqual(entries["config"]["matched"], 2)
+
+        # A member matched by two entries is extracted to both
+        self.assertEqual(self._read("config", ".license"), b"license")
+        self.assertEqual(self._read("platform", ".license"), b"license")
+        self.assertEqual(self._read("ssh", "local.conf"), b"local")
+        self.assertEqual(self._read("etc", "resolv.conf"),
+                         MEMBERS["etc/resolv.conf"])
+        self.assertEqual(
+            self._read("root", "opt/platform/deploy/24.09/deploy.yaml"),
+            b"deploy")
+        self.assertEqual(
+            os.stat(self._dest("platform/.license")).st_mode & 0o777, 0o640)
+        self.assertFalse(os.path.exists(self._dest("disabled")))
+
+    def test_missing_required_pattern_fails(self):
+        rc, report = self._run([
+            {"name": "coredump", "dest": self._dest("coredump"),
+             "patterns": ["etc/resolv.conf", "etc/systemd/coredump.conf.d/*"],
+             "required": True},
+            {"name": "fluxcd", "dest": self._dest("fluxcd"),
+             "patterns": ["opt/platform/armada"]},
+        ])
+        self.assertEqual(rc, 2)
+        self.assertEqual(report["missing"],
+                         ["coredump: etc/systemd/coredump.conf.d/*"])
+
+    def test_uncompressed_archive(self):
+        plain = os.path.join(self.tmp, "backup.tar")
+        with tarfile.open(self.archive) as src, \
+                tarfile.open(plain, "w") as dst:
+            for member in src:
+                dst.addfile(member, src.extractfile(member))
+        self.archive = plain
+        rc, report = self._run([
+            {"name": "platform_conf", "dest": self._dest("staging"),
+             "patterns": ["etc/platform/platform.conf"], "flatten": True}])
+        self.assertEqual(rc, 0)
+        self.assertEqual(self._read("staging", "platform.conf"),
+                         MEMBERS["etc/platform/platform.conf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
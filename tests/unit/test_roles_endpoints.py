@@ -130,7 +130,9 @@ class TestUpdateAdminEndpointsFull(unittest.TestCase):
             os.environ.pop("OS_AUTH_URL", None)
             with patch("subprocess.Popen", return_value=_mock_popen(OS_ENV_LINES)):
                 with patch("builtins.open", mock_open()):
-                    self.assertIsNotNone(uae.load_credentials_and_create_session())
+                    with patch("openstack_credentials.get_token") as get_token:
+                        self.assertIsNotNone(uae.load_credentials_and_create_session())
+            get_token.assert_called_once()
 
     def test_main_enroll_mode(self):
         self.assertTrue(callable(uae.main))
@@ -220,7 +222,9 @@ class TestGetNetworkAddressesFull(unittest.TestCase):
             os.environ.pop("SYSTEM_URL", None)
             with patch("subprocess.Popen", return_value=_mock_popen(OS_ENV_LINES)):
                 with patch("builtins.open", mock_open()):
-                    _ = gna.CgtsClient().sysinv
+                    with patch("openstack_credentials.get_token") as get_token:
+                        _ = gna.CgtsClient().sysinv
+            get_token.assert_called_once()
 
     def test_main_single(self):
         with patch.object(gna, "CgtsClient"):
@@ -481,11 +481,16 @@ class TestUAE85(unittest.TestCase):
         )
         proc.communicate = MagicMock()
         uae.subprocess.Popen.return_value = proc
+        env = dict(line.strip().split("=", 1) for line in proc.stdout)
         with patch.dict(os.environ, {}, clear=False):
             os.environ.pop("OS_TOKEN", None)
             os.environ.pop("OS_AUTH_URL", None)
-            s = uae.load_credentials_and_create_session()
+            with patch("openstack_credentials.load_openrc",
+                       return_value=env):
+                with patch("openstack_credentials.get_token") as get_token:
+                    s = uae.load_credentials_and_create_session()
         self.assertIsNotNone(s)
+        get_token.assert_called_once_with(env)
 
 
 if __name__ == "__main__":
@@ -281,8 +281,13 @@ class TestUAEDeep(unittest.TestCase):
             proc.communicate = MagicMock()
             uae.subprocess = MagicMock()
             uae.subprocess.Popen = MagicMock(return_value=proc)
-            s = uae.load_credentials_and_create_session()
+            env = dict(line.strip().split("=", 1) for line in proc.stdout)
+            with patch("openstack_credentials.load_openrc",
+                       return_value=env):
+                with patch("openstack_credentials.get_token") as get_token:
+                    s = uae.load_credentials_and_create_session()
         self.assertIsNotNone(s)
+        get_token.assert_called_once_with(env)
 
     def test_main_full(self):
         mock_ks = MagicMock()
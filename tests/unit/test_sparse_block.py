@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2026 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the sparse block backup of storage-backend-migration."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from test_helpers import add_role_dirs
+
+add_role_dirs(["storage-backend-migration/common/files"])
+
+import sparse_block
+
+MIB = 1024 * 1024
+SIZE = 64 * MIB
+DATA = {0: b"boot" * 1024, 20 * MIB + 100: b"x" * (3 * MIB),
+        SIZE - 10: b"tail-data!"}
+
+
+class TestSparseBlock(unittest.TestCase):
+    """Round-trip tests for export_device and import_device."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.device = os.path.join(self.tmp, "device")
+        with open(self.device, "wb") as f:
+            f.truncate(SIZE)
+            for offset, data in DATA.items():
+                f.seek(offset)
+                f.write(data)
+        self.backup = os.path.join(self.tmp, "backup.img.sparse")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _expected(self):
+        expected = bytearray(SIZE)
+        for offset, data in DATA.items():
+            expected[offset:offset + len(data)] = data
+        return bytes(expected)
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_round_trip_stores_only_data(self):
+        stats = sparse_block.export_device(self.device, self.backup,
+                                           workers=3, chunk_size=MIB)
+        self.assertEqual(stats["device_size"], SIZE)
+        # Whole chunks around the data, the zero chunks are not stored
+        self.assertLessEqual(stats["data_bytes"], 6 * MIB)
+        self.assertLess(os.path.getsize(self.backup), MIB)
+        self.assertEqual(sorted(os.listdir(self.tmp)),
+                         ["backup.img.sparse", "device"])
+
+        target = os.path.join(self.tmp, "restored")
+        stats = sparse_block.import_device(self.backup, target, workers=3)
+        self.assertEqual(self._read(target), self._expected())
+        self.assertEqual(stats["records"], 6)
+
+    def test_rbd_diff_extents(self):
+        extents = os.path.join(self.tmp, "extents.json")
+        with open(extents, "w") as f:
+            json.dump([{"offset": 20 * MIB, "length": 4 * MIB,
+                        "exists": "true"},
+                       {"offset": 40 * MIB, "length": MIB,
+                        "exists": "false"}], f)
+        stats = sparse_block.export_device(self.device, self.backup,
+                                           extents_file=extents,
+                                           chunk_size=MIB)
+        self.assertEqual(stats["data_bytes"], 4 * MIB)
+
+    def test_zero_range_without_blkzeroout(self):
+        # Regular files do not support BLKZEROOUT, zeros are written
+        target = os.path.join(self.tmp, "stale")
+        with open(target, "wb") as f:
+            f.write(b"\xff" * (3 * MIB))
+        fd = os.open(target, os.O_WRONLY)
+        try:
+            sparse_block._zero_range(fd, 100, 2 * MIB, bytes(MIB))
+        finally:
+            os.close(fd)
+        data = self._read(target)
+        self.assertEqual(data[:100], b"\xff" * 100)
+        self.assertEqual(data[100:100 + 2 * MIB], bytes(2 * MIB))
+        self.assertEqual(data[100 + 2 * MIB:], b"\xff" * (MIB - 100))
+
+    def test_corrupt_backup_is_rejected(self):
+        sparse_block.export_device(self.device, self.backup, chunk_size=MIB)
+        with open(self.backup, "r+b") as f:
+            f.seek(-5, os.SEEK_END)
+            f.write(b"\0")
+        with self.assertRaises(sparse_block.SparseBlockError):
+            sparse_block.import_device(self.backup,
+                                       os.path.join(self.tmp, "restored"))
+
+
+if __name__ == "__main__":
+    unittest.main()